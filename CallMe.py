@@ -1,38 +1,45 @@
 import os
 import sys
-import sqlite3
-import hashlib
-import csv
+# primeiro import: com --startup-timing passa a cronometrar os demais
+from callme.startup import StartupTimer
+startup = StartupTimer(StartupTimer.requested(sys.argv))
+import queue
 import subprocess
 import os
-from datetime import datetime
+import threading
+import time
+from functools import partial
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
     QPushButton, QTextEdit, QStackedWidget, QMessageBox, QComboBox,
-    QTableWidget, QTableWidgetItem, QFileDialog, QHeaderView, QFrame, QTabWidget, QSplashScreen, QDialog
+    QTableView, QFileDialog, QHeaderView, QFrame, QTabWidget, QSplashScreen, QDialog,
+    QStyledItemDelegate, QStyleOptionViewItem, QStyle, QAbstractItemView, QProgressDialog,
+    QTableWidget, QTableWidgetItem
 )
-from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtGui import QFont, QPixmap, QIcon, QColor
-
-# --- PDF generation imports (ReportLab) ---
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image as RLImage
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import mm
-
-def resource_path(relative_path):
-    """Permite acesso a arquivos em modo 'empacotado' com PyInstaller."""
-    if hasattr(sys, '_MEIPASS'):
-        return os.path.join(sys._MEIPASS, relative_path)
-    return os.path.join(os.path.abspath("."), relative_path)
+from PyQt6.QtCore import (
+    Qt, QTimer, QAbstractTableModel, QModelIndex, QObject, QThread, QPointF, QRectF, pyqtSignal
+)
+from PyQt6.QtGui import QFont, QPixmap, QIcon, QColor, QPainter, QPen, QKeySequence, QShortcut
+
+# Banco, importação e relatórios ficam em callme/, que não depende do Qt
+from callme.db import (
+    Database, ExportCancelled, DB_FILE, DB_PROFILE, DESC_PREVIEW_LEN,
+    DEFAULT_TICKET_ORDER, SEARCH_LIMIT, SEARCH_WINDOW, STATUS_OPTIONS, TICKET_SORT_COLUMNS,
+    resource_path, logo_path,
+)
+from callme import analytics
+from callme.analytics import SLA_RESOLUTION_HOURS
+from callme import auth
+from callme import perf
+
+startup.mark("imports")
 
 # Caminhos para recursos
 db_path = resource_path("chamados.db")
-logo_path = resource_path("assets/logo.png")
 icone_path = resource_path("assets/logowindow.png")  # Corrigido para logowindow.png
 
-DB_FILE = "chamados.db"
+# intervalo de verificação de alterações feitas por outras instâncias
+FEED_INTERVAL_MS = 2000
 
 # ----------------------- Classe de Aviso Reutilizável -----------------------
 class ConfirmDialog:
@@ -47,261 +54,325 @@ class ConfirmDialog:
         dialog.setStandardButtons(QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
         dialog.setDefaultButton(QMessageBox.StandardButton.No)
         result = dialog.exec()
+        dialog.deleteLater()
         return result == QMessageBox.StandardButton.Yes
 
-# ----------------------- Banco de dados -----------------------
-class Database:
-    def __init__(self, db_file=DB_FILE):
-        self.conn = sqlite3.connect(db_file)
-        self.conn.row_factory = sqlite3.Row
-        self.create_tables()
-
-    def create_tables(self):
-        c = self.conn.cursor()
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS res (
-                id INTEGER PRIMARY KEY,
-                re TEXT UNIQUE,
-                role TEXT CHECK(role IN ('funcionario','tecnico'))
-            )
-        ''')
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY,
-                name TEXT,
-                email TEXT UNIQUE,
-                password_hash TEXT,
-                role TEXT CHECK(role IN ('funcionario','tecnico')),
-                re TEXT
-            )
-        ''')
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS tickets (
-                id INTEGER PRIMARY KEY,
-                title TEXT,
-                description TEXT,
-                status TEXT,
-                created_by INTEGER,
-                created_at TEXT,
-                resolution TEXT,
-                FOREIGN KEY(created_by) REFERENCES users(id)
-            )
-        ''')
-        self.conn.commit()
-        self._ensure_sample_res()
-
-    def _ensure_sample_res(self):
-        c = self.conn.cursor()
-        c.execute("SELECT COUNT(*) FROM res")
-        if c.fetchone()[0] == 0:
-            for i in range(1, 11):
-                re = f"FUNC{i:03d}"
-                c.execute("INSERT INTO res (re, role) VALUES (?,?)", (re, 'funcionario'))
-            for i in range(1, 4):
-                re = f"TEC{i:03d}"
-                c.execute("INSERT INTO res (re, role) VALUES (?,?)", (re, 'tecnico'))
-            self.conn.commit()
-
-    def create_user(self, name, email, password_hash, role, re):
-        c = self.conn.cursor()
-        try:
-            c.execute("INSERT INTO users (name,email,password_hash,role,re) VALUES (?,?,?,?,?)",
-                      (name, email, password_hash, role, re))
-            self.conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            return False
+# ----------------------- Execução do banco fora da thread da interface -----------------------
+class DbTask(QObject):
+    """Resultado pendente de uma chamada enviada ao DbExecutor.
+    Os sinais são sempre emitidos na thread da interface."""
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(object)
 
-    def find_user_by_email(self, email):
-        c = self.conn.cursor()
-        c.execute("SELECT * FROM users WHERE email=?", (email,))
-        return c.fetchone()
-
-    def get_user_by_id(self, uid):
-        c = self.conn.cursor()
-        c.execute("SELECT * FROM users WHERE id=?", (uid,))
-        return c.fetchone()
-
-    def update_user(self, uid, name, email):
-        c = self.conn.cursor()
-        c.execute("UPDATE users SET name=?, email=? WHERE id=?", (name, email, uid))
-        self.conn.commit()
-
-    def check_re(self, re):
-        c = self.conn.cursor()
-        c.execute("SELECT * FROM res WHERE re=?", (re,))
-        return c.fetchone()
-
-    def create_ticket(self, title, description, created_by):
-        c = self.conn.cursor()
-        now = datetime.utcnow().isoformat()
-        c.execute("INSERT INTO tickets (title,description,status,created_by,created_at,resolution) VALUES (?,?,?,?,?,?)",
-                  (title, description, 'Aberto', created_by, now, ''))
-        self.conn.commit()
-        return c.lastrowid
-
-    def get_tickets_for_user(self, user, status_filter=None):
-        c = self.conn.cursor()
-        if user['role'] == 'tecnico':
-            query = "SELECT t.*, u.name as creator_name FROM tickets t JOIN users u ON t.created_by = u.id"
-            params = []
-            if status_filter and status_filter != "Todos":
-                query += " WHERE t.status=?"
-                params.append(status_filter)
-            query += " ORDER BY t.created_at DESC"
-            c.execute(query, params)
-        else:
-            c.execute("SELECT t.*, u.name as creator_name FROM tickets t JOIN users u ON t.created_by = u.id WHERE created_by=? ORDER BY t.created_at DESC", (user['id'],))
-        return c.fetchall()
-
-    def get_ticket(self, tid):
-        c = self.conn.cursor()
-        c.execute("SELECT t.*, u.name as creator_name, u.email as creator_email FROM tickets t JOIN users u ON t.created_by = u.id WHERE t.id=?", (tid,))
-        return c.fetchone()
-
-    def update_ticket_status(self, tid, status, resolution=None):
-        c = self.conn.cursor()
-        if resolution is not None:
-            c.execute("UPDATE tickets SET status=?, resolution=? WHERE id=?", (status, resolution, tid))
-        else:
-            c.execute("UPDATE tickets SET status=? WHERE id=?", (status, tid))
-        self.conn.commit()
+class DbExecutor(QThread):
+    """Thread dedicada ao banco, com conexão própria ao mesmo arquivo.
+    submit(fn, *args) agenda fn(db, *args) e devolve um DbTask; as chamadas
+    são executadas em ordem, uma de cada vez."""
 
-    def export_tickets_csv(self, filepath, user_id=None):
-        c = self.conn.cursor()
-        if user_id:
-            c.execute("SELECT t.id, t.title, t.description, t.status, t.created_at, t.resolution, u.name as creator_name, u.email FROM tickets t JOIN users u ON t.created_by = u.id WHERE t.created_by=? ORDER BY t.created_at DESC", (user_id,))
-        else:
-            c.execute("SELECT t.id, t.title, t.description, t.status, t.created_at, t.resolution, u.name as creator_name, u.email FROM tickets t JOIN users u ON t.created_by = u.id ORDER BY t.created_at DESC")
-        rows = c.fetchall()
-        with open(filepath, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['id','title','description','status','created_at','resolution','creator_name','creator_email'])
-            for r in rows:
-                writer.writerow([r['id'], r['title'], r['description'], r['status'], r['created_at'], r['resolution'], r['creator_name'], r['email']])
-
-    def export_tickets_pdf(self, filepath, user_id=None):
-        """
-        Export tickets to a PDF file using ReportLab.
-        If user_id is provided, only that user's tickets are exported.
-        """
-        c = self.conn.cursor()
-        if user_id:
-            c.execute("SELECT t.id, t.title, t.description, t.status, t.created_at, t.resolution, u.name as creator_name, u.email FROM tickets t JOIN users u ON t.created_by = u.id WHERE t.created_by=? ORDER BY t.created_at DESC", (user_id,))
+    _done = pyqtSignal(object, object, object)  # (task, resultado, erro)
+
+    def __init__(self, db_file, parent=None, profile=DB_PROFILE):
+        super().__init__(parent)
+        self.db_file = db_file
+        self.profile = profile
+        self._queue = queue.Queue()
+        self._tasks = set()  # mantém os DbTask vivos até a entrega do resultado
+        self._done.connect(self._dispatch)
+
+    def submit(self, fn, *args, **kwargs):
+        task = DbTask()
+        self._tasks.add(task)
+        self._queue.put((task, fn, args, kwargs, time.perf_counter()))
+        if not self.isRunning():
+            self.start()
+        return task
+
+    def run(self):
+        threading.current_thread().name = "DbExecutor"  # como aparece no trace (callme.perf)
+        db = Database(self.db_file, migrate=False, profile=self.profile, readers=0)
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                task, fn, args, kwargs, queued = item
+                # tempo na fila e na execução, por função (perf: executor.*)
+                started = time.perf_counter()
+                perf.recorder.record("executor.queue_wait", started - queued)
+                with perf.span("executor." + getattr(fn, '__qualname__', repr(fn))):
+                    try:
+                        result = fn(db, *args, **kwargs)
+                    except Exception as e:
+                        self._done.emit(task, None, e)
+                    else:
+                        self._done.emit(task, result, None)
+        finally:
+            db.close()
+
+    def _dispatch(self, task, result, error):
+        self._tasks.discard(task)
+        if error is not None:
+            task.failed.emit(error)
         else:
-            c.execute("SELECT t.id, t.title, t.description, t.status, t.created_at, t.resolution, u.name as creator_name, u.email FROM tickets t JOIN users u ON t.created_by = u.id ORDER BY t.created_at DESC")
-        rows = c.fetchall()
-
-        # Create PDF
-        doc = SimpleDocTemplate(filepath, pagesize=A4,
-                                rightMargin=20*mm, leftMargin=20*mm,
-                                topMargin=20*mm, bottomMargin=20*mm)
-        styles = getSampleStyleSheet()
-        normal = styles["Normal"]
-        normal.fontSize = 9
-        heading = styles["Heading1"]
-        heading.fontSize = 16
-
-        elements = []
-
-        # Try to add logo if available
+            task.finished.emit(result)
+
+    def shutdown(self):
+        if self.isRunning():
+            self._queue.put(None)
+            self.wait()
+
+class ChangeFeed(QObject):
+    """Acompanha ticket_events e avisa a tela das criações e mudanças de
+    status feitas por esta ou por outras instâncias.
+    A cada FEED_INTERVAL_MS consulta só PRAGMA data_version na conexão do
+    DbExecutor; os eventos são lidos apenas quando o arquivo mudou, e
+    somente os posteriores ao último já entregue. O data_version de uma
+    conexão não muda com as gravações dela mesma: quem grava chamados pelo
+    DbExecutor chama poll(force=True) em seguida, e essa verificação lê os
+    eventos sem olhar o data_version."""
+
+    ticketsChanged = pyqtSignal(list)  # linhas no formato da lista de chamados
+    resyncNeeded = pyqtSignal()        # mudanças demais: recarregar a lista
+
+    def __init__(self, executor, interval=FEED_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.last_seq = None
+        self._version = None
+        self._busy = False
+        self._pending = False
+        self._force = False
+        self._generation = 0
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self.poll)
+        # a fila do executor é FIFO: o ponto de partida é lido antes de
+        # qualquer consulta enviada depois da criação (como a primeira página)
+        self._prime()
+
+    def _prime(self):
+        self._busy = True
+        generation = self._generation
+        task = self.executor.submit(Database.last_event_seq)
+        task.finished.connect(lambda seq: self._on_polled((None, seq, []), generation))
+        task.failed.connect(lambda error: self._on_failed(error, generation))
+
+    def reset(self):
+        """Nova sessão na mesma tela: recomeça do evento mais recente, já que
+        a lista será recarregada por inteiro logo em seguida. Respostas de
+        verificações ainda em andamento são descartadas."""
+        self._generation += 1
+        self._version = None
+        self._pending = False
+        self._prime()
+
+    def start(self):
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+
+    def poll(self, force=False):
+        """Verifica já; se houver uma verificação em andamento, outra é
+        feita assim que ela terminar. `force` lê os eventos mesmo sem
+        mudança no data_version (gravações do próprio DbExecutor)."""
+        self._force = self._force or force
+        if self._busy:
+            self._pending = True
+            return
+        if self.last_seq is None:
+            self._prime()
+            return
+        self._busy = True
+        generation = self._generation
+        version = None if self._force else self._version
+        self._force = False
+        task = self.executor.submit(Database.poll_ticket_events, self.last_seq, version)
+        task.finished.connect(lambda result: self._on_polled(result, generation))
+        task.failed.connect(lambda error: self._on_failed(error, generation))
+
+    def _on_polled(self, result, generation):
+        if generation != self._generation:
+            return
+        self._version, self.last_seq, rows = result
+        self._busy = False
+        if rows is None:
+            self.resyncNeeded.emit()
+        elif rows:
+            self.ticketsChanged.emit(rows)
+        if self._pending:
+            self._pending = False
+            self.poll()
+
+    def _on_failed(self, error, generation):
+        if generation != self._generation:
+            return
+        # banco ocupado ou indisponível: tenta de novo no próximo intervalo
+        self._busy = False
+        self._pending = False
+        print(f"Falha ao verificar alterações: {error}", file=sys.stderr)
+
+# ----------------------- Exportação em segundo plano -----------------------
+class ExportWorker(QThread):
+    """Roda export_fn(db, filepath, progress=..., cancel_event=..., **kwargs)
+    em uma thread própria, com conexão própria ao banco. Também serve à
+    importação, que devolve um ImportReport em vez da contagem."""
+    progress = pyqtSignal(int, int)
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(object)
+    cancelled = pyqtSignal()
+
+    def __init__(self, db, export_fn, filepath, parent=None, **kwargs):
+        super().__init__(parent)
+        self.db_file = db.db_file
+        self.profile = db.profile
+        self.export_fn = export_fn
+        self.filepath = filepath
+        self.kwargs = kwargs
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        threading.current_thread().name = "ExportWorker"
+        db = Database(self.db_file, migrate=False, profile=self.profile, readers=0)
         try:
-            print(f"Tentando carregar logo em: {logo_path}")  # Debug
-            logo = RLImage(logo_path, width=40*mm, height=15*mm)
-            elements.append(logo)
+            n = self.export_fn(db, self.filepath, progress=self.progress.emit,
+                               cancel_event=self._cancel, **self.kwargs)
+        except ExportCancelled:
+            self.cancelled.emit()
         except Exception as e:
-            print(f"Erro ao carregar logo: {e}")  # Debug
-            pass
-
-        elements.append(Spacer(1, 6))
-
-        # Title and date
-        title_par = Paragraph("Relatório de Chamados", heading)
-        elements.append(title_par)
-        elements.append(Spacer(1, 4))
-        date_par = Paragraph(f"Emitido em: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} (UTC)", normal)
-        elements.append(date_par)
-        elements.append(Spacer(1, 8))
-
-        # Table header
-        data = []
-        header = ['ID', 'Título', 'Descrição', 'Status', 'Criado por', 'Data', 'Resolução']
-        data.append(header)
-
-        # Build rows with Paragraphs for wrapping long text
-        for r in rows:
-            desc = r['description'] or ""
-            resolution = r['resolution'] or ""
-            created_at = r['created_at'] or ""
-            row = [
-                str(r['id']),
-                Paragraph(r['title'] or "", normal),
-                Paragraph(desc.replace('\n', '<br />'), normal),
-                r['status'] or "",
-                Paragraph(r['creator_name'] or "", normal),
-                Paragraph(created_at, normal),
-                Paragraph(resolution.replace('\n', '<br />'), normal)
-            ]
-            data.append(row)
-
-        # Column widths (approx, in points)
-        page_width = A4[0] - (40*mm)  # A4 width minus left+right margins
-        col_widths = [
-            30,                # ID
-            90,                # Title
-            200,               # Description
-            60,                # Status
-            80,                # Creator
-            80,                # Date
-            page_width - (30+90+200+60+80+80)  # Resolution: remaining
-        ]
-
-        # Ensure no negative widths
-        col_widths = [w if w > 20 else 60 for w in col_widths]
-
-        tbl = Table(data, colWidths=col_widths, repeatRows=1)
-        tbl_style = TableStyle([
-            ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#0055ff")),
-            ('TEXTCOLOR', (0,0), (-1,0), colors.white),
-            ('ALIGN', (0,0), (0,-1), 'CENTER'),
-            ('VALIGN', (0,0), (-1,-1), 'TOP'),
-            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0,0), (-1,-1), 9),
-            ('INNERGRID', (0,0), (-1,-1), 0.25, colors.grey),
-            ('BOX', (0,0), (-1,-1), 0.5, colors.grey),
-            ('LEFTPADDING', (0,0), (-1,-1), 4),
-            ('RIGHTPADDING', (0,0), (-1,-1), 4),
-        ])
-        tbl.setStyle(tbl_style)
-
-        elements.append(tbl)
-
-        # Build PDF
-        doc.build(elements)
-
-    def update_password_by_email_re(self, email, re_val, new_password_hash):
-        c = self.conn.cursor()
-        c.execute("SELECT id, re FROM users WHERE email=?", (email,))
-        row = c.fetchone()
-        if not row:
-            return False
-        if row['re'] != re_val:
-            return False
-        c.execute("UPDATE users SET password_hash=? WHERE id=?", (new_password_hash, row['id']))
-        self.conn.commit()
-        return True
-
-# ----------------------- Segurança -----------------------
-def hash_password(pw: str) -> str:
-    return hashlib.sha256(pw.encode('utf-8')).hexdigest()
+            self.failed.emit(e)
+        else:
+            self.succeeded.emit(n)
+        finally:
+            db.close()
+
+def start_export(parent, db, export_fn, filepath, success_message, **kwargs):
+    """Inicia a exportação em segundo plano com uma janela de progresso
+    que permite cancelar. Devolve o ExportWorker já iniciado."""
+    dlg = QProgressDialog("Exportando chamados...", "Cancelar", 0, 0, parent)
+    dlg.setWindowTitle("Exportação")
+    dlg.setWindowModality(Qt.WindowModality.WindowModal)
+    dlg.setMinimumDuration(300)
+    dlg.setAutoReset(False)
+    worker = ExportWorker(db, export_fn, filepath, parent, **kwargs)
+    span = perf.span("ui." + export_fn.__name__, **kwargs)
+
+    def on_progress(done, total):
+        dlg.setMaximum(max(total, 1))
+        dlg.setValue(min(done, max(total, 1)))
+
+    worker.progress.connect(on_progress)
+    dlg.canceled.connect(worker.cancel)
+    # antes das mensagens: o span mede a exportação, não o tempo com a caixa aberta
+    worker.succeeded.connect(lambda n: span.end(rows=n))
+    worker.failed.connect(lambda e: span.end(error=str(e)))
+    worker.cancelled.connect(lambda: span.end(cancelled=True))
+    worker.succeeded.connect(lambda _: QMessageBox.information(parent, "Sucesso", success_message))
+    worker.failed.connect(lambda e: QMessageBox.critical(parent, "Erro", f"Falha ao exportar: {e}"))
+    worker.cancelled.connect(lambda: QMessageBox.information(parent, "Exportação", "Exportação cancelada."))
+    worker.finished.connect(dlg.close)
+    worker.finished.connect(dlg.deleteLater)
+    worker.finished.connect(worker.deleteLater)
+    worker.start()
+    return worker
+
+def start_import(parent, db, filepath, on_done=None):
+    """Importa `filepath` em segundo plano com janela de progresso e mostra
+    o relatório ao final; on_done(report) é chamado depois dele."""
+    dlg = QProgressDialog("Importando chamados...", "Cancelar", 0, 100, parent)
+    dlg.setWindowTitle("Importação")
+    dlg.setWindowModality(Qt.WindowModality.WindowModal)
+    dlg.setMinimumDuration(300)
+    dlg.setAutoReset(False)
+    worker = ExportWorker(db, Database.import_tickets, filepath, parent)
+    span = perf.span("ui.import_tickets")
+
+    def on_progress(done, total):
+        dlg.setValue(int(100 * done / total) if total else 100)
+
+    def on_succeeded(report):
+        span.end(imported=report.imported, rejected=report.rejected, cancelled=report.cancelled)
+        text = report.summary()
+        if report.rejects:
+            shown = report.rejects[:10]
+            text += "\n\nRejeições:\n" + "\n".join(f"linha {line}: {reason}" for line, reason in shown)
+            if report.rejected > len(shown):
+                text += f"\n... e mais {report.rejected - len(shown)}"
+        QMessageBox.information(parent, "Importação", text)
+        if on_done:
+            on_done(report)
+
+    worker.progress.connect(on_progress)
+    dlg.canceled.connect(worker.cancel)
+    worker.succeeded.connect(on_succeeded)
+    worker.failed.connect(lambda e: span.end(error=str(e)))
+    worker.failed.connect(lambda e: QMessageBox.critical(parent, "Erro", f"Falha ao importar: {e}"))
+    worker.finished.connect(dlg.close)
+    worker.finished.connect(dlg.deleteLater)
+    worker.finished.connect(worker.deleteLater)
+    worker.start()
+    return worker
+
+def show_ticket_text(parent, db, tid, key):
+    """Abre a descrição ou a resolução completa do chamado `tid`, lida pelo
+    cache de detalhes do banco (a tabela guarda só o começo do texto)."""
+    span = perf.span("ui.dialog.ticket_text", key=key)
+    ticket = db.get_ticket_detail(tid)
+    if ticket is None:
+        span.end(found=False)
+        QMessageBox.warning(parent, "Erro", f"Chamado {tid} não encontrado.")
+        return
+    dlg = QDialog(parent)
+    dlg.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+    dlg.setWindowTitle('Descrição completa' if key == 'description' else 'Resolução completa')
+    dlg.setFixedSize(700, 420)
+    layout = QVBoxLayout(dlg)
+    txt = QTextEdit()
+    txt.setReadOnly(True)
+    txt.setPlainText(ticket[key] or "")
+    layout.addWidget(txt)
+    btn = QPushButton('Fechar')
+    btn.setFixedHeight(32)
+    btn.clicked.connect(dlg.accept)
+    layout.addWidget(btn, alignment=Qt.AlignmentFlag.AlignRight)
+    # até a janela estar pronta para aparecer; o tempo com ela aberta não conta
+    span.end(chars=len(ticket[key] or ""))
+    dlg.exec()
+
+def csv_save_path(parent, default_name):
+    """Pergunta onde salvar o CSV; o filtro .csv.gz ativa a compressão."""
+    path, selected = QFileDialog.getSaveFileName(
+        parent, "Salvar CSV", default_name, "CSV Files (*.csv);;CSV compactado (*.csv.gz)")
+    if path and '.gz' in selected and not path.endswith('.gz'):
+        path += '.gz'
+    return path
 
 # ----------------------- Login -----------------------
 class LoginWidget(QWidget):
-    def __init__(self, db, stacked):
+    def __init__(self, db, stacked, executor):
         super().__init__()
         self.db = db
         self.stacked = stacked
+        self.executor = executor
+        self._checking = False
+        self._login_span = None
         self.init_ui()
+        self.set_database(db)
+
+    def set_database(self, db):
+        """Os botões só funcionam depois que a MainWindow abre o banco."""
+        self.db = db
+        self._update_buttons()
+
+    def _update_buttons(self):
+        ready = self.db is not None
+        self.login_btn.setEnabled(ready and not self._checking)
+        self.login_btn.setText("Verificando..." if self._checking else "Entrar")
+        for btn in (self.forgot_btn, self.register_btn):
+            btn.setEnabled(ready)
 
     def init_ui(self):
         container = QFrame()
@@ -365,33 +436,50 @@ class LoginWidget(QWidget):
         self.forgot_btn.clicked.connect(self.on_forgot_password)
 
     def on_login(self):
+        if self._checking:
+            return
         email = self.email_field.text().strip()
         pw = self.password_field.text()
         reval = self.re_field.text().strip()
-        user = self.db.find_user_by_email(email)
-        if not user:
-            QMessageBox.warning(self, "Erro", "Usuário não encontrado.")
-            return
-        if user['re'] != reval:
-            QMessageBox.warning(self, "Erro", "RE não corresponde ao usuário.")
-            return
-        if user['password_hash'] != hash_password(pw):
-            QMessageBox.warning(self, "Erro", "Senha incorreta.")
+        # a verificação da senha (callme.auth) roda no DbExecutor; a tela segue respondendo
+        self._checking = True
+        self._update_buttons()
+        self._login_span = perf.span("ui.login")
+        task = self.executor.submit(auth.login, email, reval, pw)
+        task.finished.connect(self._on_login_checked)
+        task.failed.connect(self._on_login_failed)
+
+    def _on_login_checked(self, result):
+        self._checking = False
+        self._update_buttons()
+        user, error = result
+        self._login_span.end(ok=error is None)
+        if error:
+            QMessageBox.warning(self, "Erro", error)
             return
+        self.password_field.clear()
         if user['role'] == 'tecnico':
             self.stacked.parent().open_tech_home(user)
         else:
             self.stacked.parent().open_employee_home(user)
 
+    def _on_login_failed(self, error):
+        self._checking = False
+        self._update_buttons()
+        self._login_span.end(error=str(error))
+        QMessageBox.critical(self, "Erro", f"Falha ao verificar o login: {error}")
+
     def on_forgot_password(self):
-        dlg = PasswordRecoveryDialog(self.db, parent=self)
+        with perf.span("ui.dialog.password_recovery"):
+            dlg = PasswordRecoveryDialog(self.db, self.executor, parent=self)
         dlg.exec()
 
 # ----------------------- Diálogo de Recuperação de Senha -----------------------
 class PasswordRecoveryDialog(QDialog):
-    def __init__(self, db: Database, parent=None):
+    def __init__(self, db: Database, executor, parent=None):
         super().__init__(parent)
         self.db = db
+        self.executor = executor
         self.setWindowTitle("Recuperar senha")
         self.setFixedSize(420, 320)
         self.init_ui()
@@ -447,28 +535,30 @@ class PasswordRecoveryDialog(QDialog):
             QMessageBox.warning(self, "Erro", "As senhas não conferem.")
             return
 
-        user = self.db.find_user_by_email(email)
-        if not user:
-            QMessageBox.warning(self, "Erro", "Email não cadastrado.")
-            return
-        if user['re'] != reval:
-            QMessageBox.warning(self, "Erro", "RE não corresponde ao usuário.")
+        self.save_btn.setEnabled(False)
+        task = self.executor.submit(auth.reset_password, email, reval, pw)
+        task.finished.connect(self._on_saved)
+        task.failed.connect(self._on_save_failed)
+
+    def _on_saved(self, error):
+        self.save_btn.setEnabled(True)
+        if error:
+            QMessageBox.warning(self, "Erro", error)
             return
+        QMessageBox.information(self, "Sucesso", "Senha atualizada com sucesso.")
+        self.accept()
 
-        new_hash = hash_password(pw)
-        ok = self.db.update_password_by_email_re(email, reval, new_hash)
-        if ok:
-            QMessageBox.information(self, "Sucesso", "Senha atualizada com sucesso.")
-            self.accept()
-        else:
-            QMessageBox.critical(self, "Erro", "Falha ao atualizar senha. Verifique os dados e tente novamente.")
+    def _on_save_failed(self, error):
+        self.save_btn.setEnabled(True)
+        QMessageBox.critical(self, "Erro", "Falha ao atualizar senha. Verifique os dados e tente novamente.")
 
 # ----------------------- Registro -----------------------
 class RegisterWidget(QWidget):
-    def __init__(self, db, stacked):
+    def __init__(self, db, stacked, executor):
         super().__init__()
         self.db = db
         self.stacked = stacked
+        self.executor = executor
         self.init_ui()
 
     def init_ui(self):
@@ -528,23 +618,30 @@ class RegisterWidget(QWidget):
         if not (name and email and pw and reval):
             QMessageBox.warning(self, "Erro", "Preencha todos os campos.")
             return
-        re_row = self.db.check_re(reval)
-        if not re_row:
-            QMessageBox.warning(self, "Erro", "RE inválido.")
-            return
-        role = re_row['role']
-        ok = self.db.create_user(name, email, hash_password(pw), role, reval)
-        if not ok:
-            QMessageBox.warning(self, "Erro", "Email já cadastrado.")
+        self.create_btn.setEnabled(False)
+        task = self.executor.submit(auth.register, name, email, pw, reval)
+        task.finished.connect(self._on_created)
+        task.failed.connect(self._on_create_failed)
+
+    def _on_created(self, result):
+        self.create_btn.setEnabled(True)
+        role, error = result
+        if error:
+            QMessageBox.warning(self, "Erro", error)
             return
+        self.password_field.clear()
         QMessageBox.information(self, "Sucesso", f"Conta criada como {role}.")
         self.stacked.setCurrentIndex(0)
 
+    def _on_create_failed(self, error):
+        self.create_btn.setEnabled(True)
+        QMessageBox.critical(self, "Erro", f"Falha ao criar a conta: {error}")
+
 # ----------------------- Ticket Form (centralizado e largo) -----------------------
 class TicketForm(QWidget):
-    def __init__(self, db, user, parent_home=None):
+    def __init__(self, executor, user, parent_home=None):
         super().__init__()
-        self.db = db
+        self.executor = executor
         self.user = user
         self.parent_home = parent_home
         self.init_ui()
@@ -606,17 +703,32 @@ class TicketForm(QWidget):
         if not (title and desc):
             QMessageBox.warning(self, "Erro", "Preencha todos os campos.")
             return
-        self.db.create_ticket(title, desc, self.user['id'])
+        # gravado no DbExecutor: um banco ocupado não trava a tela
+        self.send_btn.setEnabled(False)
+        task = self.executor.submit(Database.create_ticket, title, desc, self.user['id'])
+        task.finished.connect(self._on_created)
+        task.failed.connect(self._on_create_failed)
+
+    def _on_created(self, tid):
+        self.send_btn.setEnabled(True)
         QMessageBox.information(self, "Sucesso", "Chamado criado!")
         if self.parent_home:
-            self.parent_home.load_tickets()
+            self.parent_home.refresh_changes()
         self.title_edit.clear()
         self.desc_edit.clear()
 
+    def _on_create_failed(self, error):
+        self.send_btn.setEnabled(True)
+        QMessageBox.critical(self, "Erro", f"Falha ao criar o chamado: {error}")
+
     def cancel(self):
         self.title_edit.clear()
         self.desc_edit.clear()
 
+    def set_user(self, user):
+        self.user = user
+        self.cancel()
+
 # ----------------------- Profile Form (reutilizável) -----------------------
 class ProfileForm(QWidget):
     def __init__(self, db, user):
@@ -685,13 +797,495 @@ class ProfileForm(QWidget):
         QMessageBox.information(self, "Sucesso", "Perfil atualizado!")
         self.user = self.db.get_user_by_id(self.user['id'])
 
+    def set_user(self, user):
+        self.user = user
+        self.name_edit.setText(user['name'])
+        self.email_edit.setText(user['email'])
+        self.re_label.setText(user['re'])
+        self.role_label.setText(user['role'])
+
+# ----------------------- Modelo da tabela de chamados -----------------------
+STATUS_COLORS = {
+    'Aberto': '#FF0000',
+    'Aguardando Técnico': '#FFA500',
+    'Em Atendimento': '#0055FF',
+    'Finalizado': '#008000'
+}
+
+class TicketTableModel(QAbstractTableModel):
+    """Modelo de chamados para QTableView.
+    Guarda apenas as linhas vindas do banco; os textos exibidos são
+    calculados sob demanda, somente para as linhas visíveis."""
+
+    # (tid, novo_status) - emitido quando o delegate de status confirma uma
+    # edição, ainda dentro de setData: conecte com QueuedConnection
+    statusEdited = pyqtSignal(int, str)
+    loadingChanged = pyqtSignal(bool)
+    loadFailed = pyqtSignal(object)
+    # a ordem pedida pelo cabeçalho mudou; quem carrega o modelo deve recarregar
+    orderChanged = pyqtSignal()
+
+    def __init__(self, columns, editable_status=False, parent=None):
+        super().__init__(parent)
+        self.columns = columns  # lista de (chave, cabeçalho)
+        self.editable_status = editable_status
+        # coluna exibida no lugar da descrição ('snippet' nos resultados de busca)
+        self.preview_key = 'description'
+        self._next_preview_key = 'description'
+        # ordem das linhas, (coluna, decrescente), aplicada pelo banco
+        self.order = DEFAULT_TICKET_ORDER
+        self._header = None
+        self._rows = []
+        self._index = {}
+        self._request_page = None
+        self._cursor = None
+        self._loading = False
+        self._generation = 0
+        self._status_col = next((i for i, (key, _) in enumerate(columns) if key == 'status'), -1)
+        self._colors = {status: QColor(color) for status, color in STATUS_COLORS.items()}
+        self._default_color = QColor('#000000')
+
+    def set_rows(self, rows):
+        self._generation += 1
+        self._set_loading(False)
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._reindex()
+        self.preview_key = 'description'
+        self._request_page = None
+        self._cursor = None
+        self.endResetModel()
+
+    def clear(self):
+        """Esvazia o modelo e volta à ordem padrão, sem pedir recarga."""
+        self.order = DEFAULT_TICKET_ORDER
+        if self._header is not None:
+            self._show_order()
+        self.set_rows([])
+
+    def load(self, request_page, preview_key='description'):
+        """Recarrega o modelo a partir de `request_page(cursor)`, que deve
+        devolver um DbTask cujo resultado é (linhas, próximo_cursor).
+        A primeira página substitui as linhas atuais; as demais são pedidas
+        pela view conforme a rolagem (fetchMore). Respostas de cargas
+        anteriores que cheguem atrasadas são descartadas.
+        preview_key é a coluna mostrada no lugar da descrição."""
+        self._generation += 1
+        self._request_page = request_page
+        self._next_preview_key = preview_key
+        self._cursor = None
+        self._request(None)
+
+    def _request(self, cursor):
+        generation = self._generation
+        self._set_loading(True)
+        # do pedido até as linhas entrarem no modelo (fila do executor inclusa)
+        span = perf.span("ui.load_tickets" if cursor is None else "ui.load_tickets.next_page")
+        task = self._request_page(cursor)
+        task.finished.connect(lambda result: self._on_page(generation, cursor is None, result, span))
+        task.failed.connect(lambda error: self._on_failed(generation, error))
+
+    def _on_page(self, generation, reset, result, span=None):
+        if generation != self._generation:
+            return
+        rows, self._cursor = result
+        if reset:
+            self.beginResetModel()
+            self._rows = list(rows)
+            self._reindex()
+            self.preview_key = self._next_preview_key
+            self.endResetModel()
+        elif rows:
+            # linhas que já entraram por patch_rows não são repetidas
+            rows = [t for t in rows if t['id'] not in self._index]
+            first = len(self._rows)
+            if rows:
+                self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+                self._rows.extend(rows)
+                self._index.update((t['id'], first + i) for i, t in enumerate(rows))
+                self.endInsertRows()
+        self._set_loading(False)
+        if span is not None:
+            span.end(rows=len(rows))
+
+    def _on_failed(self, generation, error):
+        if generation != self._generation:
+            return
+        self._cursor = None
+        self._set_loading(False)
+        self.loadFailed.emit(error)
+
+    def _set_loading(self, loading):
+        if loading != self._loading:
+            self._loading = loading
+            self.loadingChanged.emit(loading)
+
+    def is_loading(self):
+        return self._loading
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._cursor is not None and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if self.canFetchMore(parent):
+            self._request(self._cursor)
+
+    def row_at(self, row):
+        return self._rows[row]
+
+    def _reindex(self):
+        self._index = {t['id']: i for i, t in enumerate(self._rows)}
+
+    def column_of(self, key):
+        return next((i for i, (k, _) in enumerate(self.columns) if k == key), -1)
+
+    def set_order(self, key, descending):
+        if key in TICKET_SORT_COLUMNS and (key, descending) != self.order:
+            self.order = (key, descending)
+            self.orderChanged.emit()
+
+    def attach_header(self, header):
+        """Ordenação pelo cabeçalho feita no banco: o clique só muda a ordem
+        (emitindo orderChanged) e colunas sem índice para ordenar são
+        ignoradas. A view não ordena nada por conta própria."""
+        self._header = header
+        header.setSectionsClickable(True)
+        header.setSortIndicatorShown(True)
+        self._show_order()
+        header.sortIndicatorChanged.connect(self._on_sort_indicator)
+
+    def _show_order(self):
+        key, descending = self.order
+        self._header.blockSignals(True)
+        self._header.setSortIndicator(self.column_of(key), Qt.SortOrder.DescendingOrder if descending
+                                      else Qt.SortOrder.AscendingOrder)
+        self._header.blockSignals(False)
+
+    def _on_sort_indicator(self, section, order):
+        key = self.columns[section][0]
+        if key in TICKET_SORT_COLUMNS:
+            self.set_order(key, order == Qt.SortOrder.DescendingOrder)
+        else:
+            self._show_order()
+
+    def _sort_key(self, t):
+        return (t[self.order[0]] or "", t['id'])
+
+    def _insert_position(self, t):
+        """Posição de `t` na ordem atual da lista, ou None se ela cair depois
+        da última página carregada: nesse caso a linha chegará pela paginação."""
+        key = self._sort_key(t)
+        descending = self.order[1]
+        lo, hi = 0, len(self._rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            r = self._sort_key(self._rows[mid])
+            if (r > key) if descending else (r < key):
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == len(self._rows) and self._cursor is not None:
+            return None
+        return lo
+
+    def patch_rows(self, rows, keep=None, insert=True):
+        """Aplica linhas novas ou alteradas sem recarregar o modelo, mantendo
+        rolagem e seleção. Linhas que deixaram de passar em `keep` saem da
+        lista; com insert=True, linhas ainda ausentes entram na posição certa.
+        Uma linha cuja chave de ordenação mudou é movida."""
+        for t in rows:
+            i = self._index.get(t['id'])
+            moved = i is not None and self._sort_key(self._rows[i]) != self._sort_key(t)
+            if i is not None and (moved or (keep is not None and not keep(t))):
+                self.beginRemoveRows(QModelIndex(), i, i)
+                del self._rows[i]
+                self.endRemoveRows()
+                self._reindex()
+                i = None
+            if keep is not None and not keep(t):
+                continue
+            if i is not None:
+                self._rows[i] = t
+                self.dataChanged.emit(self.index(i, 0), self.index(i, len(self.columns) - 1))
+            elif insert or moved:
+                pos = self._insert_position(t)
+                if pos is not None:
+                    self.beginInsertRows(QModelIndex(), pos, pos)
+                    self._rows.insert(pos, t)
+                    self.endInsertRows()
+                    self._reindex()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.columns[section][1]
+        return None
+
+    # a view pede uma dezena de papéis por célula a cada pintura; os que o
+    # modelo não fornece são descartados antes de qualquer outro trabalho
+    _ROLES = frozenset((Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole,
+                        Qt.ItemDataRole.ForegroundRole))
+    # textos longos: as linhas trazem só o começo, em <chave>_preview
+    PREVIEW_COLUMNS = frozenset(('description', 'resolution'))
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if role not in self._ROLES or not index.isValid():
+            return None
+        t = self._rows[index.row()]
+        key = self.columns[index.column()][0]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            if key in self.PREVIEW_COLUMNS:
+                if key == 'description' and self.preview_key != 'description':
+                    return t[self.preview_key] or ""
+                text = t[key + '_preview'] or ""
+                return text[:DESC_PREVIEW_LEN] + ("..." if len(text) > DESC_PREVIEW_LEN else "")
+            value = t[key]
+            if key == 'id':
+                return str(value)
+            return value or ""
+        if role == Qt.ItemDataRole.ForegroundRole and key == 'status':
+            return self._colors.get(t['status'], self._default_color)
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if self.editable_status and index.column() == self._status_col:
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        # O modelo não grava no banco: apenas avisa quem o usa (TechHome),
+        # que confirma a alteração e recarrega as linhas. Retorna False
+        # porque o modelo continua como estava até essa recarga.
+        if role != Qt.ItemDataRole.EditRole or index.column() != self._status_col:
+            return False
+        t = self._rows[index.row()]
+        if value == t['status']:
+            return False
+        self.statusEdited.emit(t['id'], value)
+        return False
+
+class StatusDelegate(QStyledItemDelegate):
+    """Editor de status criado somente quando a célula entra em edição,
+    em vez de um QComboBox vivo por linha. Fora da edição, o status é
+    desenhado como texto colorido, com uma seta quando pode ser alterado."""
+
+    ARROW = "\u25BE"
+
+    def paint(self, painter, option, index):
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        text, opt.text = opt.text, ""
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        # fundo, seleção e foco continuam a cargo do estilo
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, opt, painter, opt.widget)
+        painter.save()
+        font = QFont(opt.font)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(index.data(Qt.ItemDataRole.ForegroundRole) or opt.palette.text().color())
+        rect = opt.rect.adjusted(6, 0, -6, 0)
+        if index.flags() & Qt.ItemFlag.ItemIsEditable:
+            painter.drawText(rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignRight, self.ARROW)
+            rect.adjust(0, 0, -painter.fontMetrics().horizontalAdvance(self.ARROW) - 4, 0)
+        text = painter.fontMetrics().elidedText(text, Qt.TextElideMode.ElideRight, rect.width())
+        painter.drawText(rect, Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft, text)
+        painter.restore()
+
+    def createEditor(self, parent, option, index):
+        combo = QComboBox(parent)
+        combo.addItems(STATUS_OPTIONS)
+        combo.activated.connect(lambda _, c=combo: self._commit(c))
+        return combo
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentText(index.data(Qt.ItemDataRole.EditRole))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.ItemDataRole.EditRole)
+
+    def _commit(self, editor):
+        self.commitData.emit(editor)
+        self.closeEditor.emit(editor)
+
+# ----------------------- Indicadores (aba do técnico) -----------------------
+# (texto, dias) dos períodos oferecidos; o padrão é o segundo
+DASHBOARD_PERIODS = [("Últimos 7 dias", 7), ("Últimos 30 dias", 30), ("Últimos 90 dias", 90), ("Último ano", 365)]
+
+def format_hours(hours):
+    if hours is None:
+        return "—"
+    if hours >= 48:
+        return f"{hours / 24:.1f} dias"
+    return f"{hours:.1f} h"
+
+class BacklogChart(QWidget):
+    """Backlog ao fim de cada dia, desenhado como linha, com o máximo e as
+    datas das pontas; sem depender do QtCharts."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.points = []  # (dia, backlog)
+        self.setMinimumHeight(180)
+
+    def set_points(self, points):
+        self.points = points
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        rect = self.rect().adjusted(50, 10, -10, -24)
+        painter.setPen(QColor('#cccccc'))
+        painter.drawRect(rect)
+        if len(self.points) < 2 or rect.width() <= 0:
+            painter.end()
+            return
+        top = max(backlog for _, backlog in self.points) or 1
+        step = rect.width() / (len(self.points) - 1)
+        line = [QPointF(rect.left() + i * step, rect.bottom() - backlog / top * rect.height())
+                for i, (_, backlog) in enumerate(self.points)]
+        painter.setPen(QPen(QColor(STATUS_COLORS['Em Atendimento']), 2))
+        painter.drawPolyline(line)
+        painter.setPen(QColor('#555555'))
+        align = Qt.AlignmentFlag
+        painter.drawText(QRectF(0, rect.top() - 6, 44, 14), align.AlignRight, str(top))
+        painter.drawText(QRectF(0, rect.bottom() - 8, 44, 14), align.AlignRight, "0")
+        painter.drawText(QRectF(rect.left(), rect.bottom() + 4, 100, 16), align.AlignLeft, self.points[0][0])
+        painter.drawText(QRectF(rect.right() - 100, rect.bottom() + 4, 100, 16), align.AlignRight, self.points[-1][0])
+        painter.end()
+
+class DashboardWidget(QWidget):
+    """Tempo em cada status, tempo até a resolução e backlog por dia
+    (callme.analytics), calculados no DbExecutor; só é carregado quando a
+    aba é aberta ou o período muda."""
+
+    def __init__(self, executor, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self._generation = 0
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        top = QHBoxLayout()
+        title = QLabel("Indicadores")
+        title.setStyleSheet("font-size:25px; font-weight:bold; color:#333;")
+        top.addWidget(title)
+        top.addStretch()
+        self.period_box = QComboBox()
+        for text, days in DASHBOARD_PERIODS:
+            self.period_box.addItem(text, days)
+        self.period_box.setCurrentIndex(1)
+        self.period_box.setFixedHeight(34)
+        self.period_box.currentIndexChanged.connect(lambda _: self.load())
+        top.addWidget(self.period_box)
+        self.refresh_btn = QPushButton("Atualizar")
+        self.refresh_btn.setFixedHeight(34)
+        self.refresh_btn.clicked.connect(self.load)
+        top.addWidget(self.refresh_btn)
+        layout.addLayout(top)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        summary = QHBoxLayout()
+        self.summary_labels = {}
+        for key, text in (('resolved', "Finalizados"), ('mean', "Média até finalizar"), ('p50', "Mediana"),
+                          ('p90', "90%"), ('p95', "95%"), ('sla', f"Dentro do SLA ({SLA_RESOLUTION_HOURS} h)")):
+            box = QFrame()
+            box.setObjectName("panel")
+            box_layout = QVBoxLayout(box)
+            caption = QLabel(text)
+            caption.setStyleSheet("color:#555555;")
+            value = QLabel("—")
+            value.setStyleSheet("font-size:20px; font-weight:bold; color:#333;")
+            box_layout.addWidget(caption)
+            box_layout.addWidget(value)
+            summary.addWidget(box)
+            self.summary_labels[key] = value
+        layout.addLayout(summary)
+
+        self.status_table = QTableWidget(0, 4)
+        self.status_table.setHorizontalHeaderLabels(["Status", "Passagens", "Tempo total", "Média por passagem"])
+        self.status_table.verticalHeader().setVisible(False)
+        self.status_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.status_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.status_table.setMaximumHeight(180)
+        layout.addWidget(self.status_table)
+
+        layout.addWidget(QLabel("Chamados em aberto ao fim de cada dia"))
+        self.backlog_chart = BacklogChart()
+        layout.addWidget(self.backlog_chart, 1)
+
+    def load(self):
+        self._generation += 1
+        generation = self._generation
+        start, end = analytics.last_days(self.period_box.currentData())
+        self.status_label.setText("Calculando...")
+        span = perf.span("ui.dashboard", days=self.period_box.currentData())
+        task = self.executor.submit(analytics.dashboard, start, end)
+        task.finished.connect(lambda result: self._on_loaded(result, generation, span))
+        task.failed.connect(lambda error: self._on_failed(error, generation))
+
+    def _on_loaded(self, result, generation, span=None):
+        if generation != self._generation:
+            return
+        resolution = result['resolution']
+        percentiles = resolution['percentiles']
+        labels = self.summary_labels
+        labels['resolved'].setText(str(resolution['resolved']))
+        labels['mean'].setText(format_hours(resolution['mean_hours']))
+        for p in (50, 90, 95):
+            labels[f'p{p}'].setText(format_hours(percentiles.get(p)))
+        within = resolution['within_sla']
+        labels['sla'].setText("—" if within is None else f"{within:.0%}")
+
+        rows = result['time_in_status']
+        self.status_table.setRowCount(len(rows))
+        for i, (status, values) in enumerate(rows.items()):
+            item = QTableWidgetItem(status)
+            item.setForeground(QColor(STATUS_COLORS.get(status, '#333333')))
+            self.status_table.setItem(i, 0, item)
+            self.status_table.setItem(i, 1, QTableWidgetItem(str(values['visits'])))
+            self.status_table.setItem(i, 2, QTableWidgetItem(format_hours(values['hours'])))
+            self.status_table.setItem(i, 3, QTableWidgetItem(format_hours(values['mean_hours'])))
+
+        self.backlog_chart.set_points([(day, backlog) for day, _, _, backlog in result['backlog']])
+        self.status_label.setText(f"Calculado em {result['elapsed']:.1f} s")
+        if span is not None:
+            span.end()
+
+    def _on_failed(self, error, generation):
+        if generation == self._generation:
+            self.status_label.setText(f"Falha ao calcular os indicadores: {error}")
+
+    def clear(self):
+        """Descarta resultados pendentes e apaga os números exibidos."""
+        self._generation += 1
+        for label in self.summary_labels.values():
+            label.setText("—")
+        self.status_table.setRowCount(0)
+        self.backlog_chart.set_points([])
+        self.status_label.clear()
+
 # ----------------------- Employee Home (refatorado painel) -----------------------
 class EmployeeHome(QWidget):
-    def __init__(self, db, stacked, user):
+    def __init__(self, db, stacked, user, executor):
         super().__init__()
         self.db = db
+        self.executor = executor
         self.stacked = stacked
         self.user = user
+        self.feed = ChangeFeed(executor, parent=self)
+        self.feed.ticketsChanged.connect(self._apply_changes)
+        self.feed.resyncNeeded.connect(self.load_tickets)
         self.init_ui()
         self.load_tickets()
 
@@ -704,8 +1298,12 @@ class EmployeeHome(QWidget):
         header_font.setBold(True)
         self.ticket_table.horizontalHeader().setFont(header_font)
         self.ticket_table.verticalHeader().setVisible(False)
+        # Altura fixa de linha: a view não precisa medir cada linha do modelo
+        self.ticket_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.ticket_table.verticalHeader().setDefaultSectionSize(32)
         self.ticket_table.setShowGrid(False)
         self.ticket_table.setAlternatingRowColors(True)
+        self.ticket_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
 
     def init_ui(self):
         root = QVBoxLayout(self)
@@ -747,11 +1345,25 @@ class EmployeeHome(QWidget):
 
         self.tickets_tab = QWidget()
         tickets_layout = QVBoxLayout(self.tickets_tab)
-        self.ticket_table = QTableWidget()
-        self.ticket_table.setColumnCount(5)
-        self.ticket_table.setHorizontalHeaderLabels(["ID","Título","Descrição","Status","Data"])
+        self.ticket_model = TicketTableModel([
+            ('id', "ID"), ('title', "Título"), ('description', "Descrição"),
+            ('status', "Status"), ('created_at', "Data"),
+        ], parent=self)
+        self.ticket_table = QTableView()
+        self.ticket_table.setModel(self.ticket_model)
+        self.ticket_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.ticket_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.ticket_model.attach_header(self.ticket_table.horizontalHeader())
+        self.ticket_model.orderChanged.connect(self.load_tickets)
+        self.counts_label = QLabel()
+        self.counts_label.setStyleSheet("color:#555;")
+        tickets_layout.addWidget(self.counts_label)
         tickets_layout.addWidget(self.ticket_table)
+        self.loading_label = QLabel("Carregando chamados...")
+        self.loading_label.setVisible(False)
+        tickets_layout.addWidget(self.loading_label)
+        self.ticket_model.loadingChanged.connect(self.loading_label.setVisible)
+        self.ticket_model.loadFailed.connect(self.on_load_failed)
 
         btn_row = QHBoxLayout()
         self.export_csv_btn_emp = QPushButton("Exportar CSV")
@@ -769,7 +1381,7 @@ class EmployeeHome(QWidget):
 
         self.open_tab = QWidget()
         open_layout = QVBoxLayout(self.open_tab)
-        self.ticket_form = TicketForm(self.db, self.user, self)
+        self.ticket_form = TicketForm(self.executor, self.user, self)
         open_layout.addWidget(self.ticket_form)
         self.tabs.addTab(self.open_tab, "Abrir Chamado")
 
@@ -780,7 +1392,7 @@ class EmployeeHome(QWidget):
         self.tabs.addTab(self.profile_tab, "Perfil")
 
         self.profile_form.save_btn.clicked.connect(self.on_profile_saved)
-        self.ticket_table.cellClicked.connect(self.on_cell_clicked)
+        self.ticket_table.clicked.connect(self.on_cell_clicked)
         self.export_csv_btn_emp.clicked.connect(self.export_csv_emp)
         self.export_pdf_btn_emp.clicked.connect(self.export_pdf_emp)
 
@@ -791,71 +1403,82 @@ class EmployeeHome(QWidget):
         self.welcome_label.setStyleSheet("font-size:25px; font-weight:bold; color:#333;")
         self.load_tickets()
 
+    def showEvent(self, event):
+        # só verifica alterações enquanto a tela está visível
+        self.feed.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.feed.stop()
+        super().hideEvent(event)
+
     def load_tickets(self):
-        status_colors = {
-            'Aberto': '#FF0000',
-            'Aguardando Técnico': '#FFA500',
-            'Em Atendimento': '#0055FF',
-            'Finalizado': '#008000'
-        }
-        
-        tickets = self.db.get_tickets_for_user(self.user)
-        self.ticket_table.setRowCount(0)
-        for t in tickets:
-            row = self.ticket_table.rowCount()
-            self.ticket_table.insertRow(row)
-            self.ticket_table.setItem(row,0,QTableWidgetItem(str(t['id'])))
-            self.ticket_table.setItem(row,1,QTableWidgetItem(t['title']))
-            desc_preview = t['description'][:120] + ("..." if len(t['description'])>120 else "")
-            item_desc = QTableWidgetItem(desc_preview)
-            item_desc.setData(Qt.ItemDataRole.UserRole, t['description'])
-            item_desc.setFlags(item_desc.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.ticket_table.setItem(row,2,item_desc)
-            status_item = QTableWidgetItem(t['status'])
-            status_item.setFlags(status_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            status_color = status_colors.get(t['status'], '#000000')
-            status_item.setForeground(QColor(status_color))
-            self.ticket_table.setItem(row,3,status_item)
-            self.ticket_table.setItem(row,4,QTableWidgetItem(t['created_at']))
-
-    def on_cell_clicked(self, row, column):
-        if column == 2:
-            item = self.ticket_table.item(row, column)
-            if not item:
-                return
-            full_text = item.data(Qt.ItemDataRole.UserRole) or item.text()
-            dlg = QDialog(self)
-            dlg.setWindowTitle('Descrição completa')
-            dlg.setFixedSize(700, 420)
-            layout = QVBoxLayout(dlg)
-            txt = QTextEdit()
-            txt.setReadOnly(True)
-            txt.setPlainText(full_text)
-            layout.addWidget(txt)
-            btn = QPushButton('Fechar')
-            btn.setFixedHeight(32)
-            btn.clicked.connect(dlg.accept)
-            layout.addWidget(btn, alignment=Qt.AlignmentFlag.AlignRight)
-            dlg.exec()
+        self.ticket_model.load(partial(self.executor.submit, Database.get_tickets_page, self.user, None,
+                                       order=self.ticket_model.order))
+        self.refresh_counts()
+
+    def refresh_changes(self):
+        """Aplica as alterações recentes sem recarregar a tabela, inclusive
+        as gravadas pelo DbExecutor (ver ChangeFeed)."""
+        self.feed.poll(force=True)
+
+    def _apply_changes(self, rows):
+        self.db.details.invalidate(t['id'] for t in rows)
+        self.ticket_model.patch_rows(rows, keep=lambda t: t['created_by'] == self.user['id'])
+        self.refresh_counts()
+
+    def refresh_counts(self):
+        self.executor.submit(Database.get_ticket_counts, self.user['id']).finished.connect(self._show_counts)
+
+    def _show_counts(self, counts):
+        parts = [f"{status}: {counts.get(status, 0)}" for status in STATUS_OPTIONS]
+        self.counts_label.setText(f"Total: {counts['Todos']}   ·   " + "   ·   ".join(parts))
+
+    def on_load_failed(self, error):
+        QMessageBox.critical(self, "Erro", f"Falha ao carregar chamados: {error}")
+
+    def on_cell_clicked(self, index):
+        key = self.ticket_model.columns[index.column()][0]
+        if key in TicketTableModel.PREVIEW_COLUMNS:
+            show_ticket_text(self, self.db, self.ticket_model.row_at(index.row())['id'], key)
 
     def export_csv_emp(self):
-        path,_ = QFileDialog.getSaveFileName(self, "Salvar CSV","my_tickets.csv","CSV Files (*.csv)")
+        path = csv_save_path(self, "my_tickets.csv")
         if path:
-            self.db.export_tickets_csv(path, user_id=self.user['id'])
-            QMessageBox.information(self, "Sucesso","Seus tickets foram exportados em CSV.")
+            start_export(self, self.db, Database.export_tickets_csv, path,
+                         "Seus tickets foram exportados em CSV.", user_id=self.user['id'])
 
     def export_pdf_emp(self):
         path,_ = QFileDialog.getSaveFileName(self, "Salvar PDF","my_tickets.pdf","PDF Files (*.pdf)")
         if path:
-            try:
-                self.db.export_tickets_pdf(path, user_id=self.user['id'])
-                QMessageBox.information(self, "Sucesso","Seus tickets foram exportados em PDF.")
-            except Exception as e:
-                QMessageBox.critical(self, "Erro", f"Falha ao gerar PDF: {e}")
+            start_export(self, self.db, Database.export_tickets_pdf, path,
+                         "Seus tickets foram exportados em PDF.", user_id=self.user['id'])
+
+    def bind_user(self, user):
+        """Reaproveita a tela para um novo login (ver MainWindow.open_home)."""
+        self.user = user
+        self.welcome_label.setText(f"Bem-vindo, {user['name']}!")
+        self.ticket_form.set_user(user)
+        self.profile_form.set_user(user)
+        self.tabs.setCurrentIndex(0)
+        self.feed.reset()
+        self.load_tickets()
+
+    def end_session(self):
+        """Volta ao login sem deixar os dados do usuário na tela escondida."""
+        self.stacked.setCurrentIndex(0)
+        self.suspend()
+
+    def suspend(self):
+        """Para de verificar alterações e solta os chamados carregados; a
+        tela fica montada para o próximo login (ver MainWindow.open_home)."""
+        self.feed.stop()
+        self.ticket_model.clear()
+        self.counts_label.clear()
 
     def logout(self):
         if ConfirmDialog.ask(self, "Deseja realmente sair do sistema?"):
-            self.stacked.setCurrentIndex(0)
+            self.end_session()
 
 # ----------------------- Tech Home (com filtro e perfil no topo) -----------------------
 
@@ -884,14 +1507,18 @@ if __name__ == "__main__":
 
 
 class TechHome(QWidget):
-    STATUS_OPTIONS = ["Aberto","Aguardando Técnico","Em Atendimento","Finalizado"]
+    STATUS_OPTIONS = STATUS_OPTIONS
 
-    def __init__(self, db, stacked, user):
+    def __init__(self, db, stacked, user, executor):
         super().__init__()
         self.db = db
+        self.executor = executor
         self.stacked = stacked
         self.user = user
         self.current_filter = "Todos"
+        self.feed = ChangeFeed(executor, parent=self)
+        self.feed.ticketsChanged.connect(self._apply_changes)
+        self.feed.resyncNeeded.connect(self.load_tickets)
         self.init_ui()
         self.load_tickets()
 
@@ -904,8 +1531,12 @@ class TechHome(QWidget):
         header_font.setBold(True)
         self.ticket_table.horizontalHeader().setFont(header_font)
         self.ticket_table.verticalHeader().setVisible(False)
+        # Altura fixa de linha: a view não precisa medir cada linha do modelo
+        self.ticket_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.ticket_table.verticalHeader().setDefaultSectionSize(32)
         self.ticket_table.setShowGrid(False)
         self.ticket_table.setAlternatingRowColors(True)
+        self.ticket_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
 
     def init_ui(self):
         main_layout = QVBoxLayout(self)
@@ -923,19 +1554,22 @@ class TechHome(QWidget):
         top_layout.addWidget(logo_label)
 
         self.chamados_btn = QPushButton("Chamados")
+        self.dashboard_btn = QPushButton("Indicadores")
         self.perfil_btn = QPushButton("Meu Perfil")
         self.logout_btn = QPushButton("Sair")
         self.logout_btn.setFixedWidth(100)
-        for b in (self.chamados_btn, self.perfil_btn, self.logout_btn):
+        for b in (self.chamados_btn, self.dashboard_btn, self.perfil_btn, self.logout_btn):
             b.setFixedHeight(36)
 
         top_layout.addWidget(self.chamados_btn)
+        top_layout.addWidget(self.dashboard_btn)
         top_layout.addWidget(self.perfil_btn)
         top_layout.addStretch()
         top_layout.addWidget(self.logout_btn)
         main_layout.addLayout(top_layout)
 
         self.chamados_btn.clicked.connect(self.show_chamados)
+        self.dashboard_btn.clicked.connect(self.show_dashboard)
         self.perfil_btn.clicked.connect(self.show_perfil)
         self.logout_btn.clicked.connect(self.logout)
 
@@ -954,43 +1588,103 @@ class TechHome(QWidget):
         lbl_filter.setFixedWidth(120)
         filter_layout.addWidget(lbl_filter)
         self.filter_box = QComboBox()
-        self.filter_box.addItems(["Todos"] + self.STATUS_OPTIONS)
+        # o texto mostra a contagem; o status fica no dado do item
+        for status in ["Todos"] + self.STATUS_OPTIONS:
+            self.filter_box.addItem(status, status)
         self.filter_box.setFixedHeight(34)
         self.filter_box.setMinimumWidth(200)
         filter_layout.addWidget(self.filter_box)
+        filter_layout.addSpacing(12)
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Buscar em título, descrição e resolução")
+        self.search_edit.setToolTip(
+            f"Mostra até {SEARCH_LIMIT} chamados, os mais relevantes entre as {SEARCH_WINDOW}"
+            " ocorrências mais recentes. Para achar um chamado antigo, use termos mais específicos.")
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.setMinimumWidth(320)
+        filter_layout.addWidget(self.search_edit)
         filter_layout.addStretch()
         chamados_layout.addLayout(filter_layout)
 
-        self.filter_box.currentTextChanged.connect(self.apply_filter)
-
-        self.ticket_table = QTableWidget()
-        self.ticket_table.setColumnCount(7)
-        self.ticket_table.setHorizontalHeaderLabels(["ID","Título","Descrição","Status","Criado por","Data","Resolução"])
+        # a busca só roda quando a digitação pausa
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(250)
+        self.search_timer.timeout.connect(self.load_tickets)
+        self.search_edit.textChanged.connect(self.search_timer.start)
+
+        self.filter_box.currentIndexChanged.connect(lambda _: self.apply_filter(self.filter_box.currentData()))
+
+        self.ticket_model = TicketTableModel([
+            ('id', "ID"), ('title', "Título"), ('description', "Descrição"),
+            ('status', "Status"), ('creator_name', "Criado por"),
+            ('created_at', "Data"), ('resolution', "Resolução"),
+        ], editable_status=True, parent=self)
+        # enfileirado: o editor fecha antes dos diálogos e da gravação
+        self.ticket_model.statusEdited.connect(self.on_status_changed, Qt.ConnectionType.QueuedConnection)
+        self.ticket_table = QTableView()
+        self.ticket_table.setModel(self.ticket_model)
+        self.status_delegate = StatusDelegate(self.ticket_table)
+        self.ticket_table.setItemDelegateForColumn(3, self.status_delegate)
+        self.ticket_table.setEditTriggers(
+            QAbstractItemView.EditTrigger.DoubleClicked
+            | QAbstractItemView.EditTrigger.SelectedClicked
+            | QAbstractItemView.EditTrigger.EditKeyPressed
+        )
         self.ticket_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.ticket_model.attach_header(self.ticket_table.horizontalHeader())
+        self.ticket_model.orderChanged.connect(self.load_tickets)
         chamados_layout.addWidget(self.ticket_table)
+        self.loading_label = QLabel("Carregando chamados...")
+        self.loading_label.setVisible(False)
+        chamados_layout.addWidget(self.loading_label)
+        self.ticket_model.loadingChanged.connect(self.loading_label.setVisible)
+        self.ticket_model.loadFailed.connect(self.on_load_failed)
         self._style_table()
 
         btn_layout = QHBoxLayout()
         self.refresh_btn = QPushButton("Atualizar")
         self.export_btn = QPushButton("Exportar CSV")
         self.export_pdf_btn = QPushButton("Exportar PDF")
-        for b in (self.refresh_btn, self.export_btn, self.export_pdf_btn):
+        self.import_btn = QPushButton("Importar")
+        for b in (self.refresh_btn, self.export_btn, self.export_pdf_btn, self.import_btn):
             b.setFixedHeight(40)
             b.setMinimumWidth(140)
         btn_layout.addWidget(self.refresh_btn)
         btn_layout.addWidget(self.export_btn)
         btn_layout.addWidget(self.export_pdf_btn)
+        btn_layout.addWidget(self.import_btn)
         btn_layout.addStretch()
+        # ações em lote sobre as linhas selecionadas (Ctrl/Shift + clique)
+        self.selection_label = QLabel()
+        self.bulk_status_box = QComboBox()
+        self.bulk_status_box.addItems(self.STATUS_OPTIONS)
+        self.bulk_status_box.setFixedHeight(40)
+        self.bulk_apply_btn = QPushButton("Alterar selecionados")
+        self.bulk_apply_btn.setFixedHeight(40)
+        self.bulk_apply_btn.setMinimumWidth(180)
+        self.bulk_apply_btn.setEnabled(False)
+        btn_layout.addWidget(self.selection_label)
+        btn_layout.addWidget(self.bulk_status_box)
+        btn_layout.addWidget(self.bulk_apply_btn)
         chamados_layout.addLayout(btn_layout)
 
         self.refresh_btn.clicked.connect(self.load_tickets)
         self.export_btn.clicked.connect(self.export_csv)
         self.export_pdf_btn.clicked.connect(self.export_pdf)
+        self.import_btn.clicked.connect(self.import_tickets)
+        self.bulk_apply_btn.clicked.connect(self.apply_bulk_status)
 
-        self.ticket_table.cellClicked.connect(self.on_cell_clicked)
+        self.ticket_table.clicked.connect(self.on_cell_clicked)
+        self.ticket_table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.ticket_table.selectionModel().selectionChanged.connect(self.update_bulk_actions)
+        self.ticket_model.modelReset.connect(self.update_bulk_actions)
 
         self.inner_stack.addWidget(self.chamados_widget)
 
+        self.dashboard_widget = DashboardWidget(self.executor)
+        self.inner_stack.addWidget(self.dashboard_widget)
+
         self.perfil_widget = ProfileForm(self.db, self.user)
         self.perfil_widget.save_btn.clicked.connect(self.on_profile_saved)
         self.inner_stack.addWidget(self.perfil_widget)
@@ -1001,6 +1695,10 @@ class TechHome(QWidget):
         self.inner_stack.setCurrentWidget(self.chamados_widget)
         self.load_tickets()
 
+    def show_dashboard(self):
+        self.inner_stack.setCurrentWidget(self.dashboard_widget)
+        self.dashboard_widget.load()
+
     def show_perfil(self):
         self.inner_stack.setCurrentWidget(self.perfil_widget)
 
@@ -1008,112 +1706,173 @@ class TechHome(QWidget):
         self.current_filter = status
         self.load_tickets()
 
+    def showEvent(self, event):
+        # só verifica alterações enquanto a tela está visível
+        self.feed.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.feed.stop()
+        super().hideEvent(event)
+
     def load_tickets(self):
-        status_colors = {
-            'Aberto': '#FF0000',
-            'Aguardando Técnico': '#FFA500',
-            'Em Atendimento': '#0055FF',
-            'Finalizado': '#008000'
-        }
-        
-        tickets = self.db.get_tickets_for_user(self.user, self.current_filter)
-        self.ticket_table.setRowCount(0)
-        for t in tickets:
-            row = self.ticket_table.rowCount()
-            self.ticket_table.insertRow(row)
-            self.ticket_table.setItem(row,0,QTableWidgetItem(str(t['id'])))
-            self.ticket_table.setItem(row,1,QTableWidgetItem(t['title']))
-            desc_preview = t['description'][:120] + ("..." if len(t['description'])>120 else "")
-            item_desc = QTableWidgetItem(desc_preview)
-            item_desc.setData(Qt.ItemDataRole.UserRole, t['description'])
-            self.ticket_table.setItem(row,2,item_desc)
-            status_combo = QComboBox()
-            status_combo.addItems(self.STATUS_OPTIONS)
-            status_combo.setCurrentText(t['status'])
-            status_color = status_colors.get(t['status'], '#000000')
-            status_combo.setStyleSheet(f"color: {status_color};")
-            status_combo.tid = t['id']
-            status_combo.currentTextChanged.connect(lambda s, combo=status_combo: self.on_status_changed(combo.tid, s))
-            self.ticket_table.setCellWidget(row,3,status_combo)
-            self.ticket_table.setItem(row,4,QTableWidgetItem(t['creator_name']))
-            self.ticket_table.setItem(row,5,QTableWidgetItem(t['created_at']))
-            self.ticket_table.setItem(row,6,QTableWidgetItem(t['resolution'] or ""))
+        query = self.search_edit.text().strip()
+        if query:
+            status = self.current_filter
+            self.ticket_model.load(lambda cursor: self.executor.submit(
+                lambda db: (db.search_tickets(query, status), None)), preview_key='snippet')
+        else:
+            self.ticket_model.load(partial(self.executor.submit, Database.get_tickets_page, self.user,
+                                           self.current_filter, order=self.ticket_model.order))
+        self.refresh_counts()
+
+    def refresh_counts(self):
+        self.executor.submit(Database.get_ticket_counts).finished.connect(self._show_counts)
+
+    def _show_counts(self, counts):
+        for i in range(self.filter_box.count()):
+            status = self.filter_box.itemData(i)
+            self.filter_box.setItemText(i, f"{status} ({counts.get(status, 0)})")
+
+    def _matches_filter(self, t):
+        return self.current_filter == "Todos" or t['status'] == self.current_filter
+
+    def refresh_changes(self):
+        """Aplica as alterações recentes sem recarregar a tabela, inclusive
+        as gravadas pelo DbExecutor (ver ChangeFeed)."""
+        self.feed.poll(force=True)
+
+    def _apply_changes(self, rows):
+        self.db.details.invalidate(t['id'] for t in rows)
+        if self.search_edit.text().strip():
+            # resultados de busca vêm ordenados por relevância e com trecho
+            # destacado; refazer a busca (poucas linhas) é mais simples
+            self.load_tickets()
+            return
+        self.ticket_model.patch_rows(rows, keep=self._matches_filter)
+        self.refresh_counts()
+
+    def on_load_failed(self, error):
+        QMessageBox.critical(self, "Erro", f"Falha ao carregar chamados: {error}")
+
+    def ask_resolution(self):
+        """Pede a resolução de um chamado finalizado; None se cancelado."""
+        resolution = None
+        span = perf.span("ui.dialog.resolution")
+        dlg = QDialog(self)
+        dlg.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dlg.setWindowTitle('Observações / Resolução')
+        dlg.setFixedSize(600, 360)
+        layout = QVBoxLayout(dlg)
+        lbl = QLabel('Informe as observações / resolução (visível para o usuário):')
+        layout.addWidget(lbl)
+        txt = QTextEdit()
+        txt.setPlaceholderText('Descreva a resolução...')
+        layout.addWidget(txt)
+        btns = QHBoxLayout()
+        btns.addStretch()
+        ok = QPushButton('Salvar')
+        cancel = QPushButton('Cancelar')
+        ok.setFixedHeight(36)
+        cancel.setFixedHeight(36)
+        btns.addWidget(cancel)
+        btns.addWidget(ok)
+        layout.addLayout(btns)
+
+        def on_ok():
+            nonlocal resolution
+            resolution = txt.toPlainText().strip()
+            dlg.accept()
+
+        def on_cancel():
+            dlg.reject()
+
+        ok.clicked.connect(on_ok)
+        cancel.clicked.connect(on_cancel)
+
+        span.end()
+        if dlg.exec() != QDialog.DialogCode.Accepted:
+            return None
+        return resolution
 
     def on_status_changed(self, tid, status):
         resolution = None
         if status == 'Finalizado':
-            dlg = QDialog(self)
-            dlg.setWindowTitle('Observações / Resolução')
-            dlg.setFixedSize(600, 360)
-            layout = QVBoxLayout(dlg)
-            lbl = QLabel('Informe as observações / resolução (visível para o usuário):')
-            layout.addWidget(lbl)
-            txt = QTextEdit()
-            txt.setPlaceholderText('Descreva a resolução...')
-            layout.addWidget(txt)
-            btns = QHBoxLayout()
-            btns.addStretch()
-            ok = QPushButton('Salvar')
-            cancel = QPushButton('Cancelar')
-            ok.setFixedHeight(36)
-            cancel.setFixedHeight(36)
-            btns.addWidget(cancel)
-            btns.addWidget(ok)
-            layout.addLayout(btns)
-
-            def on_ok():
-                nonlocal resolution
-                resolution = txt.toPlainText().strip()
-                dlg.accept()
-
-            def on_cancel():
-                dlg.reject()
-
-            ok.clicked.connect(on_ok)
-            cancel.clicked.connect(on_cancel)
-
-            if dlg.exec() != QDialog.DialogCode.Accepted:
-                self.load_tickets()
+            resolution = self.ask_resolution()
+            # cancelado: o modelo não foi alterado, a linha continua como estava
+            if resolution is None:
                 return
 
-        self.db.update_ticket_status(tid, status, resolution)
-        QMessageBox.information(self, 'Sucesso', f'Status do chamado {tid} atualizado para "{status}".')
-        self.load_tickets()
+        task = self.executor.submit(Database.update_ticket_status, tid, status, resolution)
+        task.finished.connect(lambda updated: self._on_status_saved(tid, status, updated))
+        task.failed.connect(lambda error: QMessageBox.critical(
+            self, 'Erro', f'O status do chamado {tid} não foi alterado: {error}'))
 
-    def on_cell_clicked(self, row, column):
-        if column == 2:
-            item = self.ticket_table.item(row, column)
-            if not item:
+    def _on_status_saved(self, tid, status, updated):
+        if updated:
+            QMessageBox.information(self, 'Sucesso', f'Status do chamado {tid} atualizado para "{status}".')
+        else:
+            QMessageBox.warning(self, 'Atenção', f'O chamado {tid} não existe mais.')
+        self.refresh_changes()
+
+    def selected_ticket_ids(self):
+        rows = self.ticket_table.selectionModel().selectedRows()
+        return [self.ticket_model.row_at(index.row())['id'] for index in rows]
+
+    def update_bulk_actions(self):
+        count = len(self.ticket_table.selectionModel().selectedRows())
+        self.selection_label.setText(f"{count} selecionado(s)" if count else "")
+        self.bulk_apply_btn.setEnabled(count > 0)
+
+    def apply_bulk_status(self):
+        ids = self.selected_ticket_ids()
+        status = self.bulk_status_box.currentText()
+        if not ids or not ConfirmDialog.ask(self, f'Alterar {len(ids)} chamado(s) para "{status}"?'):
+            return
+        resolution = None
+        if status == 'Finalizado':
+            resolution = self.ask_resolution()
+            if resolution is None:
                 return
-            full_text = item.data(Qt.ItemDataRole.UserRole) or item.text()
-            dlg = QDialog(self)
-            dlg.setWindowTitle('Descrição completa')
-            dlg.setFixedSize(700, 420)
-            layout = QVBoxLayout(dlg)
-            txt = QTextEdit()
-            txt.setReadOnly(True)
-            txt.setPlainText(full_text)
-            layout.addWidget(txt)
-            btn = QPushButton('Fechar')
-            btn.setFixedHeight(32)
-            btn.clicked.connect(dlg.accept)
-            layout.addWidget(btn, alignment=Qt.AlignmentFlag.AlignRight)
-            dlg.exec()
+        self.bulk_apply_btn.setEnabled(False)
+        task = self.executor.submit(Database.update_ticket_status_bulk, ids, status, resolution)
+        task.finished.connect(lambda updated: self._on_bulk_saved(ids, status, updated))
+        task.failed.connect(self._on_bulk_failed)
+
+    def _on_bulk_failed(self, error):
+        self.update_bulk_actions()
+        QMessageBox.critical(self, 'Erro', f'Nenhum chamado foi alterado: {error}')
+
+    def _on_bulk_saved(self, ids, status, updated):
+        if updated < len(ids):
+            QMessageBox.warning(self, 'Atenção', f'{updated} de {len(ids)} chamado(s) atualizado(s) para "{status}"; '
+                                'os demais não existem mais.')
+        else:
+            QMessageBox.information(self, 'Sucesso', f'{updated} chamado(s) atualizado(s) para "{status}".')
+        self.ticket_table.clearSelection()
+        self.refresh_changes()
+
+    def on_cell_clicked(self, index):
+        key = self.ticket_model.columns[index.column()][0]
+        if key in TicketTableModel.PREVIEW_COLUMNS:
+            show_ticket_text(self, self.db, self.ticket_model.row_at(index.row())['id'], key)
 
     def export_csv(self):
-        path,_ = QFileDialog.getSaveFileName(self, "Salvar CSV","tickets.csv","CSV Files (*.csv)")
+        path = csv_save_path(self, "tickets.csv")
         if path:
-            self.db.export_tickets_csv(path)
-            QMessageBox.information(self, "Sucesso","Tickets exportados.")
+            start_export(self, self.db, Database.export_tickets_csv, path, "Tickets exportados.")
 
     def export_pdf(self):
         path,_ = QFileDialog.getSaveFileName(self, "Salvar PDF","tickets.pdf","PDF Files (*.pdf)")
         if path:
-            try:
-                self.db.export_tickets_pdf(path)
-                QMessageBox.information(self, "Sucesso","Tickets exportados em PDF.")
-            except Exception as e:
-                QMessageBox.critical(self, "Erro", f"Falha ao gerar PDF: {e}")
+            start_export(self, self.db, Database.export_tickets_pdf, path, "Tickets exportados em PDF.")
+
+    def import_tickets(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Importar chamados", "",
+            "CSV ou JSONL (*.csv *.csv.gz *.jsonl *.jsonl.gz *.ndjson);;Todos os arquivos (*)")
+        if path:
+            start_import(self, self.db, path, on_done=lambda _: self.refresh_changes())
 
     def on_profile_saved(self):
         self.user = self.db.get_user_by_id(self.user['id'])
@@ -1122,14 +1881,204 @@ class TechHome(QWidget):
         self.welcome_label.setStyleSheet("font-size:25px; font-weight:bold; color:#333;")
         self.load_tickets()
 
+    def bind_user(self, user):
+        """Reaproveita a tela para um novo login (ver MainWindow.open_home)."""
+        self.user = user
+        self.welcome_label.setText(f"Bem-vindo, {user['name']}!")
+        self.perfil_widget.set_user(user)
+        self.inner_stack.setCurrentWidget(self.chamados_widget)
+        self.feed.reset()
+        self.load_tickets()
+
+    def end_session(self):
+        """Volta ao login sem deixar os dados do usuário na tela escondida."""
+        self.stacked.setCurrentIndex(0)
+        self.suspend()
+
+    def suspend(self):
+        """Para de verificar alterações e solta os chamados carregados; busca,
+        filtro e ordem voltam ao padrão para o próximo login."""
+        self.feed.stop()
+        self.search_timer.stop()
+        for widget in (self.search_edit, self.filter_box):
+            widget.blockSignals(True)
+        self.search_edit.clear()
+        self.filter_box.setCurrentIndex(0)
+        for widget in (self.search_edit, self.filter_box):
+            widget.blockSignals(False)
+        self.current_filter = "Todos"
+        self.ticket_model.clear()
+        self.dashboard_widget.clear()
+
     def logout(self):
         if ConfirmDialog.ask(self, "Deseja realmente sair do sistema?"):
-            self.stacked.setCurrentIndex(0)
+            self.end_session()
+
+# ----------------------- Painel de desempenho -----------------------
+PERF_SHORTCUT = "Ctrl+Shift+D"
+PERF_COLUMNS = ["Nome", "Chamadas", "Total (ms)", "Média (ms)", "p50 (ms)", "p95 (ms)", "p99 (ms)", "Máx (ms)"]
+
+# contadores de Database.contention_stats, na ordem em que aparecem no painel
+CONTENTION_ROWS = [
+    ('reader_acquires', "Leituras no pool"),
+    ('reader_waits', "Leituras que esperaram conexão"),
+    ('reader_wait_ms_total', "Espera por conexão, total (ms)"),
+    ('reader_wait_ms_max', "Espera por conexão, máx (ms)"),
+    ('writes', "Transações de escrita"),
+    ('write_ms_total', "Escrita, total (ms)"),
+    ('write_ms_max', "Escrita, máx (ms)"),
+    ('lock_errors', "Erros de banco bloqueado"),
+]
+
+def format_ms(ms):
+    return "—" if ms is None else f"{ms:.2f}"
+
+class PerformancePanel(QDialog):
+    """Painel escondido (PERF_SHORTCUT) com os tempos de callme.perf: ações
+    da interface e tarefas do DbExecutor numa aba, consultas das duas
+    conexões ao banco (a da interface e a do executor) na segunda e os
+    contadores de contenção de cada uma (Database.contention_stats) na
+    terceira. Os números só mudam em Atualizar; as últimas amostras podem
+    ser salvas em JSONL."""
+
+    def __init__(self, main_window):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self._executor_queries = {}
+        self._executor_contention = {}
+        self.setWindowTitle("Desempenho")
+        self.resize(960, 560)
+        layout = QVBoxLayout(self)
+
+        top = QHBoxLayout()
+        if perf.trace.path:
+            trace_text = f"Trace contínuo em {perf.trace.path}"
+        else:
+            trace_text = "Para gravar todas as amostras, defina CALLME_TRACE=<arquivo.jsonl>"
+        self.trace_label = QLabel(trace_text)
+        self.trace_label.setStyleSheet("color:#555555;")
+        top.addWidget(self.trace_label)
+        top.addStretch()
+        self.refresh_btn = QPushButton("Atualizar")
+        self.reset_btn = QPushButton("Zerar")
+        self.dump_btn = QPushButton("Salvar trace...")
+        for b in (self.refresh_btn, self.reset_btn, self.dump_btn):
+            b.setFixedHeight(32)
+            top.addWidget(b)
+        layout.addLayout(top)
+
+        self.tabs = QTabWidget()
+        self.actions_table = self._make_table()
+        self.queries_table = self._make_table()
+        self.tabs.addTab(self.actions_table, "Interface e executor")
+        self.tabs.addTab(self.queries_table, "Consultas")
+        self.contention_table = QTableWidget(len(CONTENTION_ROWS), 3)
+        self.contention_table.setHorizontalHeaderLabels(["Contador", "Interface", "Executor"])
+        self.contention_table.verticalHeader().setVisible(False)
+        self.contention_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.contention_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        for i, (_, label) in enumerate(CONTENTION_ROWS):
+            self.contention_table.setItem(i, 0, QTableWidgetItem(label))
+        self.tabs.addTab(self.contention_table, "Contenção")
+        layout.addWidget(self.tabs)
+
+        self.refresh_btn.clicked.connect(self.refresh)
+        self.reset_btn.clicked.connect(self.reset)
+        self.dump_btn.clicked.connect(self.dump_trace)
+
+    @staticmethod
+    def _make_table():
+        table = QTableWidget(0, len(PERF_COLUMNS))
+        table.setHorizontalHeaderLabels(PERF_COLUMNS)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        header = table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        return table
+
+    @staticmethod
+    def _fill(table, stats):
+        table.setRowCount(len(stats))
+        for i, (name, h) in enumerate(stats.items()):
+            values = [name, str(h['calls'])] + [format_ms(h[k]) for k in
+                                                ('total_ms', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms')]
+            for j, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if j:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                table.setItem(i, j, item)
+
+    def showEvent(self, event):
+        self.refresh()
+        super().showEvent(event)
+
+    def refresh(self):
+        self._fill(self.actions_table, perf.recorder.snapshot())
+        self._show_queries()
+        self._show_contention()
+        # os números do executor são lidos na thread dele e chegam depois
+        executor = self.main_window.db_executor
+        executor.submit(Database.query_stats).finished.connect(self._on_executor_queries)
+        executor.submit(Database.contention_stats).finished.connect(self._on_executor_contention)
+
+    def _on_executor_queries(self, stats):
+        self._executor_queries = stats
+        self._show_queries()
+
+    def _show_queries(self):
+        merged = [(f"executor · {name}", h) for name, h in self._executor_queries.items()]
+        if self.main_window.db is not None:
+            merged += [(f"interface · {name}", h) for name, h in self.main_window.db.query_stats().items()]
+        merged.sort(key=lambda item: item[1]['total_ms'], reverse=True)
+        self._fill(self.queries_table, dict(merged))
+
+    def _on_executor_contention(self, stats):
+        self._executor_contention = stats
+        self._show_contention()
+
+    def _show_contention(self):
+        db = self.main_window.db
+        columns = (db.contention_stats() if db is not None else {}, self._executor_contention)
+        for i, (key, _) in enumerate(CONTENTION_ROWS):
+            for j, stats in enumerate(columns, start=1):
+                value = stats.get(key)
+                if value is None:
+                    text = "—"
+                else:
+                    text = format_ms(value) if '_ms_' in key else str(value)
+                item = QTableWidgetItem(text)
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.contention_table.setItem(i, j, item)
+
+    def reset(self):
+        perf.recorder.reset()
+        perf.trace.clear()
+        if self.main_window.db is not None:
+            self.main_window.db.query_timing.reset()
+            self.main_window.db.stats.reset()
+        self.main_window.db_executor.submit(lambda db: (db.query_timing.reset(), db.stats.reset()))
+        self._executor_queries = {}
+        self._executor_contention = {}
+        self.refresh()
+
+    def dump_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Salvar trace", "callme-trace.jsonl",
+                                              "JSON Lines (*.jsonl)")
+        if not path:
+            return
+        try:
+            n = perf.trace.dump(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Erro", f"Falha ao salvar o trace: {e}")
+            return
+        QMessageBox.information(self, "Trace", f"{n} amostra(s) salvas em {path}.")
 
 # ----------------------- Main Window (aplica estilos) -----------------------
 class MainWindow(QWidget):
-    def __init__(self):
+    def __init__(self, db_file=DB_FILE):
         super().__init__()
+        self.db_file = db_file
         self.setWindowTitle("CallMe - Sistema de Chamados")
         self.resize(1200, 820)
 
@@ -1142,18 +2091,58 @@ class MainWindow(QWidget):
             print(f"Ícone carregado com sucesso: {icone_path}")  # Debug
         self.setWindowIcon(icon)
 
-        self.db = Database()
+        # O banco (migrações, índices, FTS) só é aberto depois da primeira
+        # pintura: a tela de login aparece já, com os botões desabilitados
+        self.db = None
+        self.db_executor = DbExecutor(db_file, self)
+        self._painted = False
+        self._homes = {}  # classe da tela inicial -> instância reaproveitada
         self.stacked = QStackedWidget()
         self.layout = QVBoxLayout(self)
         self.layout.addWidget(self.stacked)
 
-        self.login_widget = LoginWidget(self.db, self.stacked)
-        self.register_widget = RegisterWidget(self.db, self.stacked)
+        self.login_widget = LoginWidget(None, self.stacked, self.db_executor)
+        self.register_widget = RegisterWidget(None, self.stacked, self.db_executor)
         self.stacked.addWidget(self.login_widget)
         self.stacked.addWidget(self.register_widget)
 
+        # painel de desempenho: sem botão, só pelo atalho
+        self._perf_panel = None
+        QShortcut(QKeySequence(PERF_SHORTCUT), self, self.show_performance)
+
         self.apply_styles()
 
+    def show_performance(self):
+        if self._perf_panel is None:
+            self._perf_panel = PerformancePanel(self)
+        self._perf_panel.show()
+        self._perf_panel.raise_()
+        self._perf_panel.activateWindow()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            startup.mark("primeira pintura")
+            QTimer.singleShot(0, self.open_database)
+
+    def open_database(self):
+        # migra na thread do banco; a conexão da interface só abre depois
+        task = self.db_executor.submit(Database.migrate)
+        task.finished.connect(self._on_database_ready)
+        task.failed.connect(self._on_database_failed)
+
+    def _on_database_ready(self, _):
+        self.db = Database(self.db_file, migrate=False)
+        self.login_widget.set_database(self.db)
+        self.register_widget.db = self.db
+        startup.mark("banco pronto")
+        startup.report()
+
+    def _on_database_failed(self, error):
+        startup.report()
+        QMessageBox.critical(self, "Erro", f"Não foi possível abrir o banco de dados:\n{error}")
+
     def apply_styles(self):
         style = """
         QFrame#container {
@@ -1233,7 +2222,7 @@ class MainWindow(QWidget):
             padding: 10px 18px;
         }
 
-        QFrame#panel QTableWidget {
+        QFrame#panel QTableView {
             font-size: 14px;
         }
 
@@ -1243,22 +2232,52 @@ class MainWindow(QWidget):
         self.setStyleSheet(style)
 
     def open_employee_home(self, user):
-        home = EmployeeHome(self.db, self.stacked, user)
-        if self.stacked.count()>2:
-            self.stacked.removeWidget(self.stacked.widget(2))
-        self.stacked.addWidget(home)
-        self.stacked.setCurrentIndex(2)
+        self.open_home(EmployeeHome, user)
 
     def open_tech_home(self, user):
-        home = TechHome(self.db, self.stacked, user)
-        if self.stacked.count()>2:
-            self.stacked.removeWidget(self.stacked.widget(2))
-        self.stacked.addWidget(home)
-        self.stacked.setCurrentIndex(2)
+        self.open_home(TechHome, user)
+
+    def open_home(self, home_class, user):
+        """As telas iniciais são montadas uma vez por tipo e reaproveitadas
+        nos logins seguintes (bind_user troca o usuário e recarrega a lista).
+        As de outro papel ficam suspensas, sem verificar alterações nem
+        guardar a lista do usuário anterior."""
+        for other_class, other in self._homes.items():
+            if other_class is not home_class:
+                other.suspend()
+        home = self._homes.get(home_class)
+        if home is None:
+            home = home_class(self.db, self.stacked, user, self.db_executor)
+            self._homes[home_class] = home
+            self.stacked.addWidget(home)
+        else:
+            home.bind_user(user)
+        self.stacked.setCurrentWidget(home)
+
+    def _dispose_home(self, home):
+        self._homes.pop(type(home), None)
+        home.feed.stop()
+        self.stacked.removeWidget(home)
+        home.deleteLater()
+
+    def closeEvent(self, event):
+        for home in list(self._homes.values()):
+            self._dispose_home(home)
+        self.db_executor.shutdown()
+        if self.db is not None:
+            self.db.close()
+        perf.trace.close()
+        super().closeEvent(event)
 
 # ----------------------- Main -----------------------
 if __name__ == "__main__":
+    # CallMe.py export|import|stats|vacuum: a mesma linha de comando de python -m callme
+    from callme.cli import COMMANDS, main as cli_main
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        sys.exit(cli_main(sys.argv[1:]))
     app = QApplication(sys.argv)
+    startup.mark("QApplication")
     window = MainWindow()
+    startup.mark("janela criada")
     window.showMaximized()
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
@@ -0,0 +1,247 @@
+"""Benchmark da camada de banco (callme.db.Database) em várias escalas.
+
+Gera (ou reaproveita, com --data-dir) bancos sintéticos de benchmarks/synthetic.py
+e mede os métodos usados pela interface e pela linha de comando:
+listas por papel e filtro, leitura de chamados, contagens, busca, alteração
+de status, exportações CSV/PDF e os indicadores de callme.analytics (um ano
+até o chamado mais recente). O resultado vai para um JSON que pode ser
+comparado com o de outro commit (--compare). O JSON também guarda, por
+escala, as métricas de cada consulta (Database.query_stats); --queries N
+mostra as N com mais tempo total.
+
+Casos que trazem o resultado inteiro para a memória são pulados acima de
+--max-rows chamados, e o PDF completo acima de --pdf-max-rows; no JSON eles
+aparecem com "skipped". As alterações de status são desfeitas ao final, de
+modo que um banco de --data-dir continue igual para a próxima execução
+(fora os eventos e o histórico de status registrados).
+
+Uso:
+    python benchmarks/bench_database.py --scales 10k 100k -o antes.json
+    python benchmarks/bench_database.py --scales 10k 100k -o depois.json --compare antes.json
+    python benchmarks/bench_database.py --scales 1m 5m --data-dir ~/.cache/callme-bench --dist incident
+    python benchmarks/bench_database.py --scales 100k --queries 15
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import STATUS_DISTRIBUTIONS, cached_database, parse_scale  # noqa: E402
+from callme import analytics  # noqa: E402
+from callme.db import SCHEMA_VERSION, STATUS_OPTIONS, Database  # noqa: E402
+
+SAMPLE_IDS = 200     # chamados sorteados para os casos de leitura/escrita de um chamado
+BULK_SIZE = 100
+
+
+def git_revision():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root,
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return rev + ("-dirty" if dirty else "")
+
+
+def measure(fn, repeat, calls=1):
+    """Roda fn() `repeat` vezes; tempos em ms por chamada (fn pode fazer
+    `calls` chamadas de uma vez). Devolve as estatísticas e o último retorno."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1000 / calls)
+    return {
+        'repeat': repeat,
+        'calls': calls,
+        'median_ms': statistics.median(samples),
+        'min_ms': min(samples),
+        'max_ms': max(samples),
+    }, result
+
+
+def count(result):
+    if isinstance(result, int):
+        return result
+    if isinstance(result, tuple):  # (linhas, cursor) das páginas
+        result = result[0]
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+def sample_ids(db, seed=1):
+    rnd = random.Random(seed)
+    max_id = db.conn.execute("SELECT MAX(id) FROM tickets").fetchone()[0]
+    return rnd.sample(range(1, max_id + 1), min(SAMPLE_IDS, max_id))
+
+
+def cases(db, n, ids, args, out_dir):
+    """(nome, função, chamadas por execução, motivo para pular ou None)."""
+    tech = db.find_user_by_email("tec0@bench")
+    heavy = db.find_user_by_email("func0@bench")  # funcionário com mais chamados
+    typical = db.find_user_by_email("func250@bench")
+    too_big = f"mais de {args.max_rows} chamados na memória" if n > args.max_rows else None
+    last = datetime.fromisoformat(db.conn.execute("SELECT MAX(created_at) FROM tickets").fetchone()[0])
+    year = (last - timedelta(days=365), last)
+    csv_path = os.path.join(out_dir, "export.csv")
+    pdf_path = os.path.join(out_dir, "export.pdf")
+
+    def each(fn):
+        return lambda: [fn(tid) for tid in ids]
+
+    yield "get_tickets_for_user/tecnico/Todos", lambda: db.get_tickets_for_user(tech, "Todos"), 1, too_big
+    for status in STATUS_OPTIONS:
+        yield f"get_tickets_for_user/tecnico/{status}", lambda s=status: db.get_tickets_for_user(tech, s), 1, too_big
+    yield "get_tickets_for_user/funcionario", lambda: db.get_tickets_for_user(heavy), 1, None
+    yield "get_tickets_page/tecnico/Todos", lambda: db.get_tickets_page(tech, "Todos"), 1, None
+    yield "get_tickets_page/tecnico/Aberto", lambda: db.get_tickets_page(tech, "Aberto"), 1, None
+    yield "get_tickets_page/tecnico/title", lambda: db.get_tickets_page(tech, "Todos", order=('title', False)), 1, None
+    yield "get_tickets_page/funcionario", lambda: db.get_tickets_page(heavy), 1, None
+    yield "get_ticket", each(db.get_ticket), SAMPLE_IDS, None
+    yield "get_ticket_counts", db.get_ticket_counts, 1, None
+    yield "get_ticket_counts/funcionario", lambda: db.get_ticket_counts(heavy['id']), 1, None
+    yield "search_tickets/impressora", lambda: db.search_tickets("impressora"), 1, None
+    yield "search_tickets/prefixo", lambda: db.search_tickets("senha blo"), 1, None
+    yield "update_ticket_status", each(lambda tid: db.update_ticket_status(tid, "Em Atendimento")), SAMPLE_IDS, None
+    yield ("update_ticket_status_bulk", lambda: db.update_ticket_status_bulk(ids[:BULK_SIZE], "Aguardando Técnico"),
+           1, None)
+    yield "analytics/time_in_status", lambda: analytics.time_in_status(db, *year), 1, None
+    yield "analytics/resolution_times", lambda: analytics.resolution_times(db, *year), 1, None
+    yield "analytics/backlog_per_day", lambda: analytics.backlog_per_day(db, *year), 1, None
+    yield "export_tickets_csv/funcionario", lambda: db.export_tickets_csv(csv_path, typical['id']), 1, None
+    yield "export_tickets_csv/todos", lambda: db.export_tickets_csv(csv_path), 1, None
+    yield "export_tickets_pdf/funcionario", lambda: db.export_tickets_pdf(pdf_path, typical['id']), 1, None
+    yield ("export_tickets_pdf/todos", lambda: db.export_tickets_pdf(pdf_path), 1,
+           f"mais de {args.pdf_max_rows} chamados" if n > args.pdf_max_rows else None)
+
+
+def run_scale(path, n, args):
+    db = Database(path, readers=0)
+    ids = sample_ids(db)
+    # os casos de escrita só alteram chamados de `ids`; o estado original
+    # volta no fim (os triggers acertam contagens e prévias)
+    marks = ",".join("?" * len(ids))
+    saved = [tuple(r) for r in db.conn.execute(
+        f"SELECT status, resolution, id FROM tickets WHERE id IN ({marks})", ids)]
+    results = []
+    try:
+        db.query_timing.reset()
+        with tempfile.TemporaryDirectory() as out_dir:
+            for name, fn, calls, skip in cases(db, n, ids, args, out_dir):
+                if args.only and not any(part in name for part in args.only):
+                    continue
+                entry = {'scale': n, 'case': name}
+                if skip:
+                    entry['skipped'] = skip
+                else:
+                    # exportações e listas inteiras são caras: menos repetições
+                    heavy = calls == 1 and name.startswith(("export", "get_tickets_for_user", "analytics"))
+                    stats, result = measure(fn, min(args.repeat, 3) if heavy else args.repeat, calls)
+                    entry.update(stats)
+                    entry['rows'] = count(result) if calls == 1 else None
+                results.append(entry)
+                print(format_entry(entry), flush=True)
+        queries = db.query_stats()
+    finally:
+        with db.conn:
+            db.conn.executemany("UPDATE tickets SET status=?, resolution=? WHERE id=?", saved)
+        db.close()
+    return results, queries
+
+
+def print_queries(n, queries, top):
+    print(f"\n{n} chamados: consultas com mais tempo total")
+    print(f"{'consulta':<32} {'chamadas':>9} {'total (ms)':>11} {'média (ms)':>11} {'p95 (ms)':>11} {'máx (ms)':>11}")
+    for name, q in list(queries.items())[:top]:
+        print(f"{name:<32} {q['calls']:>9} {q['total_ms']:>11.1f} {q['mean_ms']:>11.3f} {q['p95_ms']:>11.3f}"
+              f" {q['max_ms']:>11.2f}")
+
+
+def format_entry(entry):
+    if 'skipped' in entry:
+        return f"{entry['scale']:>9} {entry['case']:<40} {'pulado: ' + entry['skipped']}"
+    rows = "" if entry['rows'] is None else f"{entry['rows']:>9}"
+    return f"{entry['scale']:>9} {entry['case']:<40} {entry['median_ms']:>11.2f} {entry['max_ms']:>11.2f} {rows}"
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    before = {(e['scale'], e['case']): e for e in baseline['results'] if 'median_ms' in e}
+    print(f"\ncomparação com {baseline_path} ({baseline['meta'].get('git') or '?'}):")
+    print(f"{'chamados':>9} {'caso':<40} {'antes (ms)':>11} {'agora (ms)':>11} {'razão':>7}")
+    for e in results:
+        old = before.get((e['scale'], e['case']))
+        if old is None or 'median_ms' not in e:
+            continue
+        ratio = e['median_ms'] / old['median_ms'] if old['median_ms'] else float('inf')
+        print(f"{e['scale']:>9} {e['case']:<40} {old['median_ms']:>11.2f} {e['median_ms']:>11.2f} {ratio:>6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", nargs="+", default=["10k", "100k"], help="10k, 100k, 1m, 5m...")
+    parser.add_argument("--dist", choices=sorted(STATUS_DISTRIBUTIONS), default="backlog")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", help="só os casos cujo nome contém um destes trechos")
+    parser.add_argument("--max-rows", type=parse_scale, default="1m")
+    parser.add_argument("--pdf-max-rows", type=parse_scale, default="10k")
+    parser.add_argument("--data-dir", help="guarda e reaproveita os bancos gerados (padrão: temporário)")
+    parser.add_argument("-o", "--output", help="arquivo JSON (padrão: bench_database-<commit>.json)")
+    parser.add_argument("--compare", metavar="JSON", help="resultado anterior para comparar")
+    parser.add_argument("--queries", type=int, metavar="N", help="mostra as N consultas com mais tempo total")
+    args = parser.parse_args()
+
+    revision = git_revision()
+    meta = {
+        'git': revision,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'schema_version': SCHEMA_VERSION,
+        'dist': args.dist,
+        'seed': args.seed,
+        'repeat': args.repeat,
+    }
+    results = []
+    queries = {}
+    print(f"{'chamados':>9} {'caso':<40} {'mediana (ms)':>11} {'máx (ms)':>11} {'linhas':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.expanduser(args.data_dir) if args.data_dir else tmp
+        for scale in args.scales:
+            n = parse_scale(scale)
+            path = cached_database(data_dir, n, args.seed, args.dist)
+            scale_results, queries[n] = run_scale(path, n, args)
+            results.extend(scale_results)
+    if args.queries:
+        for n, stats in queries.items():
+            print_queries(n, stats, args.queries)
+
+    output = args.output or f"bench_database-{revision or 'sem-git'}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'meta': meta, 'results': results, 'queries': queries}, f, ensure_ascii=False, indent=2)
+    print(f"resultados em {output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Benchmark das consultas da lista de chamados sem e com os índices de tickets.
+
+Gera bancos sintéticos em um diretório temporário, já no esquema atual, e
+mede sem os índices idx_tickets_* (apagados) e depois de recriá-los a
+primeira página de cada formato de consulta usado pela interface (técnico sem filtro, técnico
+filtrando status e funcionário vendo os próprios chamados).
+
+Uso:
+    python benchmarks/bench_indexes.py                 # 10k, 100k e 1M chamados
+    python benchmarks/bench_indexes.py --sizes 10000 --plan
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import populate  # noqa: E402
+from callme.db import Database  # noqa: E402
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def scenarios(db):
+    tech = db.conn.execute("SELECT * FROM users WHERE role='tecnico' LIMIT 1").fetchone()
+    emp = db.conn.execute("SELECT * FROM users WHERE role='funcionario' LIMIT 1").fetchone()
+    _, second_page = db.get_tickets_page(tech, "Aberto")
+    return [
+        ("tecnico/Todos", lambda: db.get_tickets_page(tech, "Todos")),
+        ("tecnico/Aberto", lambda: db.get_tickets_page(tech, "Aberto")),
+        ("tecnico/Aberto p.2", lambda: db.get_tickets_page(tech, "Aberto", second_page)),
+        ("funcionario", lambda: db.get_tickets_page(emp)),
+    ]
+
+
+def show_plan(db, label):
+    print(f"  plano ({label}):")
+    for sql, params in [
+        ("SELECT t.id FROM tickets t JOIN users u ON t.created_by = u.id WHERE t.status=? ORDER BY t.created_at DESC, t.id DESC LIMIT 201", ("Aberto",)),
+        ("SELECT t.id FROM tickets t JOIN users u ON t.created_by = u.id WHERE t.created_by=? ORDER BY t.created_at DESC, t.id DESC LIMIT 201", (1,)),
+    ]:
+        for row in db.conn.execute("EXPLAIN QUERY PLAN " + sql, params):
+            print("   ", row[-1])
+
+
+def run(sizes, repeat, plan):
+    print(f"{'chamados':>10} {'consulta':<20} {'sem índice (ms)':>16} {'com índice (ms)':>16}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(os.path.join(tmp, "bench.db"), readers=0)
+            populate(db, n)
+            indexes = db.conn.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type='index' AND name LIKE 'idx_tickets_%'").fetchall()
+            for name, _ in indexes:
+                db.conn.execute(f"DROP INDEX {name}")
+            before = {label: timed(fn, repeat) for label, fn in scenarios(db)}
+            if plan:
+                show_plan(db, "sem índice")
+            for _, sql in indexes:
+                db.conn.execute(sql)
+            db.conn.execute("ANALYZE")
+            after = {label: timed(fn, repeat) for label, fn in scenarios(db)}
+            if plan:
+                show_plan(db, "com índice")
+            for label in before:
+                print(f"{n:>10} {label:<20} {before[label]:>16.2f} {after[label]:>16.2f}")
+            db.conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--plan", action="store_true", help="mostra o EXPLAIN QUERY PLAN")
+    args = parser.parse_args()
+    run(args.sizes, args.repeat, args.plan)
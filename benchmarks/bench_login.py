@@ -0,0 +1,121 @@
+"""Vazão de login, cadastro e troca de senha com muitos usuários.
+
+Compara callme.auth (uma consulta ou transação por fluxo) com a sequência
+anterior de consultas:
+
+  - legacy: login com SELECT * por e-mail e conferência do RE em Python;
+    cadastro com check_re seguido de create_user; troca de senha com busca
+    do usuário, SELECT de novo e UPDATE por id;
+  - auth: callme.auth.login / register / reset_password.
+
+O hash de senha usa PBKDF2 com poucas iterações (--cost) e sem cache de
+verificação, para que o tempo medido seja o do banco; com o custo padrão
+o KDF domina qualquer um dos dois caminhos.
+
+Uso:
+    python benchmarks/bench_login.py --users 100000 --ops 20000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import populate  # noqa: E402
+from callme import auth  # noqa: E402
+from callme.db import Database  # noqa: E402
+from callme.passwords import PasswordContext, Pbkdf2Hasher  # noqa: E402
+
+PASSWORD = "senha-bench"
+
+
+def legacy_login(db, email, re_val, password, context):
+    user = db.find_user_by_email(email)
+    if not user:
+        return None, "Usuário não encontrado."
+    if user['re'] != re_val:
+        return None, "RE não corresponde ao usuário."
+    ok, new_hash = context.verify(password, user['password_hash'])
+    if not ok:
+        return None, "Senha incorreta."
+    return user, None
+
+
+def legacy_register(db, name, email, password, re_val, context):
+    re_row = db.check_re(re_val)
+    if not re_row:
+        return None, "RE inválido."
+    if not db.create_user(name, email, context.hash(password), re_row['role'], re_val):
+        return None, "Email já cadastrado."
+    return re_row['role'], None
+
+
+def legacy_reset(db, email, re_val, password, context):
+    user = db.find_user_by_email(email)
+    if not user:
+        return "Email não cadastrado."
+    if user['re'] != re_val:
+        return "RE não corresponde ao usuário."
+    c = db.conn.cursor()
+    c.execute("SELECT id, re FROM users WHERE email=?", (email,))
+    row = c.fetchone()
+    with db._writing() as c:
+        c.execute("UPDATE users SET password_hash=? WHERE id=?", (context.hash(password), row['id']))
+    return None
+
+
+FLOWS = {
+    'legacy': (legacy_login, legacy_register, legacy_reset),
+    'auth': (auth.login, auth.register, auth.reset_password),
+}
+
+
+def rate(fn, calls):
+    t0 = time.perf_counter()
+    for args in calls:
+        fn(*args)
+    elapsed = time.perf_counter() - t0
+    return len(calls) / elapsed, elapsed / len(calls) * 1e6
+
+
+def run(n_users, n_ops, cost, seed):
+    context = PasswordContext(Pbkdf2Hasher(cost), cache_size=0)
+    rnd = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"))
+        t0 = time.perf_counter()
+        populate(db, 0, employees=n_users)
+        # mesmo hash para todos: o custo por verificação é o mesmo
+        db.conn.execute("UPDATE users SET password_hash=?", (context.hash(PASSWORD),))
+        db.conn.commit()
+        print(f"{n_users} usuários em {time.perf_counter() - t0:.1f} s; PBKDF2 com {cost} iterações")
+        sample = [rnd.randrange(n_users) for _ in range(n_ops)]
+        print(f"{'fluxo':<22} {'caminho':<8} {'ops/s':>10} {'µs/op':>10}")
+        for mode, (login, register, reset) in FLOWS.items():
+            cases = {
+                'login': (login, [(db, f"func{i}@bench", f"FUNC{i:03d}", PASSWORD, context) for i in sample]),
+                'login RE errado': (login, [(db, f"func{i}@bench", "RE-ERRADO", PASSWORD, context) for i in sample]),
+                'login e-mail errado': (login, [(db, f"nada{i}@bench", f"FUNC{i:03d}", PASSWORD, context)
+                                                for i in sample]),
+                'troca de senha': (reset, [(db, f"func{i}@bench", f"FUNC{i:03d}", PASSWORD, context)
+                                           for i in sample]),
+                'cadastro': (register, [(db, f"Novo {i}", f"{mode}{i}@novo", PASSWORD, f"FUNC{i:03d}", context)
+                                        for i in range(n_ops)]),
+            }
+            for name, (fn, calls) in cases.items():
+                ops, micros = rate(fn, calls)
+                print(f"{name:<22} {mode:<8} {ops:>10.0f} {micros:>10.1f}")
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--ops", type=int, default=20_000)
+    parser.add_argument("--cost", type=int, default=1, help="iterações do PBKDF2 (padrão: 1, só o banco)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    run(args.users, args.ops, args.cost, args.seed)
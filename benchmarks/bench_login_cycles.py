@@ -0,0 +1,127 @@
+"""Memória ao longo de ciclos de login/logout na mesma janela (quiosque).
+
+Alterna um funcionário e um técnico: cada ciclo abre a tela inicial, espera
+a primeira página e as contagens chegarem e volta ao login. Mede o RSS do
+processo a cada --every ciclos.
+
+  - cache: MainWindow.open_home, que reaproveita as telas (atual);
+  - legacy: uma tela nova a cada login, removida do QStackedWidget sem ser
+    apagada, como era antes.
+
+No modo cache o script termina com código 1 se o RSS crescer mais que
+--max-growth-mib entre a primeira medição e a última.
+Sem display, use a plataforma offscreen do Qt (padrão deste script).
+
+Uso:
+    python benchmarks/bench_login_cycles.py --cycles 1000
+    python benchmarks/bench_login_cycles.py --cycles 200 --mode legacy
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QCoreApplication, QEvent  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from synthetic import populate  # noqa: E402
+from CallMe import EmployeeHome, MainWindow, TechHome  # noqa: E402
+from callme.db import Database  # noqa: E402
+
+
+def rss_mib():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except OSError:
+        # sem /proc: só o pico está disponível (KiB no Linux, bytes no macOS)
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def settle(app, home):
+    while home.ticket_model.is_loading() or home.executor._tasks:
+        app.processEvents()
+        time.sleep(0.001)
+    app.processEvents()
+    QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete.value)
+
+
+def open_legacy(window, home_class, user):
+    """Réplica de MainWindow.open_*_home antes do cache."""
+    home = home_class(window.db, window.stacked, user, window.db_executor)
+    if window.stacked.count() > 2:
+        window.stacked.removeWidget(window.stacked.widget(2))
+    window.stacked.addWidget(home)
+    window.stacked.setCurrentIndex(2)
+    return home
+
+
+def run(args):
+    app = QApplication.instance() or QApplication(sys.argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "cycles.db")
+        db = Database(db_file, readers=0)
+        populate(db, args.tickets)
+        users = [db.find_user_by_email("func0@bench"), db.find_user_by_email("tec0@bench")]
+
+        window = MainWindow(db_file)
+        window.resize(1200, 800)
+        window.show()
+        while window.db is None:
+            app.processEvents()
+            time.sleep(0.001)
+
+        print(f"{'ciclo':>6} {'RSS (MiB)':>10} {'telas':>6} {'ms/ciclo':>9}")
+        first = None
+        t0 = time.perf_counter()
+        for cycle in range(1, args.cycles + 1):
+            user = users[cycle % 2]
+            home_class = TechHome if user['role'] == 'tecnico' else EmployeeHome
+            if args.mode == "cache":
+                window.open_home(home_class, user)
+                home = window.stacked.currentWidget()
+                settle(app, home)
+                home.end_session()
+            else:
+                home = open_legacy(window, home_class, user)
+                settle(app, home)
+                window.stacked.setCurrentIndex(0)
+            app.processEvents()
+            if cycle % args.every == 0:
+                gc.collect()
+                rss = rss_mib()
+                first = rss if first is None else first
+                homes = len(window.findChildren(EmployeeHome)) + len(window.findChildren(TechHome))
+                elapsed = (time.perf_counter() - t0) * 1000 / args.every
+                print(f"{cycle:>6} {rss:>10.1f} {homes:>6} {elapsed:>9.1f}", flush=True)
+                t0 = time.perf_counter()
+
+        growth = rss - first
+        print(f"crescimento desde a primeira medição: {growth:+.1f} MiB")
+        window.close()
+        db.close()
+    if args.mode == "cache" and growth > args.max_growth_mib:
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cycles", type=int, default=1000)
+    parser.add_argument("--every", type=int, default=100, help="medir o RSS a cada N ciclos")
+    parser.add_argument("--tickets", type=int, default=5000)
+    parser.add_argument("--mode", choices=("cache", "legacy"), default="cache")
+    parser.add_argument("--max-growth-mib", type=float, default=5.0)
+    args = parser.parse_args()
+    sys.exit(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Benchmark da exportação em PDF (Database.export_tickets_pdf).
+
+Gera chamados com o texto de benchmarks/synthetic.py (descrições de 10 a
+120 palavras, que quebram em várias linhas) e exporta todos em tamanhos
+crescentes. O tempo por chamado deve ficar constante: cada tabela do
+relatório cabe numa página e só é quebrada, no máximo, uma vez. Mostra
+também as páginas e as tentativas de quebra de tabela (Table.split).
+Sai com erro se o tempo por chamado no maior tamanho passar de
+--max-ratio vezes o do menor.
+
+Uso:
+    python benchmarks/bench_pdf.py --sizes 500 1000 2000 4000
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import populate  # noqa: E402
+from callme.db import Database  # noqa: E402
+
+
+def count_splits():
+    """Troca Table.split por uma versão que conta as chamadas."""
+    from reportlab.platypus import Table
+    counter = [0]
+    split = Table.split
+
+    def counting(self, *args, **kwargs):
+        counter[0] += 1
+        return split(self, *args, **kwargs)
+    Table.split = counting
+    return counter
+
+
+def run(sizes, max_ratio):
+    splits = count_splits()
+    print(f"{'chamados':>10} {'tempo (s)':>10} {'ms/chamado':>11} {'páginas':>8} {'quebras':>8}")
+    per_row = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(os.path.join(tmp, "bench.db"))
+            populate(db, n)
+            pdf_path = os.path.join(tmp, "export.pdf")
+            splits[0] = 0
+            t0 = time.perf_counter()
+            db.export_tickets_pdf(pdf_path)
+            seconds = time.perf_counter() - t0
+            with open(pdf_path, 'rb') as f:
+                pages = len(re.findall(rb"/Type /Page\b", f.read()))
+            db.close()
+        per_row.append(seconds * 1000 / n)
+        print(f"{n:>10} {seconds:>10.2f} {per_row[-1]:>11.3f} {pages:>8} {splits[0]:>8}")
+    ratio = per_row[-1] / per_row[0]
+    print(f"ms/chamado: {sizes[-1]} / {sizes[0]} = {ratio:.2f}")
+    return ratio <= max_ratio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000, 4000])
+    parser.add_argument("--max-ratio", type=float, default=1.5)
+    args = parser.parse_args()
+    sys.exit(0 if run(args.sizes, args.max_ratio) else 1)
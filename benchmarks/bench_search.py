@@ -0,0 +1,47 @@
+"""Benchmark da busca textual (Database.search_tickets).
+
+Gera chamados com o texto aleatório de benchmarks/synthetic.py (vocabulário
+de suporte técnico) e mede a latência das buscas típicas da caixa de busca do
+técnico, incluindo prefixos curtos (como ficam enquanto o usuário ainda digita).
+
+Uso:
+    python benchmarks/bench_search.py --sizes 100000 1000000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import populate  # noqa: E402
+from callme.db import Database  # noqa: E402
+
+QUERIES = ["impressora", "imp", "senha bloqueada", "vpn acesso", "toner papel atolado", "xyzinexistente"]
+
+
+def run(sizes, repeat):
+    print(f"{'chamados':>10} {'busca':<22} {'status':<10} {'mediana (ms)':>13} {'máx (ms)':>10}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(os.path.join(tmp, "bench.db"))
+            populate(db, n)
+            for query in QUERIES:
+                for status in (None, "Aberto"):
+                    samples = []
+                    for _ in range(repeat):
+                        t0 = time.perf_counter()
+                        db.search_tickets(query, status)
+                        samples.append((time.perf_counter() - t0) * 1000)
+                    print(f"{n:>10} {query:<22} {status or 'Todos':<10} {statistics.median(samples):>13.2f} {max(samples):>10.2f}")
+            db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
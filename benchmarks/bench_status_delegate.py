@@ -0,0 +1,146 @@
+"""Benchmark da tabela de chamados do técnico: QComboBox por linha x delegate.
+
+Compara a montagem antiga (QTableWidget com um QComboBox vivo, com folha de
+estilo própria, em cada linha) com a atual (QTableView + TicketTableModel +
+StatusDelegate) medindo:
+  - carga: preencher a tabela e desenhar a primeira tela;
+  - rolagem: percorrer a tabela de cima a baixo, redesenhando cada passo;
+  - redimensionamento: alternar a largura da janela algumas vezes.
+
+Sem display, use a plataforma offscreen do Qt (padrão deste script).
+
+Uso:
+    python benchmarks/bench_status_delegate.py --rows 1000 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication, QComboBox, QTableView, QTableWidget, QTableWidgetItem  # noqa: E402
+
+from CallMe import STATUS_COLORS, STATUS_OPTIONS, StatusDelegate, TicketTableModel  # noqa: E402
+from callme.db import DESC_PREVIEW_LEN  # noqa: E402
+
+COLUMNS = [
+    ('id', "ID"), ('title', "Título"), ('description', "Descrição"),
+    ('status', "Status"), ('creator_name', "Criado por"),
+    ('created_at', "Data"), ('resolution', "Resolução"),
+]
+SCROLL_STEPS = 200
+RESIZES = 6
+
+
+def make_rows(n, seed=7):
+    rnd = random.Random(seed)
+    rows = [{
+        'id': n - i,
+        'title': f"Chamado {n - i}",
+        'description': "Descrição do problema relatado pelo usuário. " * rnd.randint(1, 6),
+        'status': rnd.choice(STATUS_OPTIONS),
+        'creator_name': f"Funcionário {rnd.randint(1, 500)}",
+        'created_at': f"2024-01-01T00:00:{n - i:09d}",
+        'resolution': "",
+    } for i in range(n)]
+    # o modelo recebe só o começo dos textos, como em TICKET_LIST_FIELDS
+    for t in rows:
+        t['description_preview'] = t['description'][:DESC_PREVIEW_LEN + 1]
+        t['resolution_preview'] = t['resolution'][:DESC_PREVIEW_LEN + 1]
+    return rows
+
+
+def load_legacy(table, rows):
+    """Réplica do TechHome.load_tickets original."""
+    table.setRowCount(0)
+    for t in rows:
+        row = table.rowCount()
+        table.insertRow(row)
+        table.setItem(row, 0, QTableWidgetItem(str(t['id'])))
+        table.setItem(row, 1, QTableWidgetItem(t['title']))
+        desc_preview = t['description'][:120] + ("..." if len(t['description']) > 120 else "")
+        table.setItem(row, 2, QTableWidgetItem(desc_preview))
+        combo = QComboBox()
+        combo.addItems(STATUS_OPTIONS)
+        combo.setCurrentText(t['status'])
+        combo.setStyleSheet(f"color: {STATUS_COLORS.get(t['status'], '#000000')};")
+        combo.tid = t['id']
+        combo.currentTextChanged.connect(lambda s, c=combo: None)
+        table.setCellWidget(row, 3, combo)
+        table.setItem(row, 4, QTableWidgetItem(t['creator_name']))
+        table.setItem(row, 5, QTableWidgetItem(t['created_at']))
+        table.setItem(row, 6, QTableWidgetItem(t['resolution'] or ""))
+
+
+def build_legacy(rows):
+    table = QTableWidget()
+    table.setColumnCount(len(COLUMNS))
+    table.setHorizontalHeaderLabels([label for _, label in COLUMNS])
+    load_legacy(table, rows)
+    return table
+
+
+def build_delegate(rows):
+    table = QTableView()
+    model = TicketTableModel(COLUMNS, editable_status=True, parent=table)
+    table.setModel(model)
+    table.setItemDelegateForColumn(3, StatusDelegate(table))
+    table.verticalHeader().setDefaultSectionSize(32)
+    model.set_rows(rows)
+    return table
+
+
+def settle(app, table):
+    table.viewport().repaint()
+    app.processEvents()
+
+
+def measure(app, build, rows):
+    t0 = time.perf_counter()
+    table = build(rows)
+    table.resize(1200, 800)
+    table.show()
+    settle(app, table)
+    load = time.perf_counter() - t0
+
+    bar = table.verticalScrollBar()
+    t0 = time.perf_counter()
+    for step in range(SCROLL_STEPS + 1):
+        bar.setValue(bar.maximum() * step // SCROLL_STEPS)
+        settle(app, table)
+    scroll = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for i in range(RESIZES):
+        table.resize(900 if i % 2 == 0 else 1200, 800)
+        settle(app, table)
+    resize = time.perf_counter() - t0
+
+    table.close()
+    table.deleteLater()
+    app.processEvents()
+    return load, scroll, resize
+
+
+def run(sizes):
+    app = QApplication.instance() or QApplication(sys.argv)
+    print(f"{'linhas':>8} {'variante':<10} {'carga (ms)':>11} {'rolagem (ms)':>13} {'resize (ms)':>12}")
+    for n in sizes:
+        rows = make_rows(n)
+        for name, build in (("combo", build_legacy), ("delegate", build_delegate)):
+            load, scroll, resize = measure(app, build, rows)
+            print(f"{n:>8} {name:<10} {load * 1000:>11.1f} {scroll * 1000:>13.1f} {resize * 1000:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+    run(args.rows)
+
+
+if __name__ == "__main__":
+    main()
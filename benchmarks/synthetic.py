@@ -0,0 +1,184 @@
+"""Gerador de dados sintéticos para os benchmarks.
+
+Cria RE, usuários (funcionários e técnicos) e chamados com texto de suporte
+técnico, datas crescentes e distribuição de status configurável. Tudo sai de
+um gerador com semente fixa: a mesma escala, semente e distribuição geram o
+mesmo banco.
+
+Usuários: func<i>@bench (RE FUNC<i>) e tec<i>@bench (RE TEC<i>), todos com
+password_hash 'x'. Com o histórico de status (migração 6), cada chamado
+recebe um caminho Aberto -> [Aguardando Técnico] -> Em Atendimento ->
+Finalizado até o seu status, com durações sorteadas.
+
+Uso direto (gera e guarda um banco para reaproveitar):
+    python benchmarks/synthetic.py 1m --dist backlog -o /tmp/callme-1m.db
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from callme.db import SCHEMA_VERSION, STATUS_OPTIONS, Database  # noqa: E402
+
+N_EMPLOYEES = 500
+N_TECHS = 10
+BATCH_SIZE = 10_000
+
+# pesos na ordem de STATUS_OPTIONS (Aberto, Aguardando Técnico, Em Atendimento, Finalizado)
+STATUS_DISTRIBUTIONS = {
+    # base antiga: quase tudo finalizado, poucos abertos
+    'backlog': (5, 3, 7, 85),
+    # fila acumulada: a maioria ainda aberta
+    'incident': (70, 10, 15, 5),
+    'uniform': (1, 1, 1, 1),
+}
+
+# duração média (horas) em cada status antes de passar ao próximo
+HISTORY_MEAN_HOURS = {'Aberto': 6, 'Aguardando Técnico': 20, 'Em Atendimento': 30}
+
+VOCABULARY = (
+    "impressora toner papel atolado rede wifi cabo switch roteador senha bloqueada "
+    "email outlook anexo vpn acesso sistema erro lento travando monitor teclado mouse "
+    "notebook bateria carregador licença office planilha backup servidor pasta "
+    "permissão certificado telefone ramal headset câmera reunião atualização driver"
+).split()
+
+
+def parse_scale(text):
+    """'10k', '1m', '5M' ou um número."""
+    text = str(text).strip().lower().replace("_", "")
+    for suffix, mult in (("k", 1_000), ("m", 1_000_000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * mult)
+    return int(text)
+
+
+def status_path(rnd, status):
+    """Sequência de status de um chamado até `status`."""
+    path = ['Aberto']
+    if status == 'Aberto':
+        return path
+    if status == 'Aguardando Técnico' or rnd.random() < 0.5:
+        path.append('Aguardando Técnico')
+    if status == 'Aguardando Técnico':
+        return path
+    path.append('Em Atendimento')
+    if status == 'Finalizado':
+        path.append('Finalizado')
+    return path
+
+
+def history_rows(rnd, tid, created, status):
+    rows = []
+    previous = None
+    at = created
+    for step in status_path(rnd, status):
+        if previous is not None:
+            at += timedelta(hours=rnd.expovariate(1 / HISTORY_MEAN_HOURS[previous]))
+        rows.append((tid, previous, step, at.isoformat()))
+        previous = step
+    return rows
+
+
+def populate(db, n_tickets, seed=42, dist='backlog', employees=N_EMPLOYEES, techs=N_TECHS):
+    """Insere RE, usuários e `n_tickets` chamados em `db` (migrado ou não).
+    Os chamados são divididos entre os funcionários com peso decrescente
+    (alguns abrem muito mais que outros); o vocabulário também é enviesado,
+    com poucas palavras muito comuns."""
+    rnd = random.Random(seed)
+    weights = STATUS_DISTRIBUTIONS[dist] if isinstance(dist, str) else dist
+    c = db.conn.cursor()
+    people = ([(f"Func {i}", f"func{i}@bench", 'funcionario', f"FUNC{i:03d}") for i in range(employees)]
+              + [(f"Tec {i}", f"tec{i}@bench", 'tecnico', f"TEC{i:03d}") for i in range(techs)])
+    c.executemany("INSERT OR IGNORE INTO res (re, role) VALUES (?,?)", [(re, role) for _, _, role, re in people])
+    c.executemany("INSERT INTO users (name,email,password_hash,role,re) VALUES (?,?,'x',?,?)", people)
+    db.conn.commit()
+    employee_ids = [r[0] for r in c.execute("SELECT id FROM users WHERE role='funcionario' ORDER BY id")]
+    employee_weights = [1.0 / (i + 1) ** 0.5 for i in range(len(employee_ids))]
+    words = VOCABULARY[:]
+    rnd.shuffle(words)
+    word_weights = [1.0 / (i + 1) for i in range(len(words))]
+    start = datetime(2020, 1, 1)
+    sql = "INSERT INTO tickets (title,description,status,created_by,created_at,resolution) VALUES (?,?,?,?,?,?)"
+    # o trigger só registra o status final na criação; o caminho sorteado
+    # substitui essas linhas a cada lote
+    with_history = c.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='ticket_status_history'").fetchone() is not None
+    next_id = c.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM tickets").fetchone()[0]
+    batch = []
+    history = []
+
+    def flush():
+        c.executemany(sql, batch)
+        if with_history:
+            c.execute("DELETE FROM ticket_status_history WHERE ticket_id >= ?", (history[0][0],))
+            c.executemany("INSERT INTO ticket_status_history (ticket_id, from_status, status, changed_at)"
+                          " VALUES (?,?,?,?)", history)
+        batch.clear()
+        history.clear()
+
+    for i in range(n_tickets):
+        status = rnd.choices(STATUS_OPTIONS, weights)[0]
+        created = start + timedelta(seconds=i * 30 + rnd.randint(0, 29))
+        resolution = " ".join(rnd.choices(words, word_weights, k=rnd.randint(5, 20))) if status == 'Finalizado' else ''
+        batch.append((
+            " ".join(rnd.choices(words, word_weights, k=3)),
+            " ".join(rnd.choices(words, word_weights, k=rnd.randint(10, 120))),
+            status,
+            rnd.choices(employee_ids, employee_weights)[0],
+            created.isoformat(),
+            resolution,
+        ))
+        if with_history:
+            history.extend(history_rows(rnd, next_id + i, created, status))
+        if len(batch) == BATCH_SIZE:
+            flush()
+    if batch:
+        flush()
+    db.conn.commit()
+
+
+def build_database(path, n_tickets, seed=42, dist='backlog', progress=True):
+    """Gera um banco migrado em `path` (via arquivo temporário, para que um
+    banco pela metade nunca seja reaproveitado)."""
+    tmp = path + ".partial"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    t0 = time.perf_counter()
+    db = Database(tmp, profile='padrao', readers=0)
+    # só para a geração: o arquivo é descartável até o rename
+    db.conn.execute("PRAGMA synchronous = OFF")
+    db.conn.execute("PRAGMA journal_mode = MEMORY")
+    populate(db, n_tickets, seed, dist)
+    db.conn.execute("ANALYZE")
+    db.close()
+    os.replace(tmp, path)
+    if progress:
+        print(f"gerado {path} ({n_tickets} chamados) em {time.perf_counter() - t0:.1f} s", file=sys.stderr)
+    return path
+
+
+def cached_database(data_dir, n_tickets, seed=42, dist='backlog'):
+    """Caminho de um banco gerado com esses parâmetros em `data_dir`,
+    gerando-o só se ainda não existir (a versão do esquema entra no nome)."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"callme-{n_tickets}-{dist}-s{seed}-v{SCHEMA_VERSION}.db")
+    if not os.path.exists(path):
+        build_database(path, n_tickets, seed, dist)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scale", help="quantidade de chamados: 10k, 100k, 1m, 5m...")
+    parser.add_argument("--dist", choices=sorted(STATUS_DISTRIBUTIONS), default="backlog")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("-o", "--output", required=True)
+    args = parser.parse_args()
+    if os.path.exists(args.output):
+        parser.error(f"{args.output} já existe")
+    build_database(args.output, parse_scale(args.scale), args.seed, args.dist)
@@ -0,0 +1,9 @@
+"""CallMe - núcleo sem interface gráfica.
+
+callme.db reúne o banco (esquema, migrações e consultas), a importação e a
+exportação de chamados; callme.analytics, os indicadores calculados sobre o
+histórico de status; callme.auth e callme.passwords, login, cadastro e
+hash de senhas; callme.perf, os tempos medidos (spans, histogramas e
+trace JSONL); callme.cli expõe essas operações na linha de comando
+(python -m callme --help). Nada aqui importa PyQt6.
+"""
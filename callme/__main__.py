@@ -0,0 +1,5 @@
+import sys
+
+from callme.cli import main
+
+sys.exit(main())
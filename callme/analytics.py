@@ -0,0 +1,172 @@
+"""Indicadores dos chamados a partir do histórico de status (migração 6).
+
+Tempo em cada status, tempo até a resolução (média, percentis e fração
+dentro do SLA) e backlog por dia, calculados no próprio SQLite com funções
+de janela: só os números agregados saem do banco, e um ano de histórico de
+1M de chamados é resumido em segundos.
+
+Todas as funções recebem um callme.db.Database (como as enviadas ao
+DbExecutor da interface) e um período [start, end), em datetime ou texto
+ISO; as datas estão em UTC, como as do banco. Tempos em horas.
+"""
+import time
+from datetime import date, datetime, timedelta
+
+from callme.db import STATUS_OPTIONS
+
+FINAL_STATUS = "Finalizado"
+SLA_RESOLUTION_HOURS = 72
+RESOLUTION_PERCENTILES = (50, 90, 95)
+
+# variação do backlog causada por uma linha do histórico: +1 ao entrar em
+# aberto, -1 ao sair (status NULL conta como aberto, como em ticket_counts)
+_BACKLOG_DELTA = (f"(status IS NOT '{FINAL_STATUS}')"
+                  f" - (from_status IS NOT NULL AND from_status IS NOT '{FINAL_STATUS}')")
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _utcnow():
+    return datetime.utcnow().isoformat()
+
+
+def last_days(days, now=None):
+    """Período dos últimos `days` dias até agora (ou até `now`)."""
+    end = now or datetime.utcnow()
+    return end - timedelta(days=days), end
+
+
+def time_in_status(db, start, end):
+    """{status: {'hours', 'visits', 'mean_hours'}}: horas somadas de todos
+    os chamados em cada status dentro do período e quantas passagens
+    (permanências em um status) tocaram o período; o status atual conta até
+    agora.
+
+    Cada passagem dura saída - entrada, com os instantes limitados ao
+    período; somando por status, basta cada linha do histórico a partir de
+    `start` (entrada em status, saída de from_status) mais os chamados que
+    ainda estão no status (ticket_counts), que saem "agora". As linhas
+    anteriores ao período contribuem com zero e nem são lidas."""
+    start, end = _iso(start), _iso(end)
+    # uma passada pelo índice de changed_at; cada linha é a entrada em
+    # status e a saída de from_status, em horas desde `start` (até `end`)
+    sql = """
+        SELECT status, from_status, TOTAL(julianday(MIN(changed_at, :end)) - julianday(:start)) * 24,
+               COUNT(*), TOTAL(changed_at < :end)
+        FROM ticket_status_history WHERE changed_at >= :start
+        GROUP BY status, from_status
+    """
+    entered, left, entries, exits, entries_before_end = {}, {}, {}, {}, {}
+    for status, from_status, hours, n, before_end in db.query('analytics.time_in_status', sql, {'start': start, 'end': end}):
+        entered[status] = entered.get(status, 0.0) + hours
+        entries[status] = entries.get(status, 0) + n
+        entries_before_end[status] = entries_before_end.get(status, 0) + int(before_end)
+        if from_status is not None:
+            left[from_status] = left.get(from_status, 0.0) + hours
+            exits[from_status] = exits.get(from_status, 0) + n
+    now = min(max(_utcnow(), start), end)
+    now_offset = (datetime.fromisoformat(now) - datetime.fromisoformat(start)).total_seconds() / 3600
+    current = db.get_ticket_counts()
+    result = {}
+    others = sorted(s for s in entries if s is not None and s not in STATUS_OPTIONS)
+    for status in STATUS_OPTIONS + others:
+        now_in = current.get(status, 0)
+        hours = left.get(status, 0.0) - entered.get(status, 0.0) + now_in * now_offset
+        # as que já estavam no status no início do período mais as que começaram nele
+        at_start = now_in - entries.get(status, 0) + exits.get(status, 0)
+        visits = at_start + entries_before_end.get(status, 0)
+        result[status] = {
+            'hours': hours,
+            'visits': visits,
+            'mean_hours': hours / visits if visits else None,
+        }
+    return result
+
+
+def resolution_times(db, start, end, sla_hours=SLA_RESOLUTION_HOURS, percentiles=RESOLUTION_PERCENTILES):
+    """Tempo da abertura até a primeira finalização dentro do período.
+    Chamados que já nasceram finalizados (importados) ficam de fora.
+    Retorna {'resolved', 'mean_hours', 'within_sla', 'sla_hours',
+    'percentiles': {p: horas}} (percentil pelo posto mais próximo)."""
+    sql = f"""
+        WITH resolved AS (
+            SELECT ticket_id, MIN(changed_at) AS resolved_at FROM ticket_status_history
+            WHERE changed_at >= ? AND changed_at < ? AND status = '{FINAL_STATUS}'
+              AND from_status IS NOT NULL AND from_status IS NOT '{FINAL_STATUS}'
+            GROUP BY ticket_id
+        ), ranked AS (
+            SELECT hours, ROW_NUMBER() OVER (ORDER BY hours) AS rn, COUNT(*) OVER () AS n,
+                   AVG(hours) OVER () AS mean, SUM(hours <= ?) OVER () AS within
+            FROM (SELECT (julianday(r.resolved_at) - julianday(t.created_at)) * 24 AS hours
+                  FROM resolved r JOIN tickets t ON t.id = r.ticket_id)
+        )
+        SELECT p.column1, r.hours, r.n, r.mean, r.within
+        FROM ranked r JOIN (VALUES {", ".join("(?)" for _ in percentiles)}) p
+          ON r.rn * 100 >= p.column1 * r.n AND (r.rn - 1) * 100 < p.column1 * r.n
+    """
+    rows = db.query('analytics.resolution_times', sql, [_iso(start), _iso(end), sla_hours, *percentiles])
+    result = {
+        'resolved': 0,
+        'mean_hours': None,
+        'within_sla': None,
+        'sla_hours': sla_hours,
+        'percentiles': {p: None for p in percentiles},
+    }
+    for p, hours, n, mean, within in rows:
+        result.update(resolved=n, mean_hours=mean, within_sla=within / n)
+        result['percentiles'][p] = hours
+    return result
+
+
+def backlog_per_day(db, start, end):
+    """[(dia, abertos, finalizados, backlog ao fim do dia)] para cada dia do
+    período, inclusive os sem movimento. O backlog parte da contagem atual
+    de chamados em aberto (ticket_counts) e desconta as mudanças posteriores,
+    sem percorrer o histórico anterior ao período."""
+    start, end = _iso(start), _iso(end)
+    counts = db.get_ticket_counts()
+    open_now = counts['Todos'] - counts.get(FINAL_STATUS, 0)
+    later = db.query('analytics.backlog_after', f"SELECT COALESCE(SUM({_BACKLOG_DELTA}), 0)"
+                     " FROM ticket_status_history WHERE changed_at >= ?", (end,))[0][0]
+    sql = f"""
+        SELECT day, opened, resolved, delta,
+               SUM(delta) OVER (ORDER BY day) + ? - SUM(delta) OVER () AS backlog
+        FROM (SELECT date(changed_at) AS day,
+                     SUM(from_status IS NULL) AS opened,
+                     SUM(status = '{FINAL_STATUS}' AND from_status IS NOT NULL
+                         AND from_status IS NOT '{FINAL_STATUS}') AS resolved,
+                     SUM({_BACKLOG_DELTA}) AS delta
+              FROM ticket_status_history WHERE changed_at >= ? AND changed_at < ?
+              GROUP BY day)
+        ORDER BY day
+    """
+    by_day = {row[0]: row[1:] for row in db.query('analytics.backlog_per_day', sql, (open_now - later, start, end))}
+    # até a primeira mudança do período vale o backlog do começo dele
+    backlog = open_now - later - sum(delta for _, _, delta, _ in by_day.values())
+    day = date.fromisoformat(start[:10])
+    last = date.fromisoformat(end[:10])
+    result = []
+    while day <= last:
+        key = day.isoformat()
+        if key in by_day:
+            opened, resolved, _, backlog = by_day[key]
+        else:
+            opened = resolved = 0
+        result.append((key, opened, resolved, backlog))
+        day += timedelta(days=1)
+    return result
+
+
+def dashboard(db, start, end, sla_hours=SLA_RESOLUTION_HOURS):
+    """Todos os indicadores do período de uma vez (aba Indicadores)."""
+    t0 = time.perf_counter()
+    return {
+        'start': _iso(start),
+        'end': _iso(end),
+        'time_in_status': time_in_status(db, start, end),
+        'resolution': resolution_times(db, start, end, sla_hours),
+        'backlog': backlog_per_day(db, start, end),
+        'elapsed': time.perf_counter() - t0,
+    }
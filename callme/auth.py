@@ -0,0 +1,56 @@
+"""Login, cadastro e redefinição de senha.
+
+Cada fluxo faz uma consulta ou uma transação, com as colunas que a
+interface usa (USER_FIELDS): o login lê usuário, hash e conferência do RE
+de uma vez; o cadastro tira o papel do RE no próprio INSERT; a redefinição
+é um UPDATE por e-mail e RE. O hash de senha (callme.passwords) é calculado
+antes, fora da transação.
+
+As funções recebem o Database primeiro, como as enviadas ao DbExecutor, e
+devolvem a mensagem de erro a mostrar (None quando deu certo).
+"""
+import sqlite3
+
+from callme.db import USER_FIELDS
+from callme.passwords import default_context
+
+_USER_KEYS = tuple(field.strip() for field in USER_FIELDS.split(","))
+
+
+def login(db, email, re_val, password, context=None):
+    """(usuário, None) ou (None, mensagem). O usuário é um dict com
+    USER_FIELDS, sem o hash. Um hash antigo ou de custo menor é regravado."""
+    row = db.get_login(email, re_val)
+    if row is None:
+        return None, "Usuário não encontrado."
+    if not row['re_ok']:
+        return None, "RE não corresponde ao usuário."
+    ok, new_hash = (context or default_context()).verify(password, row['password_hash'])
+    if not ok:
+        return None, "Senha incorreta."
+    if new_hash:
+        db.update_password_hash(row['id'], new_hash, row['password_hash'])
+    return {key: row[key] for key in _USER_KEYS}, None
+
+
+def register(db, name, email, password, re_val, context=None):
+    """(papel, None) ou (None, mensagem)."""
+    password_hash = (context or default_context()).hash(password)
+    try:
+        role = db.create_user_with_re(name, email, password_hash, re_val)
+    except sqlite3.IntegrityError:
+        return None, "Email já cadastrado."
+    if role is None:
+        return None, "RE inválido."
+    return role, None
+
+
+def reset_password(db, email, re_val, password, context=None):
+    """None se a senha foi trocada, senão a mensagem de erro."""
+    if db.update_password_by_email_re(email, re_val, (context or default_context()).hash(password)):
+        return None
+    # só no caso de erro: qual dos dois não confere
+    row = db.get_login(email, re_val)
+    if row is None:
+        return "Email não cadastrado."
+    return "RE não corresponde ao usuário."
@@ -0,0 +1,157 @@
+"""Linha de comando do CallMe, sem interface gráfica.
+
+Uso:
+    python -m callme export [--format csv|pdf] [-o ARQUIVO] [--user EMAIL]
+    python -m callme import ARQUIVO [--batch-size N]
+    python -m callme stats [--json]
+    python -m callme vacuum [--prune-events DIAS]
+    python -m callme calibrate-password [--algorithm ALG] [--target-ms MS]
+
+As que usam o banco aceitam --db ARQUIVO (padrão: chamados.db) e --profile,
+como a variável CALLME_DB_PROFILE. Pensada para rotinas agendadas em servidores:
+não importa o Qt e só carrega o ReportLab ao gerar PDF.
+"""
+import argparse
+import json
+import sys
+import time
+
+from callme.db import DB_FILE, DB_PROFILE, DB_PROFILES, IMPORT_BATCH_SIZE, STATUS_OPTIONS, Database
+from callme.passwords import CALIBRATION_TARGET_MS, HASHERS, PASSWORD_HASHER
+
+
+def _progress_printer(enabled):
+    if not enabled:
+        return None
+
+    last = None
+
+    def progress(done, total):
+        nonlocal last
+        pct = 100 * done // max(total, 1)
+        if pct != last:
+            last = pct
+            print(f"\r{pct:3d}%", end="", file=sys.stderr, flush=True)
+    return progress
+
+
+def cmd_export(db, args):
+    user_id = None
+    if args.user:
+        user = db.find_user_by_email(args.user)
+        if user is None:
+            print(f"Usuário não encontrado: {args.user}", file=sys.stderr)
+            return 2
+        user_id = user['id']
+    output = args.output or f"tickets.{args.format}"
+    export = db.export_tickets_pdf if args.format == 'pdf' else db.export_tickets_csv
+    t0 = time.perf_counter()
+    n = export(output, user_id=user_id, progress=_progress_printer(not args.quiet))
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"{n} chamado(s) exportado(s) para {output} em {time.perf_counter() - t0:.1f} s")
+    return 0
+
+
+def cmd_import(db, args):
+    report = db.import_tickets(args.file, progress=_progress_printer(not args.quiet), batch_size=args.batch_size)
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(report.summary())
+    for line, reason in report.rejects:
+        print(f"linha {line}: {reason}")
+    if report.rejected > len(report.rejects):
+        print(f"... e mais {report.rejected - len(report.rejects)} rejeição(ões)")
+    return 0 if report.rejected == 0 else 1
+
+
+def cmd_stats(db, args):
+    stats = db.storage_stats()
+    if args.json:
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+        return 0
+    print(f"arquivo:          {stats['file']}")
+    print(f"tamanho:          {stats['size_bytes'] / 1024 / 1024:.1f} MiB "
+          f"({stats['page_count']} páginas de {stats['page_size']} B, {stats['freelist_count']} livres)")
+    print(f"esquema:          versão {stats['schema_version']}, journal {stats['journal_mode']}, "
+          f"busca {'FTS5' if stats['fts'] else 'LIKE'}")
+    print(f"usuários:         {stats['users']}")
+    print(f"eventos:          {stats['ticket_events']}")
+    counts = stats['tickets']
+    print(f"chamados:         {counts['Todos']}")
+    for status in STATUS_OPTIONS:
+        print(f"  {status + ':':<22}{counts.get(status, 0)}")
+    return 0
+
+
+def cmd_vacuum(db, args):
+    if args.prune_events is not None:
+        print(f"{db.prune_ticket_events(args.prune_events)} evento(s) antigo(s) removido(s)")
+    before, after = db.vacuum()
+    print(f"tamanho: {before / 1024 / 1024:.1f} MiB -> {after / 1024 / 1024:.1f} MiB")
+    return 0
+
+
+def cmd_calibrate_password(db, args):
+    hasher_class = HASHERS[args.algorithm]
+    cost = hasher_class.calibrate(args.target_ms)
+    seconds = hasher_class.time_cost(cost)
+    print(f"{args.algorithm}: custo {cost} ({seconds * 1000:.0f} ms por hash nesta máquina; "
+          f"padrão {hasher_class.default_cost})")
+    print("para usar, defina antes de abrir o CallMe:")
+    print(f"  CALLME_PASSWORD_HASHER={args.algorithm}")
+    print(f"  CALLME_PASSWORD_COST={cost}")
+    print("as senhas são regravadas com o novo custo no próximo login de cada usuário")
+    return 0
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default=DB_FILE, help="arquivo do banco (padrão: %(default)s)")
+    common.add_argument("--profile", default=DB_PROFILE, choices=sorted(DB_PROFILES),
+                        help="perfil de acesso ao SQLite (padrão: %(default)s)")
+    common.add_argument("-q", "--quiet", action="store_true", help="sem indicador de progresso")
+    parser = argparse.ArgumentParser(prog="callme", description="CallMe sem interface gráfica.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("export", parents=[common], help="exporta chamados em CSV (opcionalmente .gz) ou PDF")
+    p.add_argument("--format", choices=("csv", "pdf"), default="csv")
+    p.add_argument("-o", "--output", help="arquivo de saída (padrão: tickets.<formato>)")
+    p.add_argument("--user", metavar="EMAIL", help="só os chamados criados por este usuário")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("import", parents=[common], help="importa chamados de CSV/JSONL")
+    p.add_argument("file", help="arquivo .csv ou .jsonl (pode ser .gz)")
+    p.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("stats", parents=[common], help="contagens e tamanho do banco")
+    p.add_argument("--json", action="store_true", help="saída em JSON")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser("vacuum", parents=[common], help="compacta e otimiza o banco")
+    p.add_argument("--prune-events", type=int, metavar="DIAS",
+                   help="apaga antes eventos de alteração mais antigos que DIAS")
+    p.set_defaults(func=cmd_vacuum)
+
+    p = sub.add_parser("calibrate-password", help="mede o custo de hash de senha que cabe em um tempo-alvo")
+    p.add_argument("--algorithm", choices=sorted(HASHERS),
+                   default=PASSWORD_HASHER if PASSWORD_HASHER in HASHERS else "pbkdf2_sha256")
+    p.add_argument("--target-ms", type=int, default=CALIBRATION_TARGET_MS,
+                   help="tempo desejado por hash, em ms (padrão: %(default)s)")
+    p.set_defaults(func=cmd_calibrate_password, database=False)
+    return parser
+
+
+COMMANDS = ("export", "import", "stats", "vacuum", "calibrate-password")
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not getattr(args, 'database', True):
+        return args.func(None, args)
+    db = Database(args.db, profile=args.profile, readers=0)
+    try:
+        return args.func(db, args)
+    finally:
+        db.close()
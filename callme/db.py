@@ -0,0 +1,1503 @@
+"""Núcleo do CallMe sem interface gráfica: esquema e migrações do banco,
+acesso a dados, importação e exportação de chamados.
+
+Este módulo não importa PyQt6, e o ReportLab só é carregado ao gerar um
+PDF; pode ser usado por scripts e pela linha de comando (python -m callme)
+em servidores sem display.
+"""
+import os
+import sys
+import sqlite3
+import csv
+import gzip
+import io
+import json
+import queue
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+from callme import perf
+
+# raiz do projeto (onde ficam assets/), independente do diretório atual
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def resource_path(relative_path):
+    """Caminho de um arquivo do projeto, também em modo 'empacotado' com
+    PyInstaller (sys._MEIPASS)."""
+    return os.path.join(getattr(sys, '_MEIPASS', BASE_DIR), relative_path)
+
+logo_path = resource_path("assets/logo.png")
+
+DB_FILE = "chamados.db"
+TICKET_PAGE_SIZE = 200
+DESC_PREVIEW_LEN = 120
+# colunas da lista que podem ser ordenadas no banco (cada uma com índice) e a
+# ordem padrão, como (coluna, decrescente)
+TICKET_SORT_COLUMNS = ('id', 'title', 'status', 'created_at')
+DEFAULT_TICKET_ORDER = ('created_at', True)
+# colunas das listas: descrição e resolução vêm só com o começo do texto,
+# gravado por triggers (migração 5; um caractere além da prévia indica que há
+# mais); o texto completo é lido por get_ticket_detail, ao abrir o chamado
+TICKET_LIST_FIELDS = (
+    "t.id, t.title, t.status, t.created_by, t.created_at,"
+    " t.description_preview, t.resolution_preview, u.name AS creator_name"
+)
+
+STATUS_OPTIONS = ["Aberto","Aguardando Técnico","Em Atendimento","Finalizado"]
+
+# colunas do usuário que as telas usam (o hash de senha fica no banco)
+USER_FIELDS = "id, name, email, role, re"
+
+# Perfis de acesso ao SQLite. Escolha com a variável de ambiente
+# CALLME_DB_PROFILE ou passe um dict próprio em Database(profile=...).
+DB_PROFILES = {
+    # journal de rollback padrão do SQLite, apenas esperando em bloqueios
+    'padrao': {
+        'busy_timeout': 5000,
+        'readers': 0,
+    },
+    # várias instâncias na mesma máquina: com WAL os leitores não bloqueiam o
+    # escritor (nem o contrário) e NORMAL evita um fsync a cada commit
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 10000,
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,  # em KiB quando negativo
+        'readers': 4,
+    },
+    # banco em compartilhamento de rede: WAL depende de memória compartilhada
+    # entre processos da mesma máquina e não é seguro aqui, assim como mmap
+    'rede': {
+        'journal_mode': 'TRUNCATE',
+        'synchronous': 'FULL',
+        'busy_timeout': 30000,
+        'mmap_size': 0,
+        'cache_size': -16 * 1024,
+        'readers': 2,
+    },
+}
+DB_PROFILE = os.environ.get("CALLME_DB_PROFILE", "padrao")
+
+SEARCH_LIMIT = 100
+# a relevância é calculada sobre as SEARCH_WINDOW ocorrências mais recentes,
+# o que limita o custo de termos muito comuns (que casam com quase tudo):
+# ordenar todas as ocorrências por bm25 custa proporcional a elas. Um
+# chamado mais antigo que a janela só aparece com termos mais específicos;
+# a tela de busca avisa isso na dica do campo.
+SEARCH_WINDOW = 500
+
+# acima de FEED_MAX_EVENTS eventos pendentes, as telas abertas recarregam a
+# lista em vez de aplicar as alterações uma a uma
+FEED_MAX_EVENTS = 500
+
+# orçamento (em caracteres de texto) do cache de detalhes de chamados
+DETAIL_CACHE_SIZE = 2 * 1024 * 1024
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_BUFFER_SIZE = 1024 * 1024
+
+class ExportCancelled(Exception):
+    """Exportação interrompida a pedido do usuário."""
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_REJECT_DETAILS = 200  # o relatório guarda só as primeiras rejeições
+# nomes aceitos para cada campo na importação (o primeiro é o usado na exportação)
+IMPORT_FIELDS = {
+    'title': ('title', 'titulo', 'título'),
+    'description': ('description', 'descricao', 'descrição'),
+    'status': ('status',),
+    'created_at': ('created_at', 'data'),
+    'resolution': ('resolution', 'resolucao', 'resolução'),
+    'email': ('creator_email', 'email', 'created_by_email'),
+    're': ('creator_re', 're'),
+}
+IMPORT_DATE_FORMATS = ('%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y')
+
+class ImportReport:
+    """Resultado de uma importação de chamados."""
+
+    def __init__(self):
+        self.imported = 0
+        self.rejected = 0
+        self.rejects = []  # (linha, motivo), até IMPORT_MAX_REJECT_DETAILS
+        self.elapsed = 0.0
+        self.cancelled = False
+
+    @property
+    def rate(self):
+        return self.imported / self.elapsed if self.elapsed else 0.0
+
+    def reject(self, line, reason):
+        self.rejected += 1
+        if len(self.rejects) < IMPORT_MAX_REJECT_DETAILS:
+            self.rejects.append((line, reason))
+
+    def summary(self):
+        text = (f"{self.imported} chamado(s) importado(s), {self.rejected} rejeitado(s) "
+                f"em {self.elapsed:.1f} s ({self.rate:.0f} chamados/s)")
+        return text + (" - importação cancelada" if self.cancelled else "")
+
+def _open_import_file(path):
+    """Abre CSV/JSONL (opcionalmente .gz) como texto; devolve também o
+    arquivo binário de baixo, cuja posição serve de progresso."""
+    raw = open(path, 'rb')
+    binary = gzip.GzipFile(fileobj=raw) if path.endswith('.gz') else raw
+    return raw, io.TextIOWrapper(binary, encoding='utf-8-sig', newline='')
+
+def _iter_import_records(path, text):
+    """(nº da linha, dict ou None se ilegível) para cada registro do arquivo."""
+    name = path[:-3] if path.endswith('.gz') else path
+    if name.endswith('.jsonl') or name.endswith('.ndjson'):
+        for line_no, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield line_no, record if isinstance(record, dict) else None
+    else:
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record
+
+def _import_columns(keys):
+    """Para cada campo, as chaves do registro que podem preenchê-lo, em
+    ordem de preferência (cabeçalhos comparados sem caixa e espaços)."""
+    normalized = {}
+    for key in keys:
+        if isinstance(key, str):
+            normalized.setdefault(key.strip().lower(), key)
+    return [(field, [normalized[n] for n in names if n in normalized])
+            for field, names in IMPORT_FIELDS.items()]
+
+def _parse_import_date(value):
+    value = value.strip()
+    try:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        for fmt in IMPORT_DATE_FORMATS:
+            try:
+                dt = datetime.strptime(value, fmt)
+                break
+            except ValueError:
+                continue
+        else:
+            return None
+    if dt.tzinfo is not None:
+        dt = (dt - dt.utcoffset()).replace(tzinfo=None)
+    return dt.isoformat()
+
+def _like_escape(text):
+    """Escapa os curingas de LIKE ('%' e '_') para um padrão com ESCAPE '\\'."""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+# ----------------------- Migrações do esquema -----------------------
+def _create_ticket_fts(c):
+    """Índice FTS5 de conteúdo externo, mantido em sincronia por triggers.
+    Se o SQLite não tiver FTS5, a migração segue sem ele e a busca usa LIKE."""
+    try:
+        c.execute('''
+            CREATE VIRTUAL TABLE tickets_fts USING fts5(
+                title, description, resolution,
+                content='tickets', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        if 'fts5' not in str(e):
+            raise
+        print(f"SQLite sem suporte a FTS5, busca sem índice: {e}", file=sys.stderr)
+        return
+    c.execute('''
+        CREATE TRIGGER tickets_fts_ai AFTER INSERT ON tickets BEGIN
+            INSERT INTO tickets_fts(rowid, title, description, resolution)
+            VALUES (new.id, new.title, new.description, new.resolution);
+        END
+    ''')
+    c.execute('''
+        CREATE TRIGGER tickets_fts_ad AFTER DELETE ON tickets BEGIN
+            INSERT INTO tickets_fts(tickets_fts, rowid, title, description, resolution)
+            VALUES ('delete', old.id, old.title, old.description, old.resolution);
+        END
+    ''')
+    c.execute('''
+        CREATE TRIGGER tickets_fts_au AFTER UPDATE OF title, description, resolution ON tickets BEGIN
+            INSERT INTO tickets_fts(tickets_fts, rowid, title, description, resolution)
+            VALUES ('delete', old.id, old.title, old.description, old.resolution);
+            INSERT INTO tickets_fts(rowid, title, description, resolution)
+            VALUES (new.id, new.title, new.description, new.resolution);
+        END
+    ''')
+    # rank passa a ser bm25 com o título pesando mais que resolução e descrição
+    c.execute("INSERT INTO tickets_fts(tickets_fts, rank) VALUES('rank', 'bm25(10.0, 1.0, 2.0)')")
+    c.execute("INSERT INTO tickets_fts(tickets_fts) VALUES('rebuild')")
+
+# Cada migração é uma lista de passos aplicados em ordem; um passo é um comando
+# SQL ou uma função que recebe o cursor. A versão aplicada fica gravada em
+# PRAGMA user_version, então migrações novas devem ser sempre acrescentadas
+# ao final da lista, nunca editadas depois de publicadas.
+MIGRATIONS = [
+    # 1: índices compostos para os filtros e a ordenação da lista de chamados.
+    # O rowid (t.id) entra implicitamente no fim de cada índice, cobrindo
+    # também o desempate da paginação (created_at, id).
+    [
+        "CREATE INDEX IF NOT EXISTS idx_tickets_created_at ON tickets(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_tickets_status_created ON tickets(status, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_tickets_creator_created ON tickets(created_by, created_at)",
+        # índices simples antigos ficam redundantes com os compostos acima
+        "DROP INDEX IF EXISTS idx_tickets_status",
+        "DROP INDEX IF EXISTS idx_tickets_created_by",
+    ],
+    # 2: busca textual (FTS5) sobre título, descrição e resolução
+    [
+        _create_ticket_fts,
+    ],
+    # 3: registro de eventos dos chamados, lido pelo ChangeFeed para levar
+    # às telas abertas o que esta e outras instâncias criaram ou alteraram
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS ticket_events (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            ticket_id INTEGER NOT NULL,
+            kind TEXT NOT NULL CHECK(kind IN ('created','status')),
+            status TEXT,
+            created_at TEXT NOT NULL
+        )
+        ''',
+    ],
+    # 4: contagens por status e por autor mantidas por triggers, para a barra
+    # de filtros não precisar contar a tabela inteira, e índices para ordenar
+    # a lista por título ou status (a chave de ordenação é sempre (coluna, id);
+    # o id entra implicitamente no fim de cada índice)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS ticket_counts (
+            created_by INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            n INTEGER NOT NULL,
+            PRIMARY KEY (created_by, status)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        INSERT INTO ticket_counts (created_by, status, n)
+        SELECT created_by, COALESCE(status, ''), COUNT(*) FROM tickets
+        WHERE created_by IS NOT NULL GROUP BY created_by, COALESCE(status, '')
+        ''',
+        '''
+        CREATE TRIGGER tickets_counts_ai AFTER INSERT ON tickets BEGIN
+            INSERT INTO ticket_counts (created_by, status, n) VALUES (new.created_by, COALESCE(new.status, ''), 1)
+            ON CONFLICT (created_by, status) DO UPDATE SET n = n + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER tickets_counts_ad AFTER DELETE ON tickets BEGIN
+            UPDATE ticket_counts SET n = n - 1
+            WHERE created_by = old.created_by AND status = COALESCE(old.status, '');
+        END
+        ''',
+        '''
+        CREATE TRIGGER tickets_counts_au AFTER UPDATE OF status, created_by ON tickets BEGIN
+            UPDATE ticket_counts SET n = n - 1
+            WHERE created_by = old.created_by AND status = COALESCE(old.status, '');
+            INSERT INTO ticket_counts (created_by, status, n) VALUES (new.created_by, COALESCE(new.status, ''), 1)
+            ON CONFLICT (created_by, status) DO UPDATE SET n = n + 1;
+        END
+        ''',
+        # (status, id): ordenação por status e por id com filtro de status
+        "CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets(status)",
+        "CREATE INDEX IF NOT EXISTS idx_tickets_title ON tickets(title)",
+        "CREATE INDEX IF NOT EXISTS idx_tickets_status_title ON tickets(status, title)",
+    ],
+    # 5: começo da descrição e da resolução gravado junto do chamado, para as
+    # listas não lerem nem cortarem o texto inteiro a cada página. Guarda um
+    # caractere além da prévia (indica que há mais); mudar DESC_PREVIEW_LEN
+    # pede uma nova migração que refaça o preenchimento. Na inserção as
+    # prévias vão no próprio INSERT (tickets.insert); o trigger cobre as
+    # alterações de descrição e resolução.
+    [
+        "ALTER TABLE tickets ADD COLUMN description_preview TEXT",
+        "ALTER TABLE tickets ADD COLUMN resolution_preview TEXT",
+        f"UPDATE tickets SET description_preview = substr(description, 1, {DESC_PREVIEW_LEN + 1}),"
+        f" resolution_preview = substr(resolution, 1, {DESC_PREVIEW_LEN + 1})",
+        f'''
+        CREATE TRIGGER tickets_preview_au AFTER UPDATE OF description, resolution ON tickets BEGIN
+            UPDATE tickets SET description_preview = substr(new.description, 1, {DESC_PREVIEW_LEN + 1}),
+                               resolution_preview = substr(new.resolution, 1, {DESC_PREVIEW_LEN + 1})
+            WHERE id = new.id;
+        END
+        ''',
+    ],
+    # 6: histórico de status (callme.analytics). Uma linha por entrada em um
+    # status, com o status anterior (NULL na criação); gravado por triggers,
+    # vale também para importações e outras instâncias. ticket_events pode ser
+    # podado (callme vacuum), este histórico não.
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS ticket_status_history (
+            id INTEGER PRIMARY KEY,
+            ticket_id INTEGER NOT NULL,
+            from_status TEXT,
+            status TEXT,
+            changed_at TEXT NOT NULL
+        )
+        ''',
+        # o histórico antigo sai dos eventos que restam: o status da criação
+        # (ou 'Aberto', se só há eventos de mudança), as mudanças e, por fim,
+        # o status atual; repetições consecutivas são descartadas
+        '''
+        INSERT INTO ticket_status_history (ticket_id, from_status, status, changed_at)
+        SELECT ticket_id, prev, status, changed_at FROM (
+            SELECT ticket_id, status, changed_at, ord,
+                   LAG(status) OVER (PARTITION BY ticket_id ORDER BY changed_at, ord) AS prev,
+                   ROW_NUMBER() OVER (PARTITION BY ticket_id ORDER BY changed_at, ord) AS n
+            FROM (
+                SELECT t.id AS ticket_id, t.created_at AS changed_at, 0 AS ord,
+                       COALESCE((SELECT e.status FROM ticket_events e
+                                 WHERE e.ticket_id = t.id AND e.kind = 'created' LIMIT 1),
+                                CASE WHEN EXISTS (SELECT 1 FROM ticket_events e
+                                                  WHERE e.ticket_id = t.id AND e.kind = 'status')
+                                     THEN 'Aberto' ELSE t.status END) AS status
+                FROM tickets t
+                UNION ALL
+                SELECT e.ticket_id, e.created_at, 1 + e.seq, e.status
+                FROM ticket_events e JOIN tickets t ON t.id = e.ticket_id
+                WHERE e.kind = 'status'
+                UNION ALL
+                SELECT t.id, MAX(COALESCE((SELECT MAX(e.created_at) FROM ticket_events e
+                                           WHERE e.ticket_id = t.id), t.created_at), t.created_at), 1e18, t.status
+                FROM tickets t
+            )
+        )
+        WHERE n = 1 OR prev IS NOT status
+        ORDER BY ticket_id, changed_at, ord
+        ''',
+        "CREATE INDEX IF NOT EXISTS idx_status_history_ticket ON ticket_status_history(ticket_id, changed_at)",
+        # cobre as consultas por período de callme.analytics sem ler a tabela
+        "CREATE INDEX IF NOT EXISTS idx_status_history_changed"
+        " ON ticket_status_history(changed_at, status, from_status, ticket_id)",
+        '''
+        CREATE TRIGGER tickets_history_ai AFTER INSERT ON tickets BEGIN
+            INSERT INTO ticket_status_history (ticket_id, from_status, status, changed_at)
+            VALUES (new.id, NULL, new.status, COALESCE(new.created_at, strftime('%Y-%m-%dT%H:%M:%f', 'now')));
+        END
+        ''',
+        '''
+        CREATE TRIGGER tickets_history_au AFTER UPDATE OF status ON tickets
+        WHEN new.status IS NOT old.status BEGIN
+            INSERT INTO ticket_status_history (ticket_id, from_status, status, changed_at)
+            VALUES (new.id, old.status, new.status, strftime('%Y-%m-%dT%H:%M:%f', 'now'));
+        END
+        ''',
+        '''
+        CREATE TRIGGER tickets_history_ad AFTER DELETE ON tickets BEGIN
+            DELETE FROM ticket_status_history WHERE ticket_id = old.id;
+        END
+        ''',
+    ],
+    # 7: índices da ordenação da lista para as duas telas. A chave é
+    # (COALESCE(coluna, ''), id), igual à de get_tickets_page: linhas antigas
+    # com NULL ordenam como texto vazio em vez de sumir da paginação. A tela
+    # do funcionário filtra por created_by e ganha os seus próprios índices;
+    # com filtro de status, ordenar por status é ordenar por id (status, id).
+    [
+        "DROP INDEX IF EXISTS idx_tickets_created_at",
+        "DROP INDEX IF EXISTS idx_tickets_status_created",
+        "DROP INDEX IF EXISTS idx_tickets_creator_created",
+        "DROP INDEX IF EXISTS idx_tickets_status",
+        "DROP INDEX IF EXISTS idx_tickets_title",
+        "DROP INDEX IF EXISTS idx_tickets_status_title",
+        "CREATE INDEX idx_tickets_created_at ON tickets(COALESCE(created_at, ''), id)",
+        "CREATE INDEX idx_tickets_title ON tickets(COALESCE(title, ''), id)",
+        "CREATE INDEX idx_tickets_status_sort ON tickets(COALESCE(status, ''), id)",
+        "CREATE INDEX idx_tickets_status ON tickets(status, id)",
+        "CREATE INDEX idx_tickets_status_created ON tickets(status, COALESCE(created_at, ''), id)",
+        "CREATE INDEX idx_tickets_status_title ON tickets(status, COALESCE(title, ''), id)",
+        "CREATE INDEX idx_tickets_creator ON tickets(created_by, id)",
+        "CREATE INDEX idx_tickets_creator_created ON tickets(created_by, COALESCE(created_at, ''), id)",
+        "CREATE INDEX idx_tickets_creator_title ON tickets(created_by, COALESCE(title, ''), id)",
+        "CREATE INDEX idx_tickets_creator_status ON tickets(created_by, COALESCE(status, ''), id)",
+    ],
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# ----------------------- Relatório PDF -----------------------
+# as linhas vão em tabelas de até uma página cada (ver export_tickets_pdf):
+# uma tabela maior que a página é quebrada e remedida a cada página
+PDF_CELL_PADDING = (4, 3)  # (horizontal, vertical) de cada lado da célula
+
+PDF_HEADER = ['ID', 'Título', 'Descrição', 'Status', 'Criado por', 'Data', 'Resolução']
+
+_pdf_resources = None
+_pdf_resources_lock = threading.Lock()
+
+def pdf_resources():
+    """Estilos, larguras de coluna e logo do relatório, montados uma única vez
+    por processo e reaproveitados entre exportações."""
+    global _pdf_resources
+    with _pdf_resources_lock:
+        if _pdf_resources is None:
+            from reportlab.lib import colors
+            from reportlab.lib.pagesizes import A4
+            from reportlab.lib.styles import getSampleStyleSheet
+            from reportlab.lib.units import mm
+            from reportlab.platypus import TableStyle
+
+            styles = getSampleStyleSheet()
+            normal = styles["Normal"]
+            normal.fontSize = 9
+            heading = styles["Heading1"]
+            heading.fontSize = 16
+
+            # Column widths (approx, in points)
+            page_width = A4[0] - (40*mm)  # A4 width minus left+right margins
+            col_widths = [
+                30,                # ID
+                90,                # Title
+                200,               # Description
+                60,                # Status
+                80,                # Creator
+                80,                # Date
+                page_width - (30+90+200+60+80+80)  # Resolution: remaining
+            ]
+            # Ensure no negative widths
+            col_widths = [w if w > 20 else 60 for w in col_widths]
+
+            common = [
+                ('ALIGN', (0,0), (0,-1), 'CENTER'),
+                ('VALIGN', (0,0), (-1,-1), 'TOP'),
+                ('FONTSIZE', (0,0), (-1,-1), 9),
+                ('INNERGRID', (0,0), (-1,-1), 0.25, colors.grey),
+                ('BOX', (0,0), (-1,-1), 0.5, colors.grey),
+                ('LEFTPADDING', (0,0), (-1,-1), PDF_CELL_PADDING[0]),
+                ('RIGHTPADDING', (0,0), (-1,-1), PDF_CELL_PADDING[0]),
+                ('TOPPADDING', (0,0), (-1,-1), PDF_CELL_PADDING[1]),
+                ('BOTTOMPADDING', (0,0), (-1,-1), PDF_CELL_PADDING[1]),
+            ]
+            header_style = TableStyle(common + [
+                ('BACKGROUND', (0,0), (-1,0), colors.HexColor("#0055ff")),
+                ('TEXTCOLOR', (0,0), (-1,0), colors.white),
+                ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+            ])
+
+            logo = None
+            try:
+                with open(logo_path, 'rb') as f:
+                    logo = f.read()
+            except OSError as e:
+                print(f"Erro ao carregar logo: {e}", file=sys.stderr)
+
+            _pdf_resources = {
+                'normal': normal,
+                'heading': heading,
+                'col_widths': col_widths,
+                'body_style': TableStyle(common),
+                'header_style': header_style,
+                'logo': logo,
+            }
+        return _pdf_resources
+
+def _pdf_header_table(res):
+    from reportlab.platypus import Table
+    tbl = Table([PDF_HEADER], colWidths=res['col_widths'])
+    tbl.setStyle(res['header_style'])
+    return tbl
+
+def _pdf_row(r, res):
+    """Células de um chamado e a altura que a linha ocupa na tabela."""
+    from reportlab.platypus import Paragraph
+    from xml.sax.saxutils import escape as xml_escape  # traz urllib/email junto
+    normal = res['normal']
+    desc = xml_escape(r['description'] or "")
+    resolution = xml_escape(r['resolution'] or "")
+    # Paragraphs for wrapping long text
+    cells = [
+        str(r['id']),
+        Paragraph(xml_escape(r['title'] or ""), normal),
+        Paragraph(desc.replace('\n', '<br />'), normal),
+        r['status'] or "",
+        Paragraph(xml_escape(r['creator_name'] or ""), normal),
+        Paragraph(r['created_at'] or "", normal),
+        Paragraph(resolution.replace('\n', '<br />'), normal)
+    ]
+    height = normal.leading
+    for cell, width in zip(cells, res['col_widths']):
+        if isinstance(cell, Paragraph):
+            height = max(height, cell.wrap(width - 2 * PDF_CELL_PADDING[0], 1e6)[1])
+    return cells, height + 2 * PDF_CELL_PADDING[1]
+
+def _pdf_rows_table(data, heights, res):
+    # alturas já medidas em _pdf_row: a tabela não mede os parágrafos de novo
+    from reportlab.platypus import Table
+    tbl = Table(data, colWidths=res['col_widths'], rowHeights=heights)
+    tbl.setStyle(res['body_style'])
+    return tbl
+
+class _FlowableStream(list):
+    """Lista de flowables que o ReportLab consome pela frente; quando esvazia,
+    é reabastecida com a próxima tabela do gerador. Assim só a tabela em
+    layout (e o que sobrou dela) fica em memória."""
+
+    def __init__(self, head, tail):
+        super().__init__(head)
+        self._tail = tail
+
+    def __len__(self):
+        if not list.__len__(self):
+            nxt = next(self._tail, None)
+            if nxt is not None:
+                self.append(nxt)
+        return list.__len__(self)
+
+# ----------------------- Consultas -----------------------
+# Todo o SQL do Database, por nome; o nome é a chave das métricas de
+# Database.query_stats(). As consultas montadas em tempo de execução (página
+# da lista, busca) partem do molde registrado aqui ou são contadas pelo nome
+# dele. Texto fixo por nome também mantém cada instrução preparada no cache
+# do sqlite3 (STATEMENT_CACHE_SIZE) em vez de recompilada a cada chamada.
+_TICKETS_JOIN_USERS = "FROM tickets t JOIN users u ON t.created_by = u.id"
+EXPORT_FIELDS = ("t.id, t.title, t.description, t.status, t.created_at, t.resolution,"
+                 " u.name as creator_name, u.email")
+
+QUERIES = {
+    'res.count': "SELECT COUNT(*) FROM res",
+    'res.insert': "INSERT INTO res (re, role) VALUES (?,?)",
+    'res.get': "SELECT * FROM res WHERE re=?",
+
+    'users.insert': "INSERT INTO users (name,email,password_hash,role,re) VALUES (?,?,?,?,?)",
+    'users.insert_with_re': ("INSERT INTO users (name,email,password_hash,role,re)"
+                             " SELECT ?,?,?,role,re FROM res WHERE re=?"),
+    'users.role': "SELECT role FROM users WHERE id=?",
+    'users.login': f"SELECT {USER_FIELDS}, password_hash, re IS ? AS re_ok FROM users WHERE email=?",
+    'users.by_email': "SELECT * FROM users WHERE email=?",
+    'users.by_id': "SELECT * FROM users WHERE id=?",
+    'users.update': "UPDATE users SET name=?, email=? WHERE id=?",
+    'users.rehash': "UPDATE users SET password_hash=? WHERE id=? AND password_hash=?",
+    'users.reset_password': "UPDATE users SET password_hash=? WHERE email=? AND re=?",
+    'users.import_keys': "SELECT id, email, re FROM users",
+    'users.count': "SELECT COUNT(*) FROM users",
+
+    'tickets.insert': ("INSERT INTO tickets (title,description,status,created_by,created_at,resolution,"
+                       "description_preview,resolution_preview) VALUES (?1,?2,?3,?4,?5,?6,"
+                       f"substr(?2, 1, {DESC_PREVIEW_LEN + 1}),substr(?6, 1, {DESC_PREVIEW_LEN + 1}))"),
+    'tickets.all': (f"SELECT t.*, u.name as creator_name {_TICKETS_JOIN_USERS}"
+                    " ORDER BY COALESCE(t.created_at, '') DESC"),
+    'tickets.all_by_status': (f"SELECT t.*, u.name as creator_name {_TICKETS_JOIN_USERS}"
+                              " WHERE t.status=? ORDER BY COALESCE(t.created_at, '') DESC"),
+    'tickets.by_user': (f"SELECT t.*, u.name as creator_name {_TICKETS_JOIN_USERS}"
+                        " WHERE created_by=? ORDER BY COALESCE(t.created_at, '') DESC"),
+    # molde: get_tickets_page acrescenta WHERE, ORDER BY e LIMIT
+    'tickets.page': f"SELECT {TICKET_LIST_FIELDS} {_TICKETS_JOIN_USERS}",
+    'tickets.get': (f"SELECT t.*, u.name as creator_name, u.email as creator_email {_TICKETS_JOIN_USERS}"
+                    " WHERE t.id=?"),
+    'tickets.set_status': "UPDATE tickets SET status=? WHERE id=?",
+    'tickets.set_status_resolution': "UPDATE tickets SET status=?, resolution=? WHERE id=?",
+    # ids em um array JSON; devolvem os ids que existiam (e foram alterados)
+    'tickets.set_status_many': ("UPDATE tickets SET status=? WHERE id IN (SELECT value FROM json_each(?))"
+                                " RETURNING id"),
+    'tickets.set_status_resolution_many': ("UPDATE tickets SET status=?, resolution=?"
+                                           " WHERE id IN (SELECT value FROM json_each(?)) RETURNING id"),
+    'tickets.last_id': "SELECT COALESCE(MAX(id), 0) FROM tickets",
+
+    'counts.all': "SELECT status, SUM(n) FROM ticket_counts GROUP BY status",
+    'counts.user': "SELECT status, SUM(n) FROM ticket_counts WHERE created_by=? GROUP BY status",
+
+    'events.insert': "INSERT INTO ticket_events (ticket_id, kind, status, created_at) VALUES (?,?,?,?)",
+    'events.insert_created_after': ("INSERT INTO ticket_events (ticket_id, kind, status, created_at)"
+                                    " SELECT id, 'created', status, ? FROM tickets WHERE id > ?"),
+    'events.last_seq': "SELECT COALESCE(MAX(seq), 0) FROM ticket_events",
+    'events.pending': "SELECT COUNT(*), MAX(seq) FROM (SELECT seq FROM ticket_events WHERE seq > ? LIMIT ?)",
+    'events.changed_tickets': (f"SELECT {TICKET_LIST_FIELDS} {_TICKETS_JOIN_USERS}"
+                               " WHERE t.id IN (SELECT ticket_id FROM ticket_events WHERE seq > ? AND seq <= ?)"
+                               " ORDER BY t.created_at, t.id"),
+    'events.count': "SELECT COUNT(*) FROM ticket_events",
+    'events.prune': "DELETE FROM ticket_events WHERE created_at < ?",
+
+    'fts.exists': "SELECT 1 FROM sqlite_master WHERE type='table' AND name='tickets_fts'",
+    'fts.optimize': "INSERT INTO tickets_fts(tickets_fts) VALUES('optimize')",
+
+    # CSV e PDF leem as mesmas linhas (iter_export_rows)
+    'export.count': f"SELECT COUNT(*) {_TICKETS_JOIN_USERS}",
+    'export.count_user': f"SELECT COUNT(*) {_TICKETS_JOIN_USERS} WHERE t.created_by=?",
+    'export.rows': f"SELECT {EXPORT_FIELDS} {_TICKETS_JOIN_USERS} ORDER BY COALESCE(t.created_at, '') DESC",
+    'export.rows_user': (f"SELECT {EXPORT_FIELDS} {_TICKETS_JOIN_USERS}"
+                         " WHERE t.created_by=? ORDER BY COALESCE(t.created_at, '') DESC"),
+}
+
+# instruções preparadas guardadas por conexão: as de QUERIES mais as
+# variações da página (ordem, filtro, cursor) e da busca
+STATEMENT_CACHE_SIZE = 256
+
+# ----------------------- Conexões e métricas de contenção -----------------------
+def _apply_pragmas(conn, profile, writer):
+    conn.execute(f"PRAGMA busy_timeout = {int(profile.get('busy_timeout', 5000))}")
+    # journal_mode é gravado no próprio arquivo; basta o escritor definir
+    if writer and profile.get('journal_mode'):
+        conn.execute(f"PRAGMA journal_mode = {profile['journal_mode']}")
+    for name in ('synchronous', 'mmap_size', 'cache_size'):
+        if name in profile:
+            conn.execute(f"PRAGMA {name} = {profile[name]}")
+
+class DbStats:
+    """Contadores de contenção do banco, seguros entre threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.reader_acquires = 0
+            self.reader_waits = 0
+            self.reader_wait_total = 0.0
+            self.reader_wait_max = 0.0
+            self.writes = 0
+            self.write_time_total = 0.0
+            self.write_time_max = 0.0
+            self.lock_errors = 0
+
+    def record_reader(self, waited, wait_time):
+        with self._lock:
+            self.reader_acquires += 1
+            if waited:
+                self.reader_waits += 1
+            self.reader_wait_total += wait_time
+            self.reader_wait_max = max(self.reader_wait_max, wait_time)
+
+    def record_write(self, elapsed, locked=False):
+        with self._lock:
+            self.writes += 1
+            self.write_time_total += elapsed
+            self.write_time_max = max(self.write_time_max, elapsed)
+            if locked:
+                self.lock_errors += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'reader_acquires': self.reader_acquires,
+                'reader_waits': self.reader_waits,
+                'reader_wait_ms_total': self.reader_wait_total * 1000,
+                'reader_wait_ms_max': self.reader_wait_max * 1000,
+                'writes': self.writes,
+                'write_ms_total': self.write_time_total * 1000,
+                'write_ms_max': self.write_time_max * 1000,
+                'lock_errors': self.lock_errors,
+            }
+
+class ReaderPool:
+    """Conexões somente leitura, separadas da conexão de escrita e
+    utilizáveis a partir de qualquer thread."""
+
+    def __init__(self, db_file, size, profile, stats):
+        self.stats = stats
+        self._conns = []
+        self._cursors = {}  # um cursor reaproveitado por conexão
+        self._free = queue.LifoQueue()
+        for _ in range(size):
+            conn = sqlite3.connect(db_file, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+            conn.row_factory = sqlite3.Row
+            _apply_pragmas(conn, profile, writer=False)
+            conn.execute("PRAGMA query_only = 1")
+            self._conns.append(conn)
+            self._cursors[conn] = conn.cursor()
+            self._free.put(conn)
+
+    @contextmanager
+    def connection(self):
+        t0 = time.perf_counter()
+        try:
+            conn = self._free.get_nowait()
+            waited = False
+        except queue.Empty:
+            conn = self._free.get()
+            waited = True
+        self.stats.record_reader(waited, time.perf_counter() - t0)
+        try:
+            yield conn
+        finally:
+            self._free.put(conn)
+
+    @contextmanager
+    def cursor(self, fresh=False):
+        with self.connection() as conn:
+            yield conn.cursor() if fresh else self._cursors[conn]
+
+    def close(self):
+        for conn in self._conns:
+            conn.close()
+
+class TicketDetailCache:
+    """LRU dos chamados completos (descrição e resolução inteiras) abertos
+    pela interface. O limite é o total de caracteres guardados, não o
+    número de chamados: um texto enorme expulsa vários pequenos."""
+
+    def __init__(self, load, max_size=DETAIL_CACHE_SIZE):
+        self._load = load
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()  # tid -> (linha, tamanho)
+        self._lock = threading.Lock()
+        # avança a cada invalidação: uma leitura que começou antes dela pode
+        # ter trazido a versão velha e não entra no cache
+        self._generation = 0
+
+    @staticmethod
+    def _sizeof(row):
+        return sum(len(v) for v in row if isinstance(v, str))
+
+    def get(self, tid):
+        with self._lock:
+            item = self._items.get(tid)
+            if item is not None:
+                self._items.move_to_end(tid)
+                self.hits += 1
+                return item[0]
+            self.misses += 1
+            generation = self._generation
+        row = self._load(tid)
+        if row is not None:
+            self._put(tid, row, generation)
+        return row
+
+    def _put(self, tid, row, generation):
+        size = self._sizeof(row)
+        with self._lock:
+            if generation != self._generation:
+                return
+            old = self._items.pop(tid, None)
+            if old is not None:
+                self.size -= old[1]
+            if size > self.max_size:
+                return
+            self._items[tid] = (row, size)
+            self.size += size
+            while self.size > self.max_size:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.size -= evicted
+
+    def invalidate(self, tids):
+        with self._lock:
+            self._generation += 1
+            for tid in tids:
+                item = self._items.pop(tid, None)
+                if item is not None:
+                    self.size -= item[1]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._items.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._items)
+
+# ----------------------- Banco de dados -----------------------
+class Database:
+    def __init__(self, db_file=DB_FILE, migrate=True, profile=DB_PROFILE, readers=None):
+        self.db_file = db_file
+        if isinstance(profile, str):
+            if profile not in DB_PROFILES:
+                raise ValueError(f"CALLME_DB_PROFILE desconhecido: {profile}; use {', '.join(DB_PROFILES)}")
+            self.profile = DB_PROFILES[profile]
+        else:
+            self.profile = dict(profile)
+        self.stats = DbStats()
+        # tempo de cada consulta de QUERIES; no trace aparecem como db.<nome>
+        self.query_timing = perf.Recorder(perf.trace, prefix="db.")
+        self._fts = None
+        self.conn = sqlite3.connect(db_file, cached_statements=STATEMENT_CACHE_SIZE)
+        self.conn.row_factory = sqlite3.Row
+        # cursor reaproveitado pelas consultas da conexão principal; quem
+        # percorre um resultado aos poucos (iter_export_rows) usa um próprio
+        self._cursor = self.conn.cursor()
+        _apply_pragmas(self.conn, self.profile, writer=True)
+        self.create_tables()
+        if migrate:
+            self.migrate()
+        if readers is None:
+            readers = self.profile.get('readers', 0)
+        self.pool = ReaderPool(db_file, readers, self.profile, self.stats) if readers else None
+        self.details = TicketDetailCache(self.get_ticket)
+
+    def close(self):
+        if self.pool:
+            self.pool.close()
+        self.conn.close()
+
+    def contention_stats(self):
+        return self.stats.snapshot()
+
+    def query_stats(self):
+        """Chamadas, tempos e histograma por consulta desde a abertura
+        (perf.Recorder.snapshot)."""
+        return self.query_timing.snapshot()
+
+    def _execute(self, c, name, params=(), sql=None):
+        """Executa a consulta `name` de QUERIES (ou `sql`, montada a partir
+        dela) no cursor `c`, contando chamada e tempo."""
+        t0 = time.perf_counter()
+        c.execute(sql or QUERIES[name], params)
+        self.query_timing.record(name, time.perf_counter() - t0)
+        return c
+
+    def _executemany(self, c, name, seq_of_params):
+        t0 = time.perf_counter()
+        c.executemany(QUERIES[name], seq_of_params)
+        self.query_timing.record(name, time.perf_counter() - t0)
+        return c
+
+    def _fetchone(self, c, name, params=(), sql=None):
+        t0 = time.perf_counter()
+        row = c.execute(sql or QUERIES[name], params).fetchone()
+        self.query_timing.record(name, time.perf_counter() - t0)
+        return row
+
+    def _fetchall(self, c, name, params=(), sql=None):
+        t0 = time.perf_counter()
+        rows = c.execute(sql or QUERIES[name], params).fetchall()
+        self.query_timing.record(name, time.perf_counter() - t0)
+        return rows
+
+    def query(self, name, sql, params=()):
+        """Consulta avulsa na conexão principal, fora de QUERIES (as de
+        callme.analytics), contada em query_stats sob `name`."""
+        return self._fetchall(self._cursor, name, params, sql)
+
+    @contextmanager
+    def _writing(self):
+        """Transação de escrita na conexão principal: commit ao final,
+        rollback em caso de erro, com tempo e bloqueios contabilizados."""
+        t0 = time.perf_counter()
+        locked = False
+        try:
+            yield self._cursor
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            locked = isinstance(e, sqlite3.OperationalError) and 'locked' in str(e)
+            raise
+        finally:
+            self.stats.record_write(time.perf_counter() - t0, locked)
+
+    @contextmanager
+    def _reading(self, fresh=False):
+        """Cursor para consultas: do pool de leitores, se houver. `fresh`
+        pede um cursor novo, para resultados lidos aos poucos."""
+        if self.pool is None:
+            yield self.conn.cursor() if fresh else self._cursor
+        else:
+            with self.pool.cursor(fresh) as c:
+                yield c
+
+    def create_tables(self):
+        c = self.conn.cursor()
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS res (
+                id INTEGER PRIMARY KEY,
+                re TEXT UNIQUE,
+                role TEXT CHECK(role IN ('funcionario','tecnico'))
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY,
+                name TEXT,
+                email TEXT UNIQUE,
+                password_hash TEXT,
+                role TEXT CHECK(role IN ('funcionario','tecnico')),
+                re TEXT
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS tickets (
+                id INTEGER PRIMARY KEY,
+                title TEXT,
+                description TEXT,
+                status TEXT,
+                created_by INTEGER,
+                created_at TEXT,
+                resolution TEXT,
+                FOREIGN KEY(created_by) REFERENCES users(id)
+            )
+        ''')
+        self.conn.commit()
+        self._ensure_sample_res()
+
+    def _ensure_sample_res(self):
+        if self._fetchone(self._cursor, 'res.count')[0] == 0:
+            with self._writing() as c:
+                for i in range(1, 11):
+                    self._execute(c, 'res.insert', (f"FUNC{i:03d}", 'funcionario'))
+                for i in range(1, 4):
+                    self._execute(c, 'res.insert', (f"TEC{i:03d}", 'tecnico'))
+
+    def schema_version(self):
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def migrate(self):
+        """Aplica as migrações pendentes, cada uma em sua própria transação."""
+        current = self.schema_version()
+        for version in range(current + 1, SCHEMA_VERSION + 1):
+            c = self.conn.cursor()
+            try:
+                c.execute("BEGIN")
+                for step in MIGRATIONS[version - 1]:
+                    if callable(step):
+                        step(c)
+                    else:
+                        c.execute(step)
+                c.execute(f"PRAGMA user_version = {version}")
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+    def create_user(self, name, email, password_hash, role, re):
+        try:
+            with self._writing() as c:
+                self._execute(c, 'users.insert', (name, email, password_hash, role, re))
+            return True
+        except sqlite3.IntegrityError:
+            return False
+
+    def get_login(self, email, re_val):
+        """Uma consulta para o login: USER_FIELDS, password_hash e re_ok (se
+        o RE confere), ou None se o e-mail não existe."""
+        return self._fetchone(self._cursor, 'users.login', (re_val, email))
+
+    def create_user_with_re(self, name, email, password_hash, re_val):
+        """Cadastra o usuário com o papel do seu RE numa só transação
+        (INSERT ... SELECT em res). Retorna o papel, ou None se o RE não
+        existe; e-mail repetido levanta sqlite3.IntegrityError."""
+        with self._writing() as c:
+            self._execute(c, 'users.insert_with_re', (name, email, password_hash, re_val))
+            if c.rowcount != 1:
+                return None
+            return self._fetchone(c, 'users.role', (c.lastrowid,))[0]
+
+    def find_user_by_email(self, email):
+        return self._fetchone(self._cursor, 'users.by_email', (email,))
+
+    def get_user_by_id(self, uid):
+        return self._fetchone(self._cursor, 'users.by_id', (uid,))
+
+    def update_user(self, uid, name, email):
+        with self._writing() as c:
+            self._execute(c, 'users.update', (name, email, uid))
+
+    def check_re(self, re):
+        return self._fetchone(self._cursor, 'res.get', (re,))
+
+    def create_ticket(self, title, description, created_by):
+        now = datetime.utcnow().isoformat()
+        with self._writing() as c:
+            self._execute(c, 'tickets.insert', (title, description, 'Aberto', created_by, now, ''))
+            tid = c.lastrowid
+            self._log_ticket_event(c, tid, 'created', 'Aberto')
+        return tid
+
+    def get_tickets_for_user(self, user, status_filter=None):
+        with self._reading() as c:
+            if user['role'] != 'tecnico':
+                return self._fetchall(c, 'tickets.by_user', (user['id'],))
+            if status_filter and status_filter != "Todos":
+                return self._fetchall(c, 'tickets.all_by_status', (status_filter,))
+            return self._fetchall(c, 'tickets.all')
+
+    def get_tickets_page(self, user, status_filter=None, cursor=None, page_size=TICKET_PAGE_SIZE,
+                         order=DEFAULT_TICKET_ORDER):
+        """Retorna uma página de chamados e o cursor da próxima.
+        Paginação por chave (coluna, id), na ordem `order` = (coluna,
+        decrescente): cada página continua a partir da última linha da
+        anterior, sem OFFSET. O cursor é None na última página."""
+        column, descending = order
+        if column not in TICKET_SORT_COLUMNS:
+            raise ValueError(f"Coluna de ordenação inválida: {column}")
+        op, direction = ('<', 'DESC') if descending else ('>', 'ASC')
+        query = QUERIES['tickets.page']
+        where = []
+        params = []
+        by_id = column == 'id'
+        if user['role'] == 'tecnico':
+            if status_filter and status_filter != "Todos":
+                where.append("t.status=?")
+                params.append(status_filter)
+                # status fixo: a ordem por status é a ordem por id
+                by_id = by_id or column == 'status'
+        else:
+            where.append("t.created_by=?")
+            params.append(user['id'])
+        # NULL (linhas antigas) ordena como '': (NULL, id) > (?, ?) nunca seria
+        # verdadeiro e a linha sumiria da paginação (ver migração 7). A chave
+        # (key, id) > (?, ?) vai escrita por partes: com valor de linha o
+        # SQLite não usa o índice de expressão como intervalo.
+        key = f"COALESCE(t.{column}, '')"
+        if cursor is not None:
+            if by_id:
+                where.append(f"t.id {op} ?")
+                params.append(cursor[1])
+            else:
+                where.append(f"{key} {op}= ? AND ({key} {op} ? OR t.id {op} ?)")
+                params.extend((cursor[0], cursor[0], cursor[1]))
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        if by_id:
+            query += f" ORDER BY t.id {direction} LIMIT ?"
+        else:
+            query += f" ORDER BY {key} {direction}, t.id {direction} LIMIT ?"
+        # Uma linha a mais indica se ainda existe próxima página
+        params.append(page_size + 1)
+        with self._reading() as c:
+            rows = self._fetchall(c, 'tickets.page', params, query)
+        if len(rows) <= page_size:
+            return rows, None
+        rows = rows[:page_size]
+        last = rows[-1]
+        return rows, (last[column] or '', last['id'])
+
+    def iter_tickets_for_user(self, user, status_filter=None, page_size=TICKET_PAGE_SIZE,
+                              order=DEFAULT_TICKET_ORDER):
+        """Percorre todos os chamados visíveis ao usuário, uma página por vez."""
+        cursor = None
+        while True:
+            rows, cursor = self.get_tickets_page(user, status_filter, cursor, page_size, order)
+            yield from rows
+            if cursor is None:
+                break
+
+    def get_ticket_counts(self, created_by=None):
+        """Quantidade de chamados por status, com o total em 'Todos', lida
+        do resumo mantido por triggers; `created_by` restringe a um autor."""
+        with self._reading() as c:
+            if created_by is None:
+                rows = self._fetchall(c, 'counts.all')
+            else:
+                rows = self._fetchall(c, 'counts.user', (created_by,))
+        counts = {status: n for status, n in rows}
+        counts["Todos"] = sum(counts.values())
+        return counts
+
+    def _log_ticket_event(self, c, tid, kind, status):
+        """Registra o evento na mesma transação da escrita do chamado."""
+        self._execute(c, 'events.insert', (tid, kind, status, datetime.utcnow().isoformat()))
+
+    def last_event_seq(self):
+        return self._fetchone(self._cursor, 'events.last_seq')[0]
+
+    def data_version(self):
+        """PRAGMA data_version da conexão principal: muda quando outra
+        conexão, desta ou de outra instância, grava no arquivo."""
+        return self._cursor.execute("PRAGMA data_version").fetchone()[0]
+
+    def poll_ticket_events(self, since_seq, known_version=None, max_events=FEED_MAX_EVENTS):
+        """Devolve (data_version, último_seq, linhas) com os chamados que
+        tiveram eventos depois de `since_seq`, no formato da lista.
+        Se data_version não mudou desde `known_version`, nada é consultado.
+        Com mais de `max_events` eventos pendentes, linhas é None: sai mais
+        barato recarregar a lista do que aplicar as mudanças uma a uma."""
+        version = self.data_version()
+        if version == known_version:
+            return version, since_seq, []
+        pending, last_seq = self._fetchone(self._cursor, 'events.pending', (since_seq, max_events + 1))
+        if not pending:
+            return version, since_seq, []
+        if pending > max_events:
+            return version, self.last_event_seq(), None
+        return version, last_seq, self._fetchall(self._cursor, 'events.changed_tickets', (since_seq, last_seq))
+
+    def has_fts(self):
+        if self._fts is None:
+            with self._reading() as c:
+                self._fts = self._fetchone(c, 'fts.exists') is not None
+        return self._fts
+
+    def search_tickets(self, query, status=None, limit=SEARCH_LIMIT, highlight=('[', ']')):
+        """Busca chamados por título, descrição e resolução.
+        Todas as palavras precisam aparecer; a última vale como prefixo.
+        Entre as SEARCH_WINDOW ocorrências mais recentes, devolve as `limit`
+        mais relevantes (bm25, título pesa mais), com o trecho encontrado em
+        'snippet', marcado com `highlight`. Ocorrências mais antigas que a
+        janela não entram no ranking. Sem FTS5, devolve as `limit` mais
+        recentes que contêm todas as palavras."""
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return []
+        with_status = bool(status and status != "Todos")
+        if self.has_fts():
+            # só a última palavra pode estar incompleta enquanto se digita
+            match = " ".join(f'"{term}"' for term in terms[:-1]) + f' "{terms[-1]}"*'
+            # a janela percorre o índice em ordem de rowid decrescente e para
+            # cedo; rank e snippet saem da mesma passada (reabrir o MATCH por
+            # linha custaria caro com prefixos) e só as linhas finais recebem join
+            window = ("SELECT tickets_fts.rowid AS id, rank AS r,"
+                      " snippet(tickets_fts, -1, ?, ?, '…', 12) AS snippet FROM tickets_fts"
+                      + (" JOIN tickets t ON t.id = tickets_fts.rowid" if with_status else "")
+                      + " WHERE tickets_fts MATCH ?"
+                      + (" AND t.status=?" if with_status else "")
+                      + " ORDER BY tickets_fts.rowid DESC LIMIT ?")
+            sql = (f"SELECT {TICKET_LIST_FIELDS}, w.snippet"
+                   " FROM (SELECT id, r, snippet FROM (" + window + ") ORDER BY r LIMIT ?) w"
+                   " JOIN tickets t ON t.id = w.id JOIN users u ON t.created_by = u.id"
+                   " ORDER BY w.r")
+            params = [highlight[0], highlight[1], match] + ([status] if with_status else []) + [SEARCH_WINDOW, limit]
+            name = 'tickets.search_fts'
+        else:
+            sql = (f"SELECT {TICKET_LIST_FIELDS}, substr(t.description, 1, ?) AS snippet"
+                   " FROM tickets t JOIN users u ON t.created_by = u.id WHERE 1")
+            params = [DESC_PREVIEW_LEN]
+            for term in terms:
+                sql += (" AND (t.title LIKE ? ESCAPE '\\' OR t.description LIKE ? ESCAPE '\\'"
+                        " OR t.resolution LIKE ? ESCAPE '\\')")
+                params += [f"%{_like_escape(term)}%"] * 3
+            if with_status:
+                sql += " AND t.status=?"
+                params.append(status)
+            sql += " ORDER BY COALESCE(t.created_at, '') DESC LIMIT ?"
+            params.append(limit)
+            name = 'tickets.search_like'
+        with self._reading() as c:
+            return self._fetchall(c, name, params, sql)
+
+    def get_ticket(self, tid):
+        with self._reading() as c:
+            return self._fetchone(c, 'tickets.get', (tid,))
+
+    def get_ticket_detail(self, tid):
+        """get_ticket passando pelo cache de detalhes. Alterações feitas por
+        outras conexões não passam por aqui: quem as recebe (o ChangeFeed da
+        interface) chama details.invalidate."""
+        return self.details.get(tid)
+
+    def update_ticket_status(self, tid, status, resolution=None):
+        """Retorna False, sem evento, se o chamado não existe mais."""
+        with self._writing() as c:
+            if resolution is not None:
+                self._execute(c, 'tickets.set_status_resolution', (status, resolution, tid))
+            else:
+                self._execute(c, 'tickets.set_status', (status, tid))
+            if not c.rowcount:
+                return False
+            self._log_ticket_event(c, tid, 'status', status)
+        self.details.invalidate((tid,))
+        return True
+
+    def update_ticket_status_bulk(self, ids, status, resolution=None):
+        """Altera o status de vários chamados com um único UPDATE, na mesma
+        transação de um evento por chamado alterado. Ids que não existem
+        mais (apagados por outra instância) são ignorados, sem evento.
+        Retorna quantos foram alterados; quem chama compara com len(ids)."""
+        ids_json = json.dumps([int(tid) for tid in ids])
+        if ids_json == '[]':
+            return 0
+        now = datetime.utcnow().isoformat()
+        with self._writing() as c:
+            if resolution is not None:
+                rows = self._fetchall(c, 'tickets.set_status_resolution_many', (status, resolution, ids_json))
+            else:
+                rows = self._fetchall(c, 'tickets.set_status_many', (status, ids_json))
+            updated = sorted(row[0] for row in rows)
+            self._executemany(c, 'events.insert', ((tid, 'status', status, now) for tid in updated))
+        self.details.invalidate(updated)
+        return len(updated)
+
+    def count_export_rows(self, user_id=None):
+        with self._reading() as c:
+            if user_id:
+                return self._fetchone(c, 'export.count_user', (user_id,))[0]
+            return self._fetchone(c, 'export.count')[0]
+
+    def iter_export_rows(self, user_id=None, batch_size=EXPORT_BATCH_SIZE):
+        """Gera as linhas da exportação em lotes de `batch_size` (fetchmany),
+        sem trazer o resultado inteiro para a memória."""
+        # cursor próprio: o resultado é lido entre um lote e outro
+        with self._reading(fresh=True) as c:
+            if user_id:
+                self._execute(c, 'export.rows_user', (user_id,))
+            else:
+                self._execute(c, 'export.rows')
+            while True:
+                rows = c.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+
+    def export_tickets_csv(self, filepath, user_id=None, compress=None, progress=None, cancel_event=None,
+                           batch_size=EXPORT_BATCH_SIZE):
+        """
+        Export tickets to CSV, streaming rows in batches through a buffered writer.
+        compress=None gzips when filepath ends with '.gz'. progress(done, total) is
+        called after each batch; setting cancel_event raises ExportCancelled.
+        The file is written to '<filepath>.part' and only renamed when complete.
+        Returns the number of exported rows.
+        """
+        if compress is None:
+            compress = filepath.endswith('.gz')
+        total = self.count_export_rows(user_id) if progress else 0
+        tmp_path = filepath + '.part'
+        done = 0
+        batches = self.iter_export_rows(user_id, batch_size)
+        try:
+            if compress:
+                raw = io.BufferedWriter(gzip.GzipFile(tmp_path, 'wb', compresslevel=6), EXPORT_BUFFER_SIZE)
+                f = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+            else:
+                f = open(tmp_path, 'w', newline='', encoding='utf-8', buffering=EXPORT_BUFFER_SIZE)
+            with f:
+                writer = csv.writer(f)
+                writer.writerow(['id','title','description','status','created_at','resolution','creator_name','creator_email'])
+                for rows in batches:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise ExportCancelled()
+                    # as colunas da consulta já estão na ordem do cabeçalho
+                    writer.writerows(rows)
+                    done += len(rows)
+                    if progress:
+                        progress(done, total)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            batches.close()
+        return done
+
+    def export_tickets_pdf(self, filepath, user_id=None, progress=None, cancel_event=None,
+                           batch_size=EXPORT_BATCH_SIZE):
+        """
+        Export tickets to a PDF file using ReportLab.
+        If user_id is provided, only that user's tickets are exported.
+        Rows are streamed from the database and laid out as a sequence of tables,
+        each holding as many rows as fit on one page (measured as the rows are
+        built), created only when the previous one has been placed; the column
+        header is redrawn at the top of every page.
+        progress/cancel_event/return value work as in export_tickets_csv.
+        """
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import mm
+        from reportlab.platypus import (
+            BaseDocTemplate, PageTemplate, Frame, NextPageTemplate,
+            Paragraph, Spacer, Image as RLImage
+        )
+
+        res = pdf_resources()
+        total = self.count_export_rows(user_id) if progress else 0
+        tmp_path = filepath + '.part'
+
+        doc = BaseDocTemplate(tmp_path, pagesize=A4,
+                              rightMargin=20*mm, leftMargin=20*mm,
+                              topMargin=20*mm, bottomMargin=20*mm)
+        header_tbl = _pdf_header_table(res)
+        _, header_h = header_tbl.wrap(doc.width, doc.height)
+
+        def draw_header(canv, doc):
+            header_tbl.drawOn(canv, doc.leftMargin, doc.bottomMargin + doc.height - header_h)
+
+        # a partir da segunda página o frame começa abaixo do cabeçalho fixo
+        doc.addPageTemplates([
+            PageTemplate('first', [Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height,
+                                         leftPadding=0, rightPadding=0, topPadding=0, bottomPadding=0)]),
+            PageTemplate('later', [Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height - header_h,
+                                         leftPadding=0, rightPadding=0, topPadding=0, bottomPadding=0)],
+                         onPage=draw_header),
+        ])
+
+        elements = []
+        if res['logo']:
+            elements.append(RLImage(io.BytesIO(res['logo']), width=40*mm, height=15*mm))
+        elements.append(Spacer(1, 6))
+
+        # Title and date
+        elements.append(Paragraph("Relatório de Chamados", res['heading']))
+        elements.append(Spacer(1, 4))
+        elements.append(Paragraph(f"Emitido em: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} (UTC)", res['normal']))
+        elements.append(Spacer(1, 8))
+        elements.append(NextPageTemplate('later'))
+        elements.append(_pdf_header_table(res))
+
+        done = 0
+        batches = self.iter_export_rows(user_id, batch_size)
+        page_height = doc.height - header_h
+
+        def chunks():
+            # cada tabela cabe numa página: só a que cruza o fim da página é
+            # quebrada, uma vez, em vez de remedir linhas a cada quebra
+            nonlocal done
+            data, heights = [], []
+            for rows in batches:
+                for r in rows:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise ExportCancelled()
+                    cells, row_height = _pdf_row(r, res)
+                    if data and sum(heights) + row_height > page_height:
+                        yield _pdf_rows_table(data, heights, res)
+                        done += len(data)
+                        if progress:
+                            progress(done, total)
+                        data, heights = [], []
+                    data.append(cells)
+                    heights.append(row_height)
+            if data:
+                yield _pdf_rows_table(data, heights, res)
+                done += len(data)
+                if progress:
+                    progress(done, total)
+
+        try:
+            doc.build(_FlowableStream(elements, chunks()))
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            batches.close()
+        return done
+
+    def import_tickets(self, filepath, progress=None, cancel_event=None, batch_size=IMPORT_BATCH_SIZE):
+        """
+        Importa chamados de CSV ou JSONL (opcionalmente .gz), lendo o arquivo
+        em fluxo. O autor é identificado pelo e-mail ou pelo RE; linhas sem
+        título/descrição, com status desconhecido, data inválida ou autor
+        inexistente são rejeitadas e contadas no relatório.
+        Cada lote de `batch_size` linhas entra com executemany numa única
+        transação; um cancelamento (cancel_event) mantém os lotes já gravados.
+        progress(bytes_lidos, bytes_totais) é chamado a cada lote.
+        Retorna um ImportReport.
+        """
+        report = ImportReport()
+        t0 = time.perf_counter()
+        by_email, by_re = {}, {}
+        for uid, email, re_val in self._fetchall(self._cursor, 'users.import_keys'):
+            if email:
+                by_email[email.strip().lower()] = uid
+            if re_val:
+                by_re[re_val.strip().upper()] = uid
+        total = os.path.getsize(filepath)
+        now = datetime.utcnow().isoformat()
+        batch = []
+        columns = {}  # conjunto de chaves -> _import_columns; no CSV é sempre o mesmo
+        raw, text = _open_import_file(filepath)
+        with raw, text:
+            for line_no, record in _iter_import_records(filepath, text):
+                if record is None:
+                    report.reject(line_no, "linha ilegível")
+                    continue
+                keys = tuple(record)
+                mapping = columns.get(keys)
+                if mapping is None:
+                    mapping = columns[keys] = _import_columns(keys)
+                fields = {}
+                for field, names in mapping:
+                    value = ''
+                    for n in names:
+                        if record[n] not in (None, ''):
+                            value = str(record[n]).strip()
+                            break
+                    fields[field] = value
+                if not (fields['title'] and fields['description']):
+                    report.reject(line_no, "título e descrição são obrigatórios")
+                    continue
+                status = fields['status'] or 'Aberto'
+                if status not in STATUS_OPTIONS:
+                    report.reject(line_no, f"status desconhecido: {status}")
+                    continue
+                created_at = _parse_import_date(fields['created_at']) if fields['created_at'] else now
+                if created_at is None:
+                    report.reject(line_no, f"data inválida: {fields['created_at']}")
+                    continue
+                uid = by_email.get(fields['email'].lower()) or by_re.get(fields['re'].upper())
+                if uid is None:
+                    report.reject(line_no, f"autor não encontrado: {fields['email'] or fields['re'] or '(vazio)'}")
+                    continue
+                batch.append((fields['title'], fields['description'], status, uid, created_at, fields['resolution']))
+                if len(batch) >= batch_size:
+                    self._insert_import_batch(batch, now)
+                    report.imported += len(batch)
+                    batch.clear()
+                    if progress:
+                        progress(raw.tell(), total)
+                    if cancel_event is not None and cancel_event.is_set():
+                        report.cancelled = True
+                        break
+            if batch and not report.cancelled:
+                self._insert_import_batch(batch, now)
+                report.imported += len(batch)
+        if progress:
+            progress(total, total)
+        report.elapsed = time.perf_counter() - t0
+        return report
+
+    def _insert_import_batch(self, batch, now):
+        with self._writing() as c:
+            # IMMEDIATE reserva a escrita já aqui: os ids acima de `last` são deste lote
+            c.execute("BEGIN IMMEDIATE")
+            last = self._fetchone(c, 'tickets.last_id')[0]
+            self._executemany(c, 'tickets.insert', batch)
+            self._execute(c, 'events.insert_created_after', (now, last))
+
+    def storage_stats(self):
+        """Números do arquivo e das tabelas, para acompanhamento (callme stats)."""
+        c = self._cursor
+        stats = {
+            'file': os.path.abspath(self.db_file),
+            'size_bytes': os.path.getsize(self.db_file),
+            'schema_version': self.schema_version(),
+            'journal_mode': c.execute("PRAGMA journal_mode").fetchone()[0],
+            'page_size': c.execute("PRAGMA page_size").fetchone()[0],
+            'page_count': c.execute("PRAGMA page_count").fetchone()[0],
+            'freelist_count': c.execute("PRAGMA freelist_count").fetchone()[0],
+            'users': self._fetchone(c, 'users.count')[0],
+            'ticket_events': self._fetchone(c, 'events.count')[0],
+            'fts': self.has_fts(),
+        }
+        stats['tickets'] = self.get_ticket_counts()
+        return stats
+
+    def prune_ticket_events(self, older_than_days):
+        """Apaga eventos mais antigos que `older_than_days` dias; o
+        ChangeFeed só precisa dos recentes. Retorna quantos saíram."""
+        limit = datetime.utcfromtimestamp(time.time() - older_than_days * 86400).isoformat()
+        with self._writing() as c:
+            self._execute(c, 'events.prune', (limit,))
+            return c.rowcount
+
+    def vacuum(self):
+        """Compacta o índice de busca, atualiza as estatísticas do
+        planejador e reconstrói o arquivo. Exige que nenhuma outra conexão
+        esteja escrevendo. Retorna (tamanho_antes, tamanho_depois) em bytes."""
+        before = os.path.getsize(self.db_file)
+        if self.has_fts():
+            with self._writing() as c:
+                self._execute(c, 'fts.optimize')
+        self.conn.execute("ANALYZE")
+        self.conn.commit()
+        self.conn.execute("VACUUM")
+        if self.profile.get('journal_mode', '').upper() == 'WAL':
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return before, os.path.getsize(self.db_file)
+
+    def update_password_hash(self, uid, new_password_hash, old_password_hash):
+        """Troca o hash de senha (rehash no login) só se ele ainda for
+        `old_password_hash`: uma troca de senha feita no meio do caminho
+        não é desfeita. Retorna se gravou."""
+        with self._writing() as c:
+            self._execute(c, 'users.rehash', (new_password_hash, uid, old_password_hash))
+            return c.rowcount == 1
+
+    def update_password_by_email_re(self, email, re_val, new_password_hash):
+        """Troca a senha de quem tem esse e-mail e esse RE numa única
+        instrução. Retorna se algum usuário foi alterado."""
+        with self._writing() as c:
+            self._execute(c, 'users.reset_password', (new_password_hash, email, re_val))
+            return c.rowcount == 1
@@ -0,0 +1,283 @@
+"""Hash de senhas com custo ajustável.
+
+Formato gravado em users.password_hash:
+    <algoritmo>$<parâmetros>$<sal>$<hash>      (sal e hash em base64)
+com sal aleatório por usuário e o custo dentro do próprio hash; hashes
+gravados com outro custo continuam válidos. Os hashes antigos (SHA-256 sem
+sal, 64 dígitos hexadecimais) ainda são aceitos e trocados pelo formato
+atual no próximo login bem-sucedido (PasswordContext.verify devolve o hash
+novo).
+
+Algoritmo e custo vêm de CALLME_PASSWORD_HASHER (pbkdf2_sha256 ou scrypt)
+e CALLME_PASSWORD_COST (iterações do PBKDF2; log2(N) do scrypt). Para
+escolher o custo de uma máquina: python -m callme calibrate-password.
+
+O cálculo é deliberadamente lento (~0,1-0,3 s): na interface ele roda no
+DbExecutor, nunca na thread da tela.
+"""
+import abc
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+PASSWORD_HASHER = os.environ.get("CALLME_PASSWORD_HASHER", "pbkdf2_sha256")
+PASSWORD_COST = os.environ.get("CALLME_PASSWORD_COST")
+SALT_BYTES = 16
+CALIBRATION_TARGET_MS = 250
+# logins recentes verificados sem refazer o KDF (ver VerificationCache)
+VERIFY_CACHE_SIZE = 64
+
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+
+def _unb64(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+class Hasher(abc.ABC):
+    """Um algoritmo de hash de senha com um custo (fator de trabalho).
+    Subclasses definem derive e calibrate."""
+
+    algorithm = None
+    default_cost = None
+
+    def __init__(self, cost=None):
+        self.cost = int(cost if cost is not None else self.default_cost)
+
+    @abc.abstractmethod
+    def derive(self, password, salt, params):
+        """Hash bruto (bytes) de `password` com `salt` e os `params` gravados."""
+
+    def params(self):
+        """Parâmetros gravados no hash para o custo atual."""
+        return str(self.cost)
+
+    def cost_of(self, params):
+        return int(params)
+
+    def hash(self, password, salt=None):
+        salt = salt or secrets.token_bytes(SALT_BYTES)
+        params = self.params()
+        return "$".join((self.algorithm, params, _b64(salt), _b64(self.derive(password, salt, params))))
+
+    def verify(self, password, encoded):
+        try:
+            algorithm, params, salt, expected = encoded.split("$")
+            salt, expected = _unb64(salt), _unb64(expected)
+        except ValueError:
+            return False
+        if algorithm != self.algorithm:
+            return False
+        try:
+            derived = self.derive(password, salt, params)
+        except (ValueError, OverflowError):  # parâmetros corrompidos
+            return False
+        return hmac.compare_digest(derived, expected)
+
+    def needs_rehash(self, encoded):
+        """Hash de outro algoritmo ou com custo menor que o atual."""
+        parts = encoded.split("$")
+        if len(parts) != 4 or parts[0] != self.algorithm:
+            return True
+        try:
+            return self.cost_of(parts[1]) < self.cost
+        except ValueError:
+            return True
+
+    @classmethod
+    def time_cost(cls, cost):
+        """Segundos para um hash com esse custo nesta máquina."""
+        hasher = cls(cost)
+        t0 = time.perf_counter()
+        hasher.hash("calibração", salt=b"\0" * SALT_BYTES)
+        return time.perf_counter() - t0
+
+    @classmethod
+    @abc.abstractmethod
+    def calibrate(cls, target_ms=CALIBRATION_TARGET_MS):
+        """Maior custo cujo hash leva até `target_ms` (e nunca menos que o padrão)."""
+
+
+class Pbkdf2Hasher(Hasher):
+    algorithm = "pbkdf2_sha256"
+    default_cost = 600_000  # iterações (recomendação OWASP para PBKDF2-SHA256)
+
+    def derive(self, password, salt, params):
+        return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, int(params))
+
+    @classmethod
+    def calibrate(cls, target_ms=CALIBRATION_TARGET_MS):
+        # o tempo cresce linearmente com as iterações
+        probe = 100_000
+        seconds = min(cls.time_cost(probe) for _ in range(3))
+        cost = int(probe * target_ms / 1000 / seconds) // 10_000 * 10_000
+        return max(cost, cls.default_cost)
+
+
+class ScryptHasher(Hasher):
+    """scrypt com N = 2**custo; r e p fixos, mas gravados no hash."""
+
+    algorithm = "scrypt"
+    default_cost = 15  # N = 32768: 32 MiB de memória por hash com r = 8
+    r = 8
+    p = 1
+
+    def params(self):
+        return f"{self.cost},{self.r},{self.p}"
+
+    def cost_of(self, params):
+        return int(params.split(",")[0])
+
+    def derive(self, password, salt, params):
+        log_n, r, p = (int(v) for v in params.split(","))
+        n = 2 ** log_n
+        return hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                              maxmem=2 * 128 * r * n * p + 1024 * 1024, dklen=32)
+
+    @classmethod
+    def calibrate(cls, target_ms=CALIBRATION_TARGET_MS):
+        # cada passo dobra memória e tempo
+        cost = cls.default_cost
+        while cls.time_cost(cost + 1) * 1000 <= target_ms:
+            cost += 1
+        return cost
+
+
+class LegacySha256Hasher:
+    """SHA-256 sem sal das versões anteriores: só verificação. Não é um
+    Hasher (não tem sal, custo nem formato com '$'), mas atende à parte da
+    interface que PasswordContext usa para hashes gravados."""
+
+    algorithm = "sha256"
+
+    def hash(self, password, salt=None):
+        raise ValueError("SHA-256 sem sal não é mais usado para gravar senhas")
+
+    def verify(self, password, encoded):
+        expected = hashlib.sha256(password.encode('utf-8')).hexdigest()
+        return hmac.compare_digest(expected.encode('ascii'), encoded.lower().encode('ascii', 'replace'))
+
+    def needs_rehash(self, encoded):
+        return True
+
+
+HASHERS = {cls.algorithm: cls for cls in (Pbkdf2Hasher, ScryptHasher)}
+if not hasattr(hashlib, 'scrypt'):  # OpenSSL antigo
+    del HASHERS['scrypt']
+
+
+def identify(encoded):
+    """Classe do hasher que gerou `encoded`, ou None se desconhecido."""
+    if not encoded:
+        return None
+    if len(encoded) == 64 and "$" not in encoded:
+        return LegacySha256Hasher
+    return HASHERS.get(encoded.split("$", 1)[0])
+
+
+class VerificationCache:
+    """Últimas verificações bem-sucedidas, para um novo login do mesmo
+    usuário (quiosque) não pagar o KDF de novo. Guarda, por hash gravado,
+    um HMAC da senha com uma chave sorteada a cada execução; nem a senha
+    nem algo reaproveitável fora do processo fica na memória. Uma senha
+    diferente nunca é recusada pelo cache: cai na verificação completa."""
+
+    def __init__(self, max_entries=VERIFY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._key = secrets.token_bytes(32)
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def _digest(self, password, encoded):
+        return hmac.new(self._key, f"{encoded}\0{password}".encode('utf-8'), hashlib.sha256).digest()
+
+    def check(self, password, encoded):
+        digest = self._digest(password, encoded)
+        with self._lock:
+            cached = self._items.get(encoded)
+            if cached is not None and hmac.compare_digest(cached, digest):
+                self._items.move_to_end(encoded)
+                self.hits += 1
+                return True
+        return False
+
+    def add(self, password, encoded):
+        if self.max_entries <= 0:
+            return
+        digest = self._digest(password, encoded)
+        with self._lock:
+            self._items[encoded] = digest
+            self._items.move_to_end(encoded)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class PasswordContext:
+    """Hasher usado para gravar senhas novas, verificação de qualquer
+    formato conhecido e o cache de verificações."""
+
+    def __init__(self, hasher=None, cache_size=VERIFY_CACHE_SIZE):
+        self.hasher = hasher or Pbkdf2Hasher()
+        self.cache = VerificationCache(cache_size)
+
+    @classmethod
+    def from_environment(cls):
+        if PASSWORD_HASHER not in HASHERS:
+            raise ValueError(f"CALLME_PASSWORD_HASHER desconhecido ou indisponível: {PASSWORD_HASHER}")
+        return cls(HASHERS[PASSWORD_HASHER](PASSWORD_COST))
+
+    def hash(self, password):
+        return self.hasher.hash(password)
+
+    def verify(self, password, encoded):
+        """(senha confere, hash novo ou None). O hash novo vem quando a
+        senha confere mas `encoded` é de outro algoritmo ou de custo menor;
+        quem chamou deve gravá-lo."""
+        hasher_class = identify(encoded)
+        if hasher_class is None:
+            return False, None
+        if not self.cache.check(password, encoded):
+            if hasher_class is type(self.hasher):
+                hasher = self.hasher
+            else:
+                hasher = hasher_class()
+            if not hasher.verify(password, encoded):
+                return False, None
+        if self.hasher.needs_rehash(encoded):
+            new_hash = self.hash(password)
+            self.cache.add(password, new_hash)
+            return True, new_hash
+        self.cache.add(password, encoded)
+        return True, None
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_context():
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = PasswordContext.from_environment()
+        return _default
+
+
+def hash_password(password):
+    return default_context().hash(password)
+
+
+def verify_password(password, encoded):
+    return default_context().verify(password, encoded)
@@ -0,0 +1,232 @@
+"""Medição de desempenho no próprio aplicativo, sem profiler.
+
+Cada amostra é um span nomeado: recorder.span("ui.load_tickets") cronometra
+um trecho, com `with` ou com .end() quando a ação termina num sinal (uma
+resposta do DbExecutor, por exemplo). O Database registra cada consulta de
+QUERIES do mesmo jeito, no seu próprio Recorder (Database.query_stats).
+
+Os tempos vão para histogramas em memória, com baldes fixos (custo
+constante por amostra), e as últimas TRACE_BUFFER_SIZE amostras ficam num
+buffer que Trace.dump grava em JSONL, uma amostra por linha:
+    {"ts": <início, epoch>, "name": ..., "ms": ..., "thread": ..., <atributos>}
+Com CALLME_TRACE=<arquivo> as amostras também são acrescentadas ao arquivo,
+em lotes, por uma thread própria (a cada TRACE_FLUSH_SECONDS e ao sair):
+quem mede nunca espera pelo disco.
+
+Na interface, Ctrl+Shift+D abre o painel de desempenho com esses números.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+# limites superiores dos baldes, em ms; o último balde recebe o que passar deles
+HISTOGRAM_BOUNDS_MS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100,
+                       250, 500, 1000, 2500, 5000, 10000, 30000)
+PERCENTILES = (50, 95, 99)
+TRACE_BUFFER_SIZE = 5000
+TRACE_FLUSH_SECONDS = 1.0
+
+
+class Histogram:
+    """Distribuição dos tempos de um span (ms)."""
+
+    __slots__ = ('counts', 'calls', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        self.counts[bisect_left(HISTOGRAM_BOUNDS_MS, ms)] += 1
+        self.calls += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, p):
+        """Limite superior do balde onde cai o percentil `p` (nunca acima do
+        máximo observado): uma estimativa por cima, na resolução dos baldes."""
+        if not self.calls:
+            return None
+        rank = p / 100 * self.calls
+        seen = 0
+        for bound, n in zip(HISTOGRAM_BOUNDS_MS, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        stats = {
+            'calls': self.calls,
+            'total_ms': self.total,
+            'mean_ms': self.total / self.calls if self.calls else None,
+            'max_ms': self.max,
+        }
+        for p in PERCENTILES:
+            stats[f'p{p}_ms'] = self.percentile(p)
+        bounds = HISTOGRAM_BOUNDS_MS + (None,)
+        stats['buckets'] = [(bound, n) for bound, n in zip(bounds, self.counts) if n]
+        return stats
+
+
+class Trace:
+    """Últimas amostras (para Trace.dump) e, opcionalmente, o arquivo JSONL
+    em que são gravadas. add só enfileira; a thread de gravação formata e
+    escreve as pendentes a cada `flush_seconds`, e close grava o resto."""
+
+    def __init__(self, path=None, max_events=TRACE_BUFFER_SIZE, flush_seconds=TRACE_FLUSH_SECONDS):
+        self.path = path
+        self.flush_seconds = flush_seconds
+        self._events = deque(maxlen=max_events)
+        self._pending = []
+        self._file = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()  # uma gravação por vez, em ordem
+        self._writer = None
+        self._stop = threading.Event()
+
+    def add(self, name, start, ms, attrs):
+        event = (start, name, ms, threading.current_thread().name, attrs)
+        with self._lock:
+            self._events.append(event)
+            if self.path:
+                self._pending.append(event)
+                if self._writer is None:
+                    self._stop.clear()
+                    self._writer = threading.Thread(target=self._write_loop, name="callme-trace", daemon=True)
+                    self._writer.start()
+
+    def _write_loop(self):
+        while not self._stop.wait(self.flush_seconds):
+            self.flush()
+
+    def flush(self):
+        """Grava no arquivo as amostras pendentes."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        with self._write_lock:
+            if self._file is None:
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.writelines(_event_line(e) for e in pending)
+            self._file.flush()
+
+    def events(self):
+        with self._lock:
+            return list(self._events)
+
+    def dump(self, path):
+        """Grava as amostras do buffer em `path` (JSONL). Retorna quantas."""
+        events = self.events()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(_event_line(e) for e in events)
+        return len(events)
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+
+    def close(self):
+        """Para a thread de gravação e grava o que faltar; um add depois
+        disso volta a abrir o arquivo."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._stop.set()
+            writer.join()
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _event_line(event):
+    start, name, ms, thread, attrs = event
+    record = {'ts': round(start, 6), 'name': name, 'ms': round(ms, 3), 'thread': thread}
+    if attrs:
+        record.update(attrs)
+    return json.dumps(record, ensure_ascii=False, default=str) + "\n"
+
+
+class Span:
+    """Um trecho em andamento; end() registra a duração uma única vez."""
+
+    __slots__ = ('recorder', 'name', 'attrs', 't0')
+
+    def __init__(self, recorder, name, attrs):
+        self.recorder = recorder
+        self.name = name
+        self.attrs = attrs
+        self.t0 = time.perf_counter()
+
+    def end(self, **attrs):
+        if self.t0 is None:
+            return
+        elapsed = time.perf_counter() - self.t0
+        self.t0 = None
+        if attrs:
+            self.attrs.update(attrs)
+        self.recorder.record(self.name, elapsed, **self.attrs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        self.end()
+
+
+class Recorder:
+    """Histogramas por nome de span, seguros entre threads. `prefix` vai na
+    frente dos nomes gravados no trace (o Database usa 'db.')."""
+
+    def __init__(self, trace=None, prefix=""):
+        self.trace = trace
+        self.prefix = prefix
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, **attrs):
+        ms = seconds * 1000
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            histogram.add(ms)
+        if self.trace is not None:
+            self.trace.add(self.prefix + name, time.time() - seconds, ms, attrs)
+
+    def span(self, name, **attrs):
+        return Span(self, name, attrs)
+
+    def snapshot(self):
+        """{nome: Histogram.to_dict()}, do span com mais tempo total para o
+        com menos."""
+        with self._lock:
+            items = [(name, h.to_dict()) for name, h in self._histograms.items()]
+        items.sort(key=lambda item: item[1]['total_ms'], reverse=True)
+        return dict(items)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+trace = Trace(os.environ.get("CALLME_TRACE") or None)
+atexit.register(trace.close)
+recorder = Recorder(trace)
+
+
+def span(name, **attrs):
+    """Span no Recorder global (ações da interface, tarefas do DbExecutor)."""
+    return recorder.span(name, **attrs)
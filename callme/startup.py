@@ -0,0 +1,89 @@
+"""Medição do início do aplicativo (CallMe.py --startup-timing).
+
+Importe este módulo antes dos demais: com a medição ligada ele passa a
+cronometrar cada módulo carregado pela primeira vez na thread principal e
+guarda marcos nomeados (QApplication, primeira pintura, banco pronto...),
+todos contados a partir do seu próprio import. Sem a opção, nada é
+instalado e mark()/report() não fazem nada.
+
+Também pode ser ligada pela variável CALLME_STARTUP_TIMING=1, útil no
+executável empacotado.
+"""
+import builtins
+import os
+import sys
+import threading
+import time
+
+STARTUP_FLAG = "--startup-timing"
+STARTUP_TOP_IMPORTS = 15
+
+
+class StartupTimer:
+    def __init__(self, enabled):
+        self.enabled = enabled
+        self.t0 = time.perf_counter()
+        self.marks = []
+        self.imports = []  # (profundidade, módulo, segundos)
+        self._depth = 0
+        self._import = None
+        self._reported = False
+        if enabled:
+            self._install()
+
+    @staticmethod
+    def requested(argv):
+        """Retira a opção de argv e diz se a medição foi pedida."""
+        flag = STARTUP_FLAG in argv
+        while STARTUP_FLAG in argv:
+            argv.remove(STARTUP_FLAG)
+        return flag or os.environ.get("CALLME_STARTUP_TIMING", "") not in ("", "0")
+
+    def _install(self):
+        original = self._import = builtins.__import__
+        main = threading.main_thread()
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if threading.current_thread() is not main:
+                return original(name, globals, locals, fromlist, level)
+            depth = self._depth
+            loaded = len(sys.modules)
+            self._depth += 1
+            start = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                self._depth = depth
+                # só conta imports que de fato carregaram algum módulo
+                if len(sys.modules) != loaded:
+                    self.imports.append((depth, name, time.perf_counter() - start))
+
+        builtins.__import__ = timed_import
+
+    def _uninstall(self):
+        if self._import is not None:
+            builtins.__import__ = self._import
+            self._import = None
+
+    def mark(self, name):
+        if self.enabled:
+            self.marks.append((name, time.perf_counter() - self.t0))
+
+    def report(self, file=None):
+        """Imprime (uma vez) os imports mais lentos e os marcos em stderr."""
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        self._uninstall()
+        file = file or sys.stderr
+        top = sorted(((t, name) for depth, name, t in self.imports if depth == 0), reverse=True)
+        print("[startup] imports de primeiro nível (tempo acumulado):", file=file)
+        for seconds, name in top[:STARTUP_TOP_IMPORTS]:
+            print(f"[startup]   {seconds * 1000:8.1f} ms  {name}", file=file)
+        if len(top) > STARTUP_TOP_IMPORTS:
+            rest = sum(t for t, _ in top[STARTUP_TOP_IMPORTS:])
+            print(f"[startup]   {rest * 1000:8.1f} ms  ({len(top) - STARTUP_TOP_IMPORTS} outros)", file=file)
+        print("[startup] marcos (desde o início do CallMe.py):", file=file)
+        for name, seconds in self.marks:
+            print(f"[startup]   {seconds * 1000:8.1f} ms  {name}", file=file)
+        file.flush()
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from callme.db import STATUS_OPTIONS, Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "chamados.db"), readers=0)
+    for i in range(3):
+        db.create_user(f"Fun {i}", f"f{i}@x", "h", "funcionario", f"FUNC00{i + 1}")
+    yield db
+    db.close()
+
+
+def stored(db):
+    return {(uid, status): n for uid, status, n in db.conn.execute("SELECT * FROM ticket_counts") if n}
+
+
+def counted(db):
+    return {(uid, status): n for uid, status, n in db.conn.execute(
+        "SELECT created_by, COALESCE(status, ''), COUNT(*) FROM tickets GROUP BY 1, 2")}
+
+
+def test_triggers_follow_every_write(db):
+    rnd = random.Random(7)
+    users = [row[0] for row in db.conn.execute("SELECT id FROM users")]
+    for i in range(40):
+        db.create_ticket(f"t{i}", "d", rnd.choice(users))
+    for _ in range(200):
+        ids = [row[0] for row in db.conn.execute("SELECT id FROM tickets")]
+        op = rnd.randrange(5)
+        if op == 0:
+            db.update_ticket_status(rnd.choice(ids), rnd.choice(STATUS_OPTIONS))
+        elif op == 1:
+            db.update_ticket_status_bulk(rnd.sample(ids, 5), rnd.choice(STATUS_OPTIONS), "ok")
+        elif op == 2:
+            # escritas por fora do Database também passam pelos triggers
+            db.conn.execute("UPDATE tickets SET created_by=?, status=? WHERE id=?",
+                            (rnd.choice(users), rnd.choice(STATUS_OPTIONS + [None]), rnd.choice(ids)))
+        elif op == 3:
+            db.conn.execute("DELETE FROM tickets WHERE id=?", (rnd.choice(ids),))
+        else:
+            db.create_ticket("novo", "d", rnd.choice(users))
+        db.conn.commit()
+        assert stored(db) == counted(db)
+
+
+def test_counts_by_author(db):
+    users = [row[0] for row in db.conn.execute("SELECT id FROM users")]
+    db.create_ticket("a", "d", users[0])
+    db.create_ticket("b", "d", users[0])
+    db.create_ticket("c", "d", users[1])
+    db.update_ticket_status(2, "Finalizado", "ok")
+    assert db.get_ticket_counts(users[0]) == {"Aberto": 1, "Finalizado": 1, "Todos": 2}
+    assert db.get_ticket_counts(users[2]) == {"Todos": 0}
+    assert db.get_ticket_counts() == {"Aberto": 2, "Finalizado": 1, "Todos": 3}
@@ -0,0 +1,93 @@
+import pytest
+
+from callme.db import Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "chamados.db"), readers=0)
+    db.create_user("Fun", "f@x", "h", "funcionario", "FUNC001")
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def other(db):
+    # outra instância no mesmo arquivo, como um segundo computador
+    other = Database(db.db_file, readers=0)
+    yield other
+    other.close()
+
+
+def uid(db):
+    return db.conn.execute("SELECT id FROM users").fetchone()[0]
+
+
+def ids(rows):
+    return [row['id'] for row in rows]
+
+
+def test_poll_returns_changed_tickets_once(db, other):
+    version, seq, rows = db.poll_ticket_events(db.last_event_seq())
+    assert rows == []
+    other.create_ticket("t1", "d1", uid(other))
+    other.create_ticket("t2", "d2", uid(other))
+    version, seq, rows = db.poll_ticket_events(seq, version)
+    assert ids(rows) == [1, 2]
+    assert [row['status'] for row in rows] == ["Aberto", "Aberto"]
+    assert db.poll_ticket_events(seq) == (version, seq, [])
+
+    other.update_ticket_status(2, "Em Atendimento")
+    version, seq, rows = db.poll_ticket_events(seq, version)
+    assert ids(rows) == [2]
+    assert rows[0]['status'] == "Em Atendimento"
+
+
+def test_unchanged_data_version_skips_the_query(db, other):
+    version, seq, _ = db.poll_ticket_events(0)
+    assert db.poll_ticket_events(seq, version) == (version, seq, [])
+    other.create_ticket("t1", "d1", uid(other))
+    assert db.data_version() != version
+    # os próprios commits não mudam data_version desta conexão
+    own_version = db.data_version()
+    db.create_ticket("t2", "d2", uid(db))
+    assert db.data_version() == own_version
+
+
+def test_too_many_events_ask_for_a_reload(db, other):
+    version, seq, _ = db.poll_ticket_events(0)
+    for i in range(4):
+        other.create_ticket(f"t{i}", "d", uid(other))
+    version, last, rows = db.poll_ticket_events(seq, version, max_events=3)
+    assert rows is None
+    assert last == db.last_event_seq()
+    assert db.poll_ticket_events(last, max_events=3)[2] == []
+
+
+def test_events_for_deleted_tickets_are_skipped(db):
+    db.create_ticket("t1", "d1", uid(db))
+    db.create_ticket("t2", "d2", uid(db))
+    db.conn.execute("DELETE FROM tickets WHERE id=1")
+    db.conn.commit()
+    _, seq, rows = db.poll_ticket_events(0)
+    assert ids(rows) == [2]
+    assert seq == db.last_event_seq()
+
+
+def test_import_logs_one_event_per_ticket(tmp_path, db):
+    path = tmp_path / "chamados.csv"
+    path.write_text("title,description,email\na,d,f@x\nb,d,f@x\nc,d,f@x\n", encoding='utf-8')
+    seq = db.last_event_seq()
+    assert db.import_tickets(str(path), batch_size=2).imported == 3
+    _, last, rows = db.poll_ticket_events(seq)
+    assert ids(rows) == [1, 2, 3]
+    assert last - seq == 3
+
+
+def test_prune_keeps_recent_events(db):
+    db.create_ticket("t1", "d1", uid(db))
+    db.conn.execute("UPDATE ticket_events SET created_at='2000-01-01T00:00:00'")
+    db.conn.commit()
+    db.create_ticket("t2", "d2", uid(db))
+    assert db.prune_ticket_events(30) == 1
+    assert ids(db.poll_ticket_events(0)[2]) == [2]
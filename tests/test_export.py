@@ -0,0 +1,38 @@
+import re
+
+import pytest
+
+from callme.db import Database
+
+pytest.importorskip("reportlab")
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "chamados.db"), readers=0)
+    db.create_user("Fun", "f@x", "h", "funcionario", "FUNC001")
+    uid = db.conn.execute("SELECT id FROM users").fetchone()[0]
+    words = "impressora toner papel atolado rede wifi senha bloqueada".split()
+    rows = [(f"t{i}", " ".join(words[j % len(words)] for j in range(10 + i % 7 * 20)), 'Finalizado', uid,
+             f"2024-01-01T00:00:{i:02d}", "ok " * (i % 5)) for i in range(60)]
+    db.conn.executemany("INSERT INTO tickets (title, description, status, created_by, created_at, resolution)"
+                        " VALUES (?,?,?,?,?,?)", rows)
+    db.conn.commit()
+    yield db
+    db.close()
+
+
+def test_pdf_tables_fit_a_page(tmp_path, db, monkeypatch):
+    from reportlab.platypus import Table
+    splits = []
+    split = Table.split
+    monkeypatch.setattr(Table, "split", lambda self, *a, **k: splits.append(1) or split(self, *a, **k))
+    path = tmp_path / "chamados.pdf"
+    progress = []
+    assert db.export_tickets_pdf(str(path), progress=lambda done, total: progress.append((done, total))) == 60
+    pages = len(re.findall(rb"/Type /Page\b", path.read_bytes()))
+    # só a tabela que cruza o fim de cada página é quebrada
+    assert pages > 1
+    assert len(splits) < pages
+    assert progress[-1] == (60, 60)
+    assert [done for done, _ in progress] == sorted(done for done, _ in progress)
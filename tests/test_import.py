@@ -0,0 +1,136 @@
+import json
+import threading
+
+import pytest
+
+from callme.db import DESC_PREVIEW_LEN, Database
+
+TICKET_COLUMNS = ("SELECT t.title, t.description, t.status, t.created_at, t.resolution, u.email"
+                  " FROM tickets t JOIN users u ON t.created_by = u.id ORDER BY t.title")
+
+
+def open_db(path):
+    db = Database(str(path), readers=0)
+    db.create_user("Fun", "f@x", "h", "funcionario", "FUNC001")
+    db.create_user("Tec", "t@x", "h", "tecnico", "TEC001")
+    return db
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = open_db(tmp_path / "destino.db")
+    yield db
+    db.close()
+
+
+def tickets(db):
+    return [tuple(row) for row in db.conn.execute(TICKET_COLUMNS)]
+
+
+def write_jsonl(path, lines):
+    path.write_text("".join(line + "\n" for line in lines), encoding='utf-8')
+    return str(path)
+
+
+def valid_record(i):
+    return json.dumps({"title": f"t{i}", "description": f"d{i}", "email": "f@x"})
+
+
+@pytest.mark.parametrize("name", ["export.csv", "export.csv.gz"])
+def test_export_round_trip(tmp_path, db, name):
+    source = open_db(tmp_path / "origem.db")
+    f = source.conn.execute("SELECT id FROM users WHERE email='f@x'").fetchone()[0]
+    t = source.conn.execute("SELECT id FROM users WHERE email='t@x'").fetchone()[0]
+    source.create_ticket("simples", "sem nada especial", f)
+    source.create_ticket('vírgula, "aspas"', "linha 1\nlinha 2", f)
+    source.create_ticket("do técnico", "ção ü €", t)
+    source.create_ticket("finalizado", "x", f)
+    source.update_ticket_status_bulk([4], "Finalizado", "resolvido; com ponto e vírgula")
+    source.update_ticket_status_bulk([1], "Em Atendimento")
+    path = str(tmp_path / name)
+    assert source.export_tickets_csv(path) == 4
+
+    report = db.import_tickets(path)
+    assert (report.imported, report.rejected, report.cancelled) == (4, 0, False)
+    assert tickets(db) == tickets(source)
+    assert db.get_ticket_counts() == source.get_ticket_counts()
+    source.close()
+
+
+def test_reject_reasons(tmp_path, db):
+    path = write_jsonl(tmp_path / "chamados.jsonl", [
+        valid_record(1),
+        '{"title": "sem fim"',
+        '[1, 2]',
+        json.dumps({"title": "", "description": "d", "email": "f@x"}),
+        json.dumps({"title": "t", "description": "d", "status": "Perdido", "email": "f@x"}),
+        json.dumps({"title": "t", "description": "d", "created_at": "31/02/2024", "email": "f@x"}),
+        json.dumps({"title": "t", "description": "d", "email": "ninguem@x"}),
+        json.dumps({"titulo": "t8", "descrição": "d8", "re": "tec001", "data": "01/02/2024 10:30"}),
+    ])
+    report = db.import_tickets(path)
+    assert report.imported == 2
+    assert report.rejected == 6
+    assert report.rejects == [
+        (2, "linha ilegível"),
+        (3, "linha ilegível"),
+        (4, "título e descrição são obrigatórios"),
+        (5, "status desconhecido: Perdido"),
+        (6, "data inválida: 31/02/2024"),
+        (7, "autor não encontrado: ninguem@x"),
+    ]
+    first, last = tickets(db)
+    assert first[:3] + first[4:] == ("t1", "d1", "Aberto", "", "f@x")  # sem data: a da importação
+    assert last == ("t8", "d8", "Aberto", "2024-02-01T10:30:00", "", "t@x")
+
+
+def test_missing_author_is_rejected(tmp_path, db):
+    path = tmp_path / "chamados.csv"
+    path.write_text("title,description\nt,d\n", encoding='utf-8')
+    report = db.import_tickets(str(path))
+    assert report.imported == 0
+    assert report.rejects == [(2, "autor não encontrado: (vazio)")]
+
+
+def test_cancel_before_first_batch_keeps_one_batch(tmp_path, db):
+    path = write_jsonl(tmp_path / "chamados.jsonl", [valid_record(i) for i in range(5)])
+    cancel = threading.Event()
+    cancel.set()
+    report = db.import_tickets(path, cancel_event=cancel, batch_size=2)
+    assert report.cancelled
+    assert report.imported == 2
+    assert [row[0] for row in tickets(db)] == ["t0", "t1"]
+    assert db.get_ticket_counts()['Todos'] == 2
+    assert db.conn.execute("SELECT COUNT(*) FROM ticket_events").fetchone()[0] == 2
+
+
+def test_cancel_keeps_committed_batches(tmp_path, db):
+    path = write_jsonl(tmp_path / "chamados.jsonl", [valid_record(i) for i in range(7)])
+    cancel = threading.Event()
+    batches = []
+
+    def progress(done, total):
+        batches.append(done)
+        if len(batches) == 2:
+            cancel.set()
+
+    report = db.import_tickets(path, progress=progress, cancel_event=cancel, batch_size=2)
+    assert report.cancelled
+    assert report.imported == 4
+    assert [row[0] for row in tickets(db)] == ["t0", "t1", "t2", "t3"]
+    assert db.get_ticket_counts()['Todos'] == 4
+
+
+def test_imported_tickets_have_previews(tmp_path, db):
+    long_text = "x" * (DESC_PREVIEW_LEN * 2)
+    path = write_jsonl(tmp_path / "chamados.jsonl", [
+        json.dumps({"title": "longo", "description": long_text, "resolution": "ok", "email": "f@x"}),
+    ])
+    db.import_tickets(path)
+    f = db.conn.execute("SELECT id FROM users WHERE email='f@x'").fetchone()[0]
+    db.create_ticket("curto", "pouco", f)
+    rows = db.conn.execute("SELECT title, description_preview, resolution_preview FROM tickets ORDER BY id")
+    assert [tuple(row) for row in rows] == [
+        ("longo", long_text[:DESC_PREVIEW_LEN + 1], "ok"),
+        ("curto", "pouco", ""),
+    ]
@@ -0,0 +1,61 @@
+import shutil
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from callme.db import DESC_PREVIEW_LEN, SCHEMA_VERSION, Database
+
+V0_DB = Path(__file__).resolve().parent.parent / "chamados.db"
+
+
+@pytest.fixture
+def db(tmp_path):
+    # a cópia versionada está na versão 0 (anterior às migrações); nunca migrar o original
+    if not V0_DB.exists():
+        pytest.skip("chamados.db não encontrado")
+    path = tmp_path / "chamados.db"
+    shutil.copyfile(V0_DB, path)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+    db = Database(str(path), readers=0)
+    yield db
+    db.close()
+
+
+def schema(db):
+    return {tuple(row) for row in db.conn.execute(
+        "SELECT type, name, tbl_name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'")}
+
+
+def test_v0_database_matches_a_new_one(tmp_path, db):
+    assert db.schema_version() == SCHEMA_VERSION
+    db.migrate()  # nada pendente: não faz nada
+    assert db.schema_version() == SCHEMA_VERSION
+    new = Database(str(tmp_path / "novo.db"), readers=0)
+    # o arquivo antigo ainda tem tabelas de outras versões do aplicativo
+    assert schema(new) <= schema(db)
+    new.close()
+
+
+def test_counts_match_the_tickets(db):
+    expected = dict(db.conn.execute("SELECT status, COUNT(*) FROM tickets GROUP BY status"))
+    counts = db.get_ticket_counts()
+    assert counts.pop("Todos") == db.conn.execute("SELECT COUNT(*) FROM tickets").fetchone()[0]
+    assert {status: n for status, n in counts.items() if n} == expected
+    for uid, in db.conn.execute("SELECT DISTINCT created_by FROM tickets"):
+        mine = dict(db.conn.execute("SELECT status, COUNT(*) FROM tickets WHERE created_by=? GROUP BY status",
+                                    (uid,)))
+        counts = db.get_ticket_counts(uid)
+        assert counts.pop("Todos") == sum(mine.values())
+        assert {status: n for status, n in counts.items() if n} == mine
+
+
+def test_existing_rows_are_backfilled(db):
+    rows = db.conn.execute("SELECT id, title, description, description_preview FROM tickets").fetchall()
+    assert rows
+    for row in rows:
+        assert row['description_preview'] == row['description'][:DESC_PREVIEW_LEN + 1]
+    if db.has_fts():
+        tid, title = rows[0]['id'], rows[0]['title']
+        assert tid in [t['id'] for t in db.search_tickets(title)]
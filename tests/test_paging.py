@@ -0,0 +1,84 @@
+import itertools
+
+import pytest
+
+from callme.db import STATUS_OPTIONS, TICKET_SORT_COLUMNS, Database
+
+TECH = {'id': 0, 'role': 'tecnico'}
+FILTERS = (None, "Aberto")
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "chamados.db"), readers=0)
+    for i in range(3):
+        db.create_user(f"F{i}", f"f{i}@x", "h", "funcionario", f"FUNC{i:03d}")
+    users = [row[0] for row in db.conn.execute("SELECT id FROM users ORDER BY id")]
+    rows = []
+    for i in range(60):
+        # poucos valores distintos: muitos empates na coluna ordenada
+        rows.append((f"título {i % 4}", "d", STATUS_OPTIONS[i % 3], users[i % 3],
+                     f"2024-01-{1 + i % 5:02d}T00:00:00", ""))
+    # linhas antigas ou importadas por fora podem ter NULL nas colunas ordenáveis
+    for i in range(0, 60, 6):
+        title, description, status, created_by, created_at, resolution = rows[i]
+        rows[i] = (None, description, status, created_by, created_at, resolution)
+        rows[i + 1] = rows[i + 1][:2] + (None,) + rows[i + 1][3:]
+        rows[i + 2] = rows[i + 2][:4] + (None,) + rows[i + 2][5:]
+    db.conn.executemany("INSERT INTO tickets (title, description, status, created_by, created_at, resolution)"
+                        " VALUES (?,?,?,?,?,?)", rows)
+    db.conn.commit()
+    db.employees = [{'id': uid, 'role': 'funcionario'} for uid in users]
+    yield db
+    db.close()
+
+
+def expected(db, user, status_filter, column, descending):
+    rows = [dict(row) for row in db.conn.execute("SELECT * FROM tickets")]
+    if user['role'] != 'tecnico':
+        rows = [r for r in rows if r['created_by'] == user['id']]
+    elif status_filter:
+        rows = [r for r in rows if r['status'] == status_filter]
+    rows.sort(key=lambda r: (r[column] or '', r['id']) if column != 'id' else r['id'], reverse=descending)
+    return [r['id'] for r in rows]
+
+
+def cases(db):
+    for column, descending in itertools.product(TICKET_SORT_COLUMNS, (False, True)):
+        for status_filter in FILTERS:
+            yield TECH, status_filter, column, descending
+        for user in db.employees:
+            yield user, None, column, descending
+
+
+def test_pages_cover_every_row_once(db):
+    for user, status_filter, column, descending in cases(db):
+        got = [r['id'] for r in db.iter_tickets_for_user(user, status_filter, page_size=7,
+                                                         order=(column, descending))]
+        assert got == expected(db, user, status_filter, column, descending), (user, status_filter, column)
+
+
+def test_next_page_is_an_index_range(db):
+    """A página seguinte começa no cursor, por intervalo num índice, sem
+    ordenar em memória."""
+    queries = []
+    fetchall = db._fetchall
+
+    def capture(c, name, params=(), sql=None):
+        queries.append((sql, list(params)))
+        return fetchall(c, name, params, sql)
+
+    db._fetchall = capture
+    for user, status_filter, column, descending in cases(db):
+        _, cursor = db.get_tickets_page(user, status_filter, None, 3, (column, descending))
+        queries.clear()
+        db.get_tickets_page(user, status_filter, cursor, 3, (column, descending))
+        (sql, params), = queries
+        plan = " ; ".join(row[3] for row in db.conn.execute("EXPLAIN QUERY PLAN " + sql, params))
+        assert "TEMP B-TREE" not in plan, (user, status_filter, column, plan)
+        assert "SEARCH t " in plan, (user, status_filter, column, plan)
+
+
+def test_invalid_sort_column(db):
+    with pytest.raises(ValueError):
+        db.get_tickets_page(TECH, order=('description', False))
@@ -0,0 +1,120 @@
+import hashlib
+
+import pytest
+
+from callme.passwords import (HASHERS, Hasher, LegacySha256Hasher, PasswordContext, Pbkdf2Hasher,
+                              ScryptHasher, identify)
+
+# custos baixos: os testes medem o formato, não o KDF
+FAST_HASHERS = [Pbkdf2Hasher(1000)]
+if 'scrypt' in HASHERS:
+    FAST_HASHERS.append(ScryptHasher(10))
+
+
+@pytest.fixture(params=FAST_HASHERS, ids=lambda h: h.algorithm)
+def hasher(request):
+    return request.param
+
+
+def test_round_trip(hasher):
+    encoded = hasher.hash("segredo")
+    assert encoded.startswith(hasher.algorithm + "$")
+    assert identify(encoded) is type(hasher)
+    assert hasher.verify("segredo", encoded)
+    assert not hasher.needs_rehash(encoded)
+
+
+def test_wrong_password_rejected(hasher):
+    encoded = hasher.hash("segredo")
+    assert not hasher.verify("Segredo", encoded)
+    assert PasswordContext(hasher).verify("outra", encoded) == (False, None)
+
+
+def test_salt_is_random(hasher):
+    assert hasher.hash("segredo") != hasher.hash("segredo")
+
+
+def test_legacy_hash_verifies_and_is_upgraded():
+    legacy = hashlib.sha256("segredo".encode('utf-8')).hexdigest()
+    assert identify(legacy) is LegacySha256Hasher
+    context = PasswordContext(Pbkdf2Hasher(1000))
+    ok, new_hash = context.verify("segredo", legacy)
+    assert ok
+    assert new_hash.startswith("pbkdf2_sha256$1000$")
+    assert context.verify("segredo", new_hash) == (True, None)
+    assert context.verify("errada", legacy) == (False, None)
+
+
+def test_lower_cost_is_rehashed():
+    old = Pbkdf2Hasher(1000).hash("segredo")
+    context = PasswordContext(Pbkdf2Hasher(2000))
+    ok, new_hash = context.verify("segredo", old)
+    assert ok
+    assert new_hash.startswith("pbkdf2_sha256$2000$")
+    # custo maior que o atual continua valendo, sem regravar
+    assert PasswordContext(Pbkdf2Hasher(500)).verify("segredo", old) == (True, None)
+
+
+def test_other_algorithm_is_rehashed():
+    if 'scrypt' not in HASHERS:
+        pytest.skip("scrypt indisponível")
+    old = ScryptHasher(10).hash("segredo")
+    ok, new_hash = PasswordContext(Pbkdf2Hasher(1000)).verify("segredo", old)
+    assert ok
+    assert identify(new_hash) is Pbkdf2Hasher
+
+
+@pytest.mark.parametrize("encoded", [
+    "pbkdf2_sha256$abc$c2Fs$aGFzaA",
+    "pbkdf2_sha256$-5$c2Fs$aGFzaA",
+    "pbkdf2_sha256$1000$c2Fs",
+    "pbkdf2_sha256$1000$!!$aGFzaA",
+    "scrypt$abc$c2Fs$aGFzaA",
+    "scrypt$10,8$c2Fs$aGFzaA",
+    "scrypt$999,8,1$c2Fs$aGFzaA",
+    "desconhecido$1$c2Fs$aGFzaA",
+    "",
+    "f" * 63,
+])
+def test_malformed_hash_does_not_raise(encoded):
+    context = PasswordContext(Pbkdf2Hasher(1000))
+    assert context.verify("segredo", encoded) == (False, None)
+
+
+def test_cache_hit_never_accepts_another_password():
+    context = PasswordContext(Pbkdf2Hasher(1000))
+    encoded = context.hash("segredo")
+    assert context.verify("segredo", encoded) == (True, None)
+    assert context.verify("segredo", encoded) == (True, None)
+    assert context.cache.hits == 1
+    assert context.verify("outra", encoded) == (False, None)
+    assert context.cache.hits == 1
+    assert context.verify("segredo", encoded) == (True, None)
+    assert context.cache.hits == 2
+
+
+def test_cache_disabled():
+    context = PasswordContext(Pbkdf2Hasher(1000), cache_size=0)
+    encoded = context.hash("segredo")
+    context.verify("segredo", encoded)
+    assert context.verify("segredo", encoded) == (True, None)
+    assert context.cache.hits == 0
+
+
+def test_legacy_hasher_never_writes():
+    with pytest.raises(ValueError):
+        LegacySha256Hasher().hash("segredo")
+
+
+def test_hasher_needs_derive_and_calibrate():
+    class Incomplete(Hasher):
+        algorithm = "incompleto"
+        default_cost = 1
+
+        def derive(self, password, salt, params):
+            return b""
+
+    with pytest.raises(TypeError):
+        Hasher(1)
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,29 @@
+import json
+
+from callme import perf
+
+
+def test_trace_writes_in_batches(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    trace = perf.Trace(str(path), flush_seconds=60)
+    recorder = perf.Recorder(trace, prefix="db.")
+    for i in range(3):
+        with recorder.span("tickets.get", tid=i):
+            pass
+    assert not path.exists()  # nada gravado na thread que mediu
+    trace.close()
+    records = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert [(r['name'], r['tid']) for r in records] == [("db.tickets.get", i) for i in range(3)]
+
+    recorder.record("depois", 1.0)
+    trace.close()
+    assert len(path.read_text(encoding='utf-8').splitlines()) == 4
+
+
+def test_trace_without_file_keeps_the_buffer(tmp_path):
+    trace = perf.Trace(max_events=2)
+    for i in range(3):
+        trace.add(f"s{i}", 0.0, 1.0, None)
+    assert [e[1] for e in trace.events()] == ["s1", "s2"]
+    assert trace.dump(str(tmp_path / "dump.jsonl")) == 2
+    trace.close()
@@ -0,0 +1,37 @@
+import pytest
+
+from callme.db import SEARCH_WINDOW, Database
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "chamados.db"), readers=0)
+    db.create_user("Fun", "f@x", "h", "funcionario", "FUNC001")
+    uid = db.conn.execute("SELECT id FROM users").fetchone()[0]
+    db.create_ticket("erro no campo nome_usuario", "d", uid)
+    db.create_ticket("erro no campo nomeXusuario", "d", uid)
+    db.create_ticket("impressora", "papel atolado", uid)
+    yield db
+    db.close()
+
+
+def titles(rows):
+    return sorted(row['title'] for row in rows)
+
+
+@pytest.mark.parametrize("fts", [True, False], ids=["fts", "like"])
+def test_underscore_is_not_a_wildcard(db, fts):
+    db._fts = fts and db.has_fts()
+    assert titles(db.search_tickets("nome_usuario")) == ["erro no campo nome_usuario"]
+    assert titles(db.search_tickets("papel atol")) == ["impressora"]
+
+
+def test_ranking_only_sees_the_window(db):
+    uid = db.conn.execute("SELECT id FROM users").fetchone()[0]
+    db.conn.executemany("INSERT INTO tickets (title, description, status, created_by, created_at, resolution)"
+                        " VALUES ('rede lenta', 'd', 'Aberto', ?, '2024-01-01', '')", [(uid,)] * SEARCH_WINDOW)
+    db.conn.commit()
+    if not db.has_fts():
+        pytest.skip("SQLite sem FTS5")
+    # os chamados da fixture também casam com "d", mas ficaram fora da janela
+    assert len(db.search_tickets("d", limit=SEARCH_WINDOW * 2)) == SEARCH_WINDOW
@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+
+from callme.db import Database, TicketDetailCache
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = Database(str(tmp_path / "chamados.db"), readers=0)
+    db.create_user("Fun", "f@x", "h", "funcionario", "FUNC001")
+    uid = db.conn.execute("SELECT id FROM users").fetchone()[0]
+    for i in range(5):
+        db.create_ticket(f"t{i}", f"d{i}", uid)
+    yield db
+    db.close()
+
+
+def events(db, kind='status'):
+    return [tuple(row) for row in
+            db.conn.execute("SELECT ticket_id, status FROM ticket_events WHERE kind=? ORDER BY seq", (kind,))]
+
+
+def statuses(db):
+    return dict(db.conn.execute("SELECT id, status FROM tickets"))
+
+
+def test_bulk_update_skips_deleted_ids(db):
+    db.conn.execute("DELETE FROM tickets WHERE id=3")
+    db.conn.commit()
+    assert db.update_ticket_status_bulk([1, 3, 5, 99], "Finalizado", "ok") == 2
+    assert events(db) == [(1, "Finalizado"), (5, "Finalizado")]
+    assert statuses(db) == {1: "Finalizado", 2: "Aberto", 4: "Aberto", 5: "Finalizado"}
+    resolutions = dict(db.conn.execute("SELECT id, resolution FROM tickets WHERE status='Finalizado'"))
+    assert resolutions == {1: "ok", 5: "ok"}
+
+
+def test_bulk_update_without_resolution(db):
+    assert db.update_ticket_status_bulk(iter([2, 4]), "Em Atendimento") == 2
+    assert events(db) == [(2, "Em Atendimento"), (4, "Em Atendimento")]
+    assert db.update_ticket_status_bulk([], "Aberto") == 0
+
+
+def test_bulk_update_invalidates_only_changed_rows(db):
+    for tid in (1, 2):
+        db.get_ticket_detail(tid)
+    db.update_ticket_status_bulk([1, 99], "Finalizado", "ok")
+    assert db.get_ticket_detail(1)['status'] == "Finalizado"
+    assert db.get_ticket_detail(2)['status'] == "Aberto"
+
+
+def test_bulk_update_keeps_counts(db):
+    db.update_ticket_status_bulk([1, 2, 3], "Finalizado", "ok")
+    assert db.get_ticket_counts() == {"Aberto": 2, "Finalizado": 3, "Todos": 5}
+
+
+def test_single_update_on_deleted_ticket(db):
+    db.get_ticket_detail(3)
+    db.conn.execute("DELETE FROM tickets WHERE id=3")
+    db.conn.commit()
+    assert db.update_ticket_status(3, "Finalizado", "ok") is False
+    assert events(db) == []
+    assert db.update_ticket_status(2, "Em Atendimento") is True
+    assert events(db) == [(2, "Em Atendimento")]
+    assert db.get_ticket_detail(2)['status'] == "Em Atendimento"
+
+
+def test_invalidate_during_load_is_not_lost():
+    loading, release = threading.Event(), threading.Event()
+    versions = iter(["velha", "nova"])
+
+    def load(tid):
+        row = (next(versions),)
+        if row == ("velha",):
+            loading.set()
+            release.wait(5)
+        return row
+
+    cache = TicketDetailCache(load)
+    reader = threading.Thread(target=lambda: cache.get(1))
+    reader.start()
+    assert loading.wait(5)
+    cache.invalidate((1,))  # a escrita terminou enquanto a leitura estava no meio
+    release.set()
+    reader.join(5)
+    assert len(cache) == 0
+    assert cache.get(1) == ("nova",)
+    assert cache.get(1) == ("nova",)
+    assert cache.hits == 1
+
+
+def test_unknown_profile(tmp_path):
+    with pytest.raises(ValueError, match="CALLME_DB_PROFILE desconhecido: turbo"):
+        Database(str(tmp_path / "chamados.db"), profile="turbo")
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+pytest.importorskip("PyQt6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from CallMe import TicketTableModel  # noqa: E402
+
+COLUMNS = [('id', "ID"), ('title', "Título"), ('status', "Status"), ('created_at', "Data")]
+
+
+def ticket(tid, status="Aberto", day=None):
+    return {'id': tid, 'title': f"t{tid}", 'status': status, 'created_at': f"2024-01-{day or tid:02d}"}
+
+
+@pytest.fixture
+def model():
+    model = TicketTableModel(COLUMNS)
+    model.set_rows([ticket(tid) for tid in (9, 7, 5, 3)])
+    return model
+
+
+def ids(model):
+    return [model.row_at(i)['id'] for i in range(model.rowCount())]
+
+
+def test_changed_row_is_updated_in_place(model):
+    changed = []
+    model.dataChanged.connect(lambda first, last: changed.append((first.row(), last.row())))
+    model.patch_rows([ticket(5, "Finalizado")])
+    assert ids(model) == [9, 7, 5, 3]
+    assert model.row_at(2)['status'] == "Finalizado"
+    assert changed == [(2, 2)]
+
+
+def test_new_rows_enter_in_order(model):
+    model.patch_rows([ticket(8), ticket(10), ticket(1)])
+    assert ids(model) == [10, 9, 8, 7, 5, 3, 1]
+
+
+def test_row_leaving_the_filter_is_removed(model):
+    model.patch_rows([ticket(7, "Finalizado"), ticket(6, "Finalizado")], keep=lambda t: t['status'] == "Aberto")
+    assert ids(model) == [9, 5, 3]
+
+
+def test_row_whose_sort_key_changed_moves(model):
+    model.patch_rows([ticket(3, day=20)])
+    assert ids(model) == [3, 9, 7, 5]
+
+
+def test_rows_past_the_loaded_pages_wait_for_paging(model):
+    model._cursor = ("2024-01-03", 3)  # ainda há páginas por carregar
+    model.patch_rows([ticket(1), ticket(4)])
+    assert ids(model) == [9, 7, 5, 4, 3]
+    # a próxima página não repete o que já entrou por patch_rows
+    model._on_page(model._generation, False, ([ticket(4), ticket(2), ticket(1)], None))
+    assert ids(model) == [9, 7, 5, 4, 3, 2, 1]